@@ -62,12 +62,18 @@ echo "=========================================="
 
 # Executa o Gunicorn
 if [ $# -eq 0 ]; then
-    echo "Iniciando Gunicorn..."
-    exec gunicorn retro_games_cloud.wsgi:application \
+    # GUNICORN_PROFILE=asgi usa workers Uvicorn (ver gunicorn_config.py)
+    if [ "${GUNICORN_PROFILE:-wsgi}" = "asgi" ]; then
+        APP_MODULE=retro_games_cloud.asgi:application
+    else
+        APP_MODULE=retro_games_cloud.wsgi:application
+    fi
+    echo "Iniciando Gunicorn (pool ${GUNICORN_POOL:-public}, perfil ${GUNICORN_PROFILE:-wsgi})..."
+    exec gunicorn $APP_MODULE \
         --config gunicorn_config.py \
         --bind 0.0.0.0:8000 \
         --workers ${GUNICORN_WORKERS:-3} \
-        --timeout 120 \
+        --timeout ${GUNICORN_TIMEOUT:-120} \
         --access-logfile - \
         --error-logfile - \
         --log-level ${GUNICORN_LOG_LEVEL:-info}
@@ -1,5 +1,7 @@
-from django.contrib import admin
-from .models import Game, GameRequest
+from django.conf import settings
+from django.contrib import admin, messages
+from . import collector
+from .models import Game, GameRequest, RequestSearchResult
 
 
 @admin.register(Game)
@@ -9,7 +11,7 @@ class GameAdmin(admin.ModelAdmin):
     list_filter = ['is_active', 'created_at']
     search_fields = ['title', 'description', 'slug', 'cover_image']
     ordering = ['title']
-    readonly_fields = ['slug', 'created_at', 'updated_at']
+    readonly_fields = ['slug', 'content_key', 'created_at', 'updated_at']
     fieldsets = (
         ('Informações Básicas', {
             'fields': ('title', 'slug', 'description')
@@ -19,7 +21,7 @@ class GameAdmin(admin.ModelAdmin):
             'description': 'URL da imagem de capa do jogo. Será exibida nos cards de jogos.'
         }),
         ('Integração com Emulador', {
-            'fields': ('rom_url',),
+            'fields': ('rom_url', 'content_key'),
             'description': 'URL completa do jogo no retrogames.cc ou serviço similar. Ex: https://www.retrogames.cc/embed/[ID]. Esta URL será usada diretamente no atributo src do iframe do emulador.'
         }),
         ('Status', {
@@ -32,15 +34,30 @@ class GameAdmin(admin.ModelAdmin):
         )
 
 
+class RequestSearchResultInline(admin.TabularInline):
+    """Resultados do retrogames.cc encontrados para o pedido (somente leitura)"""
+    model = RequestSearchResult
+    fields = ['position', 'game_name', 'title', 'game_url', 'embed_url']
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+    
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(GameRequest)
 class GameRequestAdmin(admin.ModelAdmin):
     """Admin para pedidos de jogos enviados por usuários"""
     list_display = ['title', 'user', 'status', 'created_at']
+    list_select_related = ['user']  # __str__ e a coluna 'user' leem user.username por linha
     list_filter = ['status', 'created_at']
     search_fields = ['title', 'user__username', 'details']
     readonly_fields = ['created_at', 'updated_at']
     ordering = ['-created_at']
     list_editable = ['status']
+    actions = ['approve_selected']
+    inlines = [RequestSearchResultInline]
     
     fieldsets = (
         ('Informações do Pedido', {
@@ -59,8 +76,37 @@ class GameRequestAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        """Não carregar a resposta compactada da API na listagem"""
+        return super().get_queryset(request).defer('ai_response_blob')
+    
     def get_readonly_fields(self, request, obj=None):
         """Torna user readonly após a criação"""
         if obj:  # editing an existing object
             return self.readonly_fields + ('user',)
-        return self.readonly_fields
\ No newline at end of file
+        return self.readonly_fields
+    
+    @admin.action(description='Aprovar selecionadas e iniciar busca na API')
+    def approve_selected(self, request, queryset):
+        """Aprova em lote, com os /kickoff enviados em paralelo pelo collector"""
+        pks = list(queryset.values_list('pk', flat=True)[:settings.GAME_COLLECTOR_BULK_MAX + 1])
+        skipped = 0
+        if len(pks) > settings.GAME_COLLECTOR_BULK_MAX:
+            skipped = queryset.count() - settings.GAME_COLLECTOR_BULK_MAX
+            pks = pks[:settings.GAME_COLLECTOR_BULK_MAX]
+        results = collector.bulk_approve(pks, collector.build_webhook_urls(request))
+        
+        if skipped:
+            self.message_user(
+                request,
+                f'{skipped} requisição(ões) não foram processadas: o limite por vez é '
+                f'{settings.GAME_COLLECTOR_BULK_MAX} (GAME_COLLECTOR_BULK_MAX). Selecione-as novamente.',
+                messages.WARNING
+            )
+        
+        approved = sum(1 for result in results if result['outcome'] in collector.APPROVED_OUTCOMES)
+        if approved:
+            self.message_user(request, f'{approved} de {len(results)} requisição(ões) aprovada(s).', messages.SUCCESS)
+        for result in results:
+            if result['outcome'] not in collector.APPROVED_OUTCOMES:
+                self.message_user(request, f"#{result['id']} {result['title'] or ''}: {result['message']}", messages.WARNING)
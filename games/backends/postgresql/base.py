@@ -0,0 +1,48 @@
+"""
+Backend PostgreSQL do Django com pool de conexões no processo (DB_POOL=True).
+
+Igual a django.db.backends.postgresql, exceto que a conexão do driver vem de
+games.db.ConnectionPool em vez de ser aberta a cada requisição, e volta para o
+pool quando o Django a fecharia. Configurado em DATABASES['default']['POOL']
+(ver settings.py); CONN_HEALTH_CHECKS testa as conexões ociosas ao reaproveitá-las.
+"""
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from games.db import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict['POOL'])
+
+    def _is_usable_connection(self, connection):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except self.Database.Error:
+            return False
+        return True
+
+    def get_new_connection(self, conn_params):
+        check = self._is_usable_connection if self.settings_dict['CONN_HEALTH_CHECKS'] else None
+        connection = self.pool.getconn(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params), check)
+        # Normalmente definido ao abrir a conexão: vale também para as reaproveitadas
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        if self.isolation_level != IsolationLevel.READ_COMMITTED:
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        # Fechada dentro de um atomic ou após erros, a conexão não volta ao pool
+        discard = self.in_atomic_block or self.errors_occurred
+        with self.wrap_database_errors:
+            if not discard and not self.connection.autocommit:
+                self.connection.rollback()
+            self.pool.putconn(self.connection, discard=discard)
@@ -0,0 +1,818 @@
+"""
+Integração com a API externa de coleta de nomes de jogos (game-collector).
+
+Concentra o acesso HTTP à API (sessão compartilhada com pool de conexões) e o
+pós-processamento das respostas de /status, para que views e o poller em
+segundo plano (management command poll_kickoffs) usem exatamente a mesma lógica.
+"""
+import hashlib
+import hmac
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+from asgiref.sync import sync_to_async
+from decouple import config
+from django.conf import settings
+from django.db import connection, transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from . import ratelimit
+from .models import GameRequest, RequestSearchResult, UserRequestStats
+from .utils import normalize_search_term, search_games_on_retrogames
+
+logger = logging.getLogger(__name__)
+
+
+# URL base da API externa (GAME_COLLECTOR_API_URL; aponte para run_fake_collector em testes de carga)
+API_BASE_URL = settings.GAME_COLLECTOR_API_URL.rstrip('/')
+
+# Token de autenticação da API (lido do .env)
+API_TOKEN = config('GAME_COLLECTOR_API_TOKEN', default='')
+
+# Estados de execução nos quais a busca ainda não terminou
+ACTIVE_EXECUTION_STATUSES = ('running', 'processing')
+
+# Resultados de approve_request que deixam a requisição aprovada
+APPROVED_OUTCOMES = ('started', 'cache', 'in_flight')
+
+# Eventos de webhook enviados pela API (um URL para cada campo do /kickoff)
+WEBHOOK_EVENTS = ('task', 'step', 'crew')
+
+_session = None
+_session_lock = threading.Lock()
+_executor = None
+
+
+def get_session():
+    """
+    Retorna a sessão HTTP compartilhada com a API.
+
+    A sessão mantém conexões keep-alive em pool, evitando um novo handshake
+    TLS a cada chamada de /kickoff ou /status, e respeita o orçamento da API
+    em OUTBOUND_RATE_LIMITS, compartilhado entre os workers (games/ratelimit.py).
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = ratelimit.build_session(pool_connections=4, pool_maxsize=16)
+    return _session
+
+
+def get_async_client():
+    """Cliente HTTP assíncrono com a API (views async), com o mesmo orçamento de get_session"""
+    return ratelimit.get_async_client('game_collector', max_connections=16)
+
+
+def get_api_headers():
+    """Retorna os headers necessários para autenticação na API"""
+    headers = {
+        'Content-Type': 'application/json',
+        'Accept': 'application/json'
+    }
+
+    # Adicionar token de autenticação se disponível
+    if API_TOKEN:
+        # Tentar diferentes formatos de autenticação comuns
+        if API_TOKEN.startswith('Bearer ') or API_TOKEN.startswith('Token '):
+            headers['Authorization'] = API_TOKEN
+        else:
+            # Se não tiver prefixo, adicionar Bearer
+            headers['Authorization'] = f'Bearer {API_TOKEN}'
+        # Também tentar como X-API-Key (algumas APIs usam isso)
+        headers['X-API-Key'] = API_TOKEN
+        # Algumas APIs também usam X-Auth-Token
+        headers['X-Auth-Token'] = API_TOKEN
+    else:
+        logger.warning("GAME_COLLECTOR_API_TOKEN não configurado no .env!")
+
+    return headers
+
+
+def fetch_status(kickoff_id, timeout=10):
+    """
+    Consulta /status/{kickoff_id} na API externa.
+
+    Args:
+        kickoff_id (str): ID retornado pelo /kickoff
+        timeout (int): Timeout da requisição em segundos
+
+    Returns:
+        dict: Resposta JSON da API
+
+    Raises:
+        requests.exceptions.RequestException: Em caso de erro HTTP ou de rede
+    """
+    status_url = f"{API_BASE_URL}/status/{kickoff_id}"
+    response = get_session().get(status_url, headers=get_api_headers(), timeout=timeout)
+    if not response.ok:
+        logger.warning(
+            f"Status {response.status_code} ao consultar {status_url}: {response.text[:500]}"
+        )
+    response.raise_for_status()
+    return response.json()
+
+
+async def afetch_status(kickoff_id, timeout=10):
+    """
+    Versão assíncrona de fetch_status.
+
+    Raises:
+        httpx.HTTPError: Em caso de erro HTTP ou de rede
+    """
+    status_url = f"{API_BASE_URL}/status/{kickoff_id}"
+    response = await get_async_client().get(status_url, headers=get_api_headers(), timeout=timeout)
+    if not response.is_success:
+        logger.warning(
+            f"Status {response.status_code} ao consultar {status_url}: {response.text[:500]}"
+        )
+    response.raise_for_status()
+    return response.json()
+
+
+def normalize_execution_state(execution_state):
+    """
+    Converte o 'state' da API (SUCCESS, RUNNING, etc.) no execution_status salvo no banco.
+    """
+    if execution_state == 'SUCCESS':
+        return 'completed'
+    if execution_state in ('RUNNING', 'PENDING'):
+        return 'running'
+    if execution_state in ('ERROR', 'FAILED'):
+        return 'failed'
+    return execution_state.lower() if isinstance(execution_state, str) else str(execution_state)
+
+
+def _split_game_names(text):
+    """Divide um texto com nomes separados por \\n, removendo vazios e duplicatas"""
+    seen = set()
+    names = []
+    for name in str(text).strip().split('\n'):
+        name = name.strip()
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            names.append(name)
+    return names
+
+
+def extract_game_names(status_data):
+    """
+    Extrai os nomes de jogos retornados pela IA.
+
+    O resultado vem como string com nomes separados por \\n no campo 'result'
+    ou, alternativamente, em last_executed_task.output.
+
+    Returns:
+        list: Nomes de jogos únicos, na ordem retornada
+    """
+    game_names = []
+    if status_data.get('result'):
+        game_names = _split_game_names(status_data['result'])
+
+    if not game_names and isinstance(status_data.get('last_executed_task'), dict):
+        task_output = status_data['last_executed_task'].get('output', '')
+        if task_output:
+            game_names = _split_game_names(task_output)
+
+    return game_names
+
+
+def claim_completion(kickoff_id):
+    """
+    Marca as requisições deste kickoff como 'processing' antes do pós-processamento.
+
+    É um compare-and-set (UPDATE ... WHERE execution_status='running'): apenas
+    quem conseguir a transição processa o resultado, o que torna o webhook
+    idempotente e evita que webhook e poller processem o mesmo kickoff.
+
+    Returns:
+        int: Número de requisições reivindicadas (0 se já foram processadas)
+    """
+    now = timezone.now()
+    return GameRequest.objects.filter(kickoff_id=kickoff_id, execution_status='running').update(
+        execution_status='processing', status_checked_at=now, updated_at=now
+    )
+
+
+def renew_claim(pks, claimed_at, **fields):
+    """
+    Heartbeat do pós-processamento: renova status_checked_at das requisições
+    reivindicadas (e grava fields) só se o claim ainda for o mesmo, isto é, se
+    status_checked_at continuar igual a claimed_at. Se release_stale_claims
+    devolveu as requisições ao poller e outro processo as reivindicou, o
+    valor mudou e nada é gravado.
+
+    Returns:
+        datetime: O novo claimed_at, ou None se o claim foi perdido
+    """
+    now = timezone.now()
+    renewed = GameRequest.objects.filter(
+        pk__in=pks, execution_status='processing', status_checked_at=claimed_at
+    ).update(status_checked_at=now, updated_at=now, **fields)
+    return now if renewed else None
+
+
+def complete_kickoff(kickoff_id, status_data):
+    """
+    Pós-processa um kickoff concluído: busca os nomes retornados no retrogames.cc
+    e salva os resultados (RequestSearchResult) das requisições reivindicadas
+    por claim_completion().
+
+    A resposta bruta da API é gravada compactada uma única vez; a cada nome
+    buscado apenas as linhas de resultado novas são inseridas e o contador
+    searched_names é atualizado, para que o stream de eventos da página de
+    detalhe os mostre à medida que chegam. Cada gravação renova o claim
+    (renew_claim), para que release_stale_claims não o devolva ao poller no
+    meio de um processamento longo; se ele ainda assim for perdido, o
+    processamento para sem gravar mais nada. Em caso de erro inesperado as
+    requisições voltam para 'running', para que o poller tente novamente.
+    """
+    game_requests = GameRequest.objects.filter(kickoff_id=kickoff_id, execution_status='processing')
+    try:
+        game_names = extract_game_names(status_data)
+        blob = GameRequest.compress_response_data(status_data)
+
+        # Agrupar por lista de nomes (sem nomes retornados, usa-se o título de cada requisição)
+        groups = {}
+        for pk, title, claimed_at in game_requests.values_list('pk', 'title', 'status_checked_at'):
+            groups.setdefault((tuple(game_names or [title]), claimed_at), []).append(pk)
+
+        for (names, claimed_at), pks in groups.items():
+            with transaction.atomic():
+                claimed_at = renew_claim(
+                    pks, claimed_at, ai_response_blob=blob, game_names=list(names), searched_names=0
+                )
+                if claimed_at is None:
+                    logger.warning(f"Kickoff {kickoff_id}: claim perdido, pós-processamento interrompido")
+                    return
+                # Recomeçar do zero caso uma tentativa anterior tenha sido interrompida
+                RequestSearchResult.objects.filter(game_request__in=pks).delete()
+
+            seen_urls = set()
+            for searched, game_name in enumerate(names, start=1):
+                try:
+                    logger.info(f"Buscando jogo no retrogames.cc: {game_name}")
+                    results = search_games_on_retrogames(game_name, max_results=5)
+                except Exception as e:
+                    logger.error(f"Erro ao buscar jogo '{game_name}': {str(e)}")
+                    results = []
+
+                new_results = []
+                for result in results:
+                    if result.get('game_url') and result['game_url'] not in seen_urls:
+                        new_results.append((len(seen_urls), result))
+                        seen_urls.add(result['game_url'])
+
+                with transaction.atomic():
+                    claimed_at = renew_claim(pks, claimed_at, searched_names=searched)
+                    if claimed_at is None:
+                        logger.warning(f"Kickoff {kickoff_id}: claim perdido, pós-processamento interrompido")
+                        return
+                    RequestSearchResult.objects.bulk_create([
+                        RequestSearchResult.from_result(pk, result, game_name, position)
+                        for pk in pks
+                        for position, result in new_results
+                    ])
+
+            renew_claim(pks, claimed_at, execution_status='completed')
+    except Exception:
+        logger.exception(f"Erro ao processar resultado do kickoff {kickoff_id}")
+        game_requests.update(execution_status='running')
+        raise
+
+
+def apply_status(kickoff_id, status_data):
+    """
+    Persiste a resposta de /status em todas as requisições com este kickoff_id.
+
+    Enquanto a execução não termina, apenas execution_status e status_checked_at
+    são atualizados (UPDATE único, sem reescrever a resposta da API). Quando a
+    execução é concluída, o kickoff é reivindicado e pós-processado uma única vez.
+
+    Returns:
+        str: execution_status normalizado
+    """
+    execution_state = status_data.get('state', status_data.get('status', 'unknown'))
+    execution_status = normalize_execution_state(execution_state)
+
+    if execution_status != 'completed':
+        now = timezone.now()
+        GameRequest.objects.filter(kickoff_id=kickoff_id, execution_status='running').update(
+            execution_status=execution_status, status_checked_at=now, updated_at=now
+        )
+        return execution_status
+
+    if claim_completion(kickoff_id):
+        complete_kickoff(kickoff_id, status_data)
+    return execution_status
+
+
+def reuse_previous_kickoff(game_request):
+    """
+    Tenta atender uma aprovação sem chamar /kickoff, reaproveitando outra
+    requisição com a mesma consulta normalizada (ai_query_key).
+
+    - Se houver um kickoff concluído há menos de GAME_COLLECTOR_CACHE_TTL
+      segundos, copia a resposta, os nomes e os resultados do retrogames.cc e
+      marca a requisição como concluída imediatamente.
+    - Se houver um kickoff da mesma consulta ainda em andamento, a requisição é
+      anexada a ele (mesmo kickoff_id) e recebe o resultado quando ele terminar.
+    - Se uma aprovação mais antiga da mesma consulta ainda estiver enviando o
+      /kickoff ('submitting'), a requisição não espera por ela: fica aprovada,
+      em 'running' e sem kickoff_id, e resolve_followers() a anexa ao kickoff
+      da líder quando esta terminar (ou o poller, se a líder for interrompida).
+
+    Returns:
+        str: 'cache', 'in_flight' ou None se nada pôde ser reaproveitado
+    """
+    if not game_request.ai_query_key:
+        return None
+
+    candidates = (
+        GameRequest.objects.filter(ai_query_key=game_request.ai_query_key, kickoff_id__isnull=False)
+        .exclude(pk=game_request.pk)
+    )
+
+    cached = _find_cached(candidates)
+    if cached:
+        game_request.kickoff_id = cached.kickoff_id
+        # Copiar os bytes já compactados, sem descompactar a resposta
+        game_request.ai_response_blob = cached.ai_response_blob
+        game_request.game_names = cached.game_names
+        game_request.searched_names = cached.searched_names
+        game_request.execution_status = 'completed'
+        game_request.status_checked_at = cached.status_checked_at
+        game_request.status = 'approved'
+        with transaction.atomic():
+            RequestSearchResult.objects.filter(game_request_id=game_request.pk).delete()
+            game_request.save()
+            copy_search_results(cached.pk, game_request.pk)
+        logger.info(f"Requisição {game_request.pk}: resultado reaproveitado do kickoff {cached.kickoff_id}")
+        return 'cache'
+
+    in_flight = _find_in_flight(candidates)
+    if in_flight is None and not _has_leader(game_request):
+        return None
+    # Mesmo que o outro já esteja em 'processing', entrar como 'running':
+    # o poller/webhook reivindica e processa esta requisição ao ver o kickoff concluído.
+    game_request.kickoff_id = in_flight.kickoff_id if in_flight else None
+    game_request.execution_status = 'running'
+    game_request.status_checked_at = None
+    game_request.status = 'approved'
+    with transaction.atomic():
+        clear_previous_results(game_request)
+        game_request.save()
+    if in_flight:
+        logger.info(f"Requisição {game_request.pk}: anexada ao kickoff em andamento {in_flight.kickoff_id}")
+    else:
+        logger.info(f"Requisição {game_request.pk}: aguardando o /kickoff de outra aprovação da mesma consulta")
+    return 'in_flight'
+
+
+def clear_previous_results(game_request):
+    """
+    Descarta o resultado de um kickoff anterior (resposta, nomes e resultados
+    do retrogames.cc) ao reaprovar uma requisição, para que a página de detalhe
+    e o stream de eventos não mostrem o resultado antigo enquanto o novo não
+    chega. Deve rodar na mesma transação que grava o novo kickoff_id.
+    """
+    game_request.ai_response_blob = None
+    game_request.game_names = []
+    game_request.searched_names = 0
+    RequestSearchResult.objects.filter(game_request_id=game_request.pk).delete()
+
+
+def copy_search_results(from_pk, to_pk):
+    """Copia os resultados do retrogames.cc de uma requisição para outra"""
+    fields = ('game_name', 'title', 'image_url', 'game_url', 'embed_url', 'position')
+    RequestSearchResult.objects.bulk_create([
+        RequestSearchResult(game_request_id=to_pk, **row)
+        for row in RequestSearchResult.objects.filter(game_request_id=from_pk).values(*fields)
+    ], ignore_conflicts=True)
+
+
+def _find_cached(candidates):
+    """Retorna o kickoff concluído mais recente dentro de GAME_COLLECTOR_CACHE_TTL"""
+    return (
+        candidates.filter(
+            execution_status='completed',
+            status_checked_at__gte=timezone.now() - timedelta(seconds=settings.GAME_COLLECTOR_CACHE_TTL),
+        )
+        .order_by('-status_checked_at')
+        .first()
+    )
+
+
+def _find_in_flight(candidates):
+    """Retorna a requisição mais recente cujo kickoff ainda está em andamento"""
+    return candidates.filter(execution_status__in=ACTIVE_EXECUTION_STATUSES).order_by('-created_at').first()
+
+
+def _has_leader(game_request):
+    """
+    Indica se uma aprovação mais antiga da mesma consulta está enviando o
+    /kickoff ('submitting'). Apenas requisições com pk menor contam, para que
+    duas aprovações simultâneas nunca se anexem uma à outra: a mais antiga faz
+    o /kickoff.
+    """
+    return GameRequest.objects.filter(
+        ai_query_key=game_request.ai_query_key, status='submitting', pk__lt=game_request.pk
+    ).exists()
+
+
+def resolve_followers(ai_query_key):
+    """
+    Resolve as requisições que aguardam o /kickoff de outra aprovação da mesma
+    consulta (aprovadas, em 'running' e sem kickoff_id), quando nenhuma
+    aprovação dessa consulta está mais em 'submitting': anexa-as ao kickoff em
+    andamento, copia o resultado em cache ou, se a líder falhou, devolve-as
+    para 'pending'. Cada requisição é atualizada com compare-and-set, então
+    chamadas simultâneas (líder, seguidora e poller) não se sobrepõem.
+
+    Returns:
+        int: Número de requisições resolvidas
+    """
+    if not ai_query_key:
+        return 0
+    same_query = GameRequest.objects.filter(ai_query_key=ai_query_key)
+    if same_query.filter(status='submitting').exists():
+        return 0
+    waiting = same_query.filter(status='approved', execution_status='running', kickoff_id__isnull=True)
+    candidates = same_query.filter(kickoff_id__isnull=False)
+    now = timezone.now()
+
+    in_flight = _find_in_flight(candidates)
+    if in_flight:
+        return waiting.update(kickoff_id=in_flight.kickoff_id, status_checked_at=None, updated_at=now)
+
+    resolved = 0
+    cached = _find_cached(candidates)
+    for pk, user_id in waiting.values_list('pk', 'user_id'):
+        with transaction.atomic():
+            if cached:
+                attached = waiting.filter(pk=pk).update(
+                    kickoff_id=cached.kickoff_id, ai_response_blob=cached.ai_response_blob,
+                    game_names=cached.game_names, searched_names=cached.searched_names,
+                    execution_status='completed', status_checked_at=cached.status_checked_at, updated_at=now,
+                )
+                if attached:
+                    copy_search_results(cached.pk, pk)
+            else:
+                attached = waiting.filter(pk=pk).update(status='pending', execution_status=None, updated_at=now)
+                if attached:
+                    UserRequestStats.record_transition(user_id, 'approved', 'pending')
+        resolved += attached
+    return resolved
+
+
+def resolve_waiting_requests():
+    """
+    Resolve (resolve_followers) as requisições que ficaram aguardando uma
+    líder que não as resolveu (ex.: worker reiniciado). Chamado pelo poller.
+
+    Returns:
+        int: Número de requisições resolvidas
+    """
+    keys = (
+        GameRequest.objects.filter(status='approved', execution_status='running', kickoff_id__isnull=True)
+        .order_by().values_list('ai_query_key', flat=True).distinct()
+    )
+    return sum(resolve_followers(key) for key in keys)
+
+
+# ============================================================================
+# APROVAÇÃO E KICKOFF
+# ============================================================================
+
+def claim_approval(game_request):
+    """
+    Reivindica a requisição para envio com um compare-and-set: o status só
+    passa para 'submitting' se ainda for o status lido (pendente ou rejeitado).
+
+    Returns:
+        str: O status anterior (para release_approval) ou None se outra
+        aprovação chegou primeiro ou o status não permite aprovação
+    """
+    previous_status = game_request.status
+    if previous_status not in GameRequest.APPROVABLE_STATUSES:
+        return None
+    claimed = GameRequest.objects.filter(pk=game_request.pk, status=previous_status).update(
+        status='submitting', updated_at=timezone.now()
+    )
+    if not claimed:
+        return None
+    # UPDATE direto não passa por save(): ajustar os contadores do usuário aqui
+    UserRequestStats.record_transition(game_request.user_id, previous_status, 'submitting')
+    game_request.status = game_request._loaded_status = 'submitting'
+    return previous_status
+
+
+def release_approval(game_request, previous_status):
+    """Devolve ao status anterior uma requisição cujo envio não chegou a aprová-la"""
+    released = GameRequest.objects.filter(pk=game_request.pk, status='submitting').update(status=previous_status)
+    if released:
+        UserRequestStats.record_transition(game_request.user_id, 'submitting', previous_status)
+
+
+def release_stale_approvals(older_than):
+    """
+    Devolve para 'pending' as requisições presas em 'submitting' há mais de
+    older_than segundos (worker reiniciado entre claim_approval e
+    release_approval). O status anterior não é conhecido: a requisição volta
+    para a fila de aprovação.
+
+    Returns:
+        int: Número de requisições liberadas
+    """
+    limit = timezone.now() - timedelta(seconds=older_than)
+    stale = GameRequest.objects.filter(status='submitting', updated_at__lt=limit)
+    released = 0
+    for pk, user_id in stale.values_list('pk', 'user_id'):
+        # Compare-and-set por requisição: uma aprovação que terminou nesse meio-tempo prevalece
+        if stale.filter(pk=pk).update(status='pending', updated_at=timezone.now()):
+            UserRequestStats.record_transition(user_id, 'submitting', 'pending')
+            released += 1
+    return released
+
+
+def build_search_term(game_request):
+    """Termo enviado como inputs.search_term: ai_query ou, na falta dela, o título"""
+    ai_query = (game_request.ai_query or '').strip()
+    if ai_query:
+        return ai_query
+    title = (game_request.title or '').strip()
+    return f"{title} jogo retro" if title else "jogo retro"
+
+
+def build_kickoff_payload(search_term, webhook_urls):
+    """Monta o corpo do POST /kickoff"""
+    return {
+        "inputs": {
+            "search_term": search_term
+        },
+        "taskWebhookUrl": webhook_urls['taskWebhookUrl'],
+        "stepWebhookUrl": webhook_urls['stepWebhookUrl'],
+        "crewWebhookUrl": webhook_urls['crewWebhookUrl'],
+        "trainingFilename": "",
+        "generateArtifact": False
+    }
+
+
+def _wait_kickoff_slot():
+    """
+    Limita o ritmo de chamadas ao /kickoff a GAME_COLLECTOR_KICKOFF_RATE por
+    segundo, somando todos os workers (bucket compartilhado 'collector-kickoff'
+    de rajada 1). A espera máxima comporta uma aprovação em lote completa.
+    """
+    rate = settings.GAME_COLLECTOR_KICKOFF_RATE
+    if rate <= 0:
+        return
+    max_wait = max(settings.OUTBOUND_RATE_LIMIT_MAX_WAIT, settings.GAME_COLLECTOR_BULK_MAX / rate)
+    ratelimit.acquire('collector-kickoff', rate, 1, max_wait=max_wait)
+
+
+def post_kickoff(search_term, webhook_urls, timeout=30):
+    """
+    Inicia uma execução na API respeitando o limite de ritmo.
+
+    Returns:
+        str: kickoff_id retornado pela API
+
+    Raises:
+        requests.exceptions.RequestException: Erro de comunicação ou status HTTP de erro
+        ValueError: A API não retornou um kickoff_id
+    """
+    _wait_kickoff_slot()
+    response = get_session().post(
+        f"{API_BASE_URL}/kickoff",
+        json=build_kickoff_payload(search_term, webhook_urls),
+        headers=get_api_headers(),
+        timeout=timeout
+    )
+    response.raise_for_status()
+    data = response.json()
+    kickoff_id = data.get('kickoff_id') or data.get('id')
+    if not kickoff_id:
+        raise ValueError('A API não retornou um kickoff_id')
+    return kickoff_id
+
+
+def approve_request(game_request, webhook_urls, force_refresh=False):
+    """
+    Aprova uma requisição e inicia (ou reaproveita) a busca na API, sem
+    depender de uma requisição HTTP. Usada pela aprovação em lote.
+
+    Returns:
+        dict: id, outcome ('started', 'cache', 'in_flight', 'conflict',
+        'invalid' ou 'error'), kickoff_id e message
+    """
+    result = {'id': game_request.pk, 'title': game_request.title, 'kickoff_id': None}
+
+    previous_status = claim_approval(game_request)
+    if previous_status is None:
+        result.update(outcome='conflict', message='Requisição já aprovada ou sendo enviada.')
+        return result
+
+    try:
+        if not (game_request.title or '').strip():
+            result.update(outcome='invalid', message='O título do jogo é obrigatório.')
+            return result
+
+        if not (game_request.ai_query or '').strip():
+            game_request.ai_query = f"{game_request.title.strip()} jogo retro"
+            game_request.save(update_fields=['ai_query'])
+
+        if not force_refresh:
+            reused = reuse_previous_kickoff(game_request)
+            if reused:
+                result.update(
+                    outcome=reused, kickoff_id=game_request.kickoff_id,
+                    message='Resultado reaproveitado.' if reused == 'cache' else 'Anexada a uma busca em andamento.'
+                )
+                return result
+
+        game_request.kickoff_id = post_kickoff(build_search_term(game_request), webhook_urls)
+        game_request.status = 'approved'
+        game_request.execution_status = 'running'
+        game_request.status_checked_at = None
+        with transaction.atomic():
+            clear_previous_results(game_request)
+            game_request.save()
+        result.update(outcome='started', kickoff_id=game_request.kickoff_id, message='Busca iniciada na API.')
+        return result
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Requisição {game_request.pk}: erro ao chamar /kickoff: {e}")
+        result.update(outcome='error', message=f'Erro ao comunicar com a API: {e}')
+        return result
+    except Exception as e:
+        logger.exception(f"Requisição {game_request.pk}: erro inesperado na aprovação")
+        result.update(outcome='error', message=f'Erro inesperado: {e}')
+        return result
+    finally:
+        release_approval(game_request, previous_status)
+        # Líder: anexar as aprovações que aguardavam este /kickoff. Seguidora:
+        # se a líder terminou enquanto ela se registrava, resolver-se agora.
+        resolve_followers(game_request.ai_query_key)
+
+
+def _approve_group(game_requests, webhook_urls, force_refresh):
+    """
+    Aprova, em sequência, requisições com o mesmo termo de busca normalizado.
+    A primeira faz o /kickoff; as demais se anexam a ele via reuse_previous_kickoff.
+    """
+    try:
+        results = []
+        for index, game_request in enumerate(game_requests):
+            results.append(approve_request(game_request, webhook_urls, force_refresh=force_refresh and index == 0))
+        return results
+    finally:
+        connection.close()
+
+
+def bulk_approve(pks, webhook_urls, force_refresh=False):
+    """
+    Aprova várias requisições, enviando os /kickoff em paralelo
+    (GAME_COLLECTOR_BULK_CONCURRENCY threads) sob o limite de ritmo
+    GAME_COLLECTOR_KICKOFF_RATE.
+
+    Requisições com o mesmo termo normalizado formam um grupo processado por
+    uma única thread, para gerar um só kickoff por termo.
+
+    Returns:
+        list[dict]: Um resultado de approve_request por id, na ordem recebida
+    """
+    pks = list(dict.fromkeys(int(pk) for pk in pks))
+    found = {gr.pk: gr for gr in GameRequest.objects.filter(pk__in=pks).defer('ai_response_blob').order_by('pk')}
+
+    groups = {}
+    for game_request in found.values():
+        key = normalize_search_term(build_search_term(game_request))
+        groups.setdefault(key, []).append(game_request)
+
+    by_pk = {}
+    if groups:
+        workers = max(1, min(settings.GAME_COLLECTOR_BULK_CONCURRENCY, len(groups)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='collector-bulk') as executor:
+            futures = [executor.submit(_approve_group, group, webhook_urls, force_refresh) for group in groups.values()]
+            for future in futures:
+                for result in future.result():
+                    by_pk[result['id']] = result
+
+    return [
+        by_pk.get(pk, {'id': pk, 'title': None, 'kickoff_id': None, 'outcome': 'not_found', 'message': 'Requisição não encontrada.'})
+        for pk in pks
+    ]
+
+
+def refresh_status(kickoff_id, timeout=10):
+    """Consulta a API e persiste o resultado. Retorna (execution_status, status_data)."""
+    status_data = fetch_status(kickoff_id, timeout=timeout)
+    return apply_status(kickoff_id, status_data), status_data
+
+
+async def arefresh_status(kickoff_id, timeout=10):
+    """Versão assíncrona de refresh_status: só a persistência roda fora do event loop"""
+    status_data = await afetch_status(kickoff_id, timeout=timeout)
+    return await sync_to_async(apply_status)(kickoff_id, status_data), status_data
+
+
+def status_is_stale(game_request, stale_after):
+    """
+    Indica se o status armazenado de uma execução em andamento está desatualizado,
+    ou seja, se o poller não o verificou nos últimos stale_after segundos.
+    """
+    if game_request.execution_status not in (None, '', 'running'):
+        return False
+    if not game_request.status_checked_at:
+        return True
+    return (timezone.now() - game_request.status_checked_at).total_seconds() > stale_after
+
+
+def release_stale_claims(older_than):
+    """
+    Devolve para 'running' as requisições presas em 'processing' sem heartbeat
+    (renew_claim) há mais de older_than segundos (ex.: worker reiniciado
+    durante o pós-processamento).
+
+    Returns:
+        int: Número de requisições liberadas
+    """
+    limit = timezone.now() - timedelta(seconds=older_than)
+    return GameRequest.objects.filter(execution_status='processing', status_checked_at__lt=limit).update(
+        execution_status='running'
+    )
+
+
+# ============================================================================
+# WEBHOOKS
+# ============================================================================
+
+def sign_payload(body):
+    """Calcula a assinatura HMAC-SHA256 (hex) do corpo bruto de um webhook"""
+    secret = settings.GAME_COLLECTOR_WEBHOOK_SECRET.encode('utf-8')
+    return hmac.new(secret, body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(body, signature):
+    """
+    Verifica a assinatura enviada no header X-Signature (aceita o prefixo 'sha256=').
+
+    Returns:
+        bool: True se o segredo estiver configurado e a assinatura for válida
+    """
+    if not settings.GAME_COLLECTOR_WEBHOOK_SECRET or not signature:
+        return False
+    if signature.startswith('sha256='):
+        signature = signature[len('sha256='):]
+    return hmac.compare_digest(sign_payload(body), signature.strip().lower())
+
+
+def build_webhook_urls(request):
+    """
+    Monta os URLs de webhook enviados no payload do /kickoff.
+
+    Usa GAME_COLLECTOR_WEBHOOK_BASE_URL (URL público do site) quando configurado;
+    caso contrário, o host da requisição atual. Sem GAME_COLLECTOR_WEBHOOK_SECRET
+    os webhooks ficam desativados (strings vazias) e o status é obtido apenas
+    pelo poller.
+
+    Returns:
+        dict: taskWebhookUrl, stepWebhookUrl e crewWebhookUrl
+    """
+    fields = {'task': 'taskWebhookUrl', 'step': 'stepWebhookUrl', 'crew': 'crewWebhookUrl'}
+    if not settings.GAME_COLLECTOR_WEBHOOK_SECRET:
+        return {field: "" for field in fields.values()}
+
+    base_url = settings.GAME_COLLECTOR_WEBHOOK_BASE_URL.rstrip('/')
+    urls = {}
+    for event, field in fields.items():
+        path = reverse('collector_webhook', kwargs={'event': event})
+        urls[field] = f"{base_url}{path}" if base_url else request.build_absolute_uri(path)
+    return urls
+
+
+def _run_and_release_connection(func, *args):
+    try:
+        func(*args)
+    except Exception:
+        logger.exception(f"Erro em tarefa de segundo plano {func.__name__}{args[:1]}")
+    finally:
+        # Cada thread usa sua própria conexão com o banco; fechá-la ao terminar
+        connection.close()
+
+
+def run_in_background(func, *args):
+    """
+    Executa func(*args) fora da thread da requisição, em um pool de threads
+    compartilhado pelo processo.
+    """
+    global _executor
+    if _executor is None:
+        with _session_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='collector')
+    return _executor.submit(_run_and_release_connection, func, *args)
@@ -0,0 +1,257 @@
+"""
+Conexões com o banco em produção com vários workers do Gunicorn.
+
+SQLite: ajustes aplicados pelo receiver de connection_created (games/signals.py) a cada nova
+conexão, conforme SQLITE_TUNING, SQLITE_PRAGMAS e SQLITE_TRANSACTION_MODE:
+
+    - PRAGMAs (journal_mode=WAL, synchronous, mmap_size, cache_size,
+      busy_timeout): leituras não esperam escritas e uma escrita espera o lock
+      por até busy_timeout em vez de falhar na hora;
+    - BEGIN IMMEDIATE nos blocos transaction.atomic(): com o BEGIN padrão
+      (DEFERRED) uma transação que lê e depois escreve precisa promover o seu
+      lock, e o SQLite recusa a promoção com "database is locked" sem consultar
+      o busy_timeout se outra conexão já está escrevendo. Reservando o lock de
+      escrita no BEGIN a transação apenas espera a sua vez.
+
+O Django 4.2 não tem uma opção para o modo do BEGIN (OPTIONS["transaction_mode"]
+só existe a partir do 5.1), então ele é trocado na própria conexão.
+
+PostgreSQL: pool de conexões por processo (ConnectionPool), usado pelo backend
+games.backends.postgresql quando DB_POOL=True. O Django 4.2 não tem pool
+próprio: sem ele cada requisição (ou cada thread, com CONN_MAX_AGE) abre a sua
+conexão, pagando TCP + autenticação a cada vez.
+"""
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connections
+
+logger = logging.getLogger(__name__)
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+def sqlite_pragmas():
+    """
+    PRAGMAs configurados para as conexões SQLite.
+
+    Returns:
+        dict: nome -> valor ({} com SQLITE_TUNING desativado)
+    """
+    if not settings.SQLITE_TUNING:
+        return {}
+    return {name: value for name, value in settings.SQLITE_PRAGMAS.items() if value not in (None, '')}
+
+
+def transaction_mode():
+    """Modo do BEGIN dos blocos atomic (DEFERRED com SQLITE_TUNING desativado)"""
+    if not settings.SQLITE_TUNING:
+        return 'DEFERRED'
+    mode = str(settings.SQLITE_TRANSACTION_MODE).upper()
+    if mode not in TRANSACTION_MODES:
+        raise ValueError(f"SQLITE_TRANSACTION_MODE inválido: {mode} (use {', '.join(TRANSACTION_MODES)})")
+    return mode
+
+
+def _begin(connection):
+    """Substitui DatabaseWrapper._start_transaction_under_autocommit (BEGIN dos blocos atomic)"""
+    connection.cursor().execute(f'BEGIN {transaction_mode()}')
+
+
+def configure_sqlite(connection):
+    """
+    Aplica os PRAGMAs e o modo de transação a uma conexão SQLite recém-aberta.
+
+    Args:
+        connection: DatabaseWrapper do Django (vendor 'sqlite')
+    """
+    with connection.cursor() as cursor:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+    # O wrapper é reaproveitado entre reconexões: troca o BEGIN uma única vez;
+    # o modo é lido a cada transação
+    if '_start_transaction_under_autocommit' not in vars(connection):
+        connection._start_transaction_under_autocommit = lambda: _begin(connection)
+
+
+def current_settings(connection):
+    """
+    Valores efetivos da conexão (para conferência e para o benchmark_db).
+
+    Returns:
+        dict: journal_mode, synchronous, mmap_size, cache_size, busy_timeout e transaction_mode
+    """
+    values = {}
+    with connection.cursor() as cursor:
+        for name in ('journal_mode', 'synchronous', 'mmap_size', 'cache_size', 'busy_timeout'):
+            cursor.execute(f'PRAGMA {name}')
+            row = cursor.fetchone()
+            values[name] = row[0] if row else None
+    values['transaction_mode'] = transaction_mode()
+    return values
+
+
+# ============================================================================
+# POOL DE CONEXÕES (PostgreSQL, DB_POOL=True)
+# ============================================================================
+
+class PoolTimeout(OperationalError):
+    """Nenhuma conexão do pool ficou livre dentro de DB_POOL_TIMEOUT (tratado como banco indisponível)"""
+
+
+class ConnectionPool:
+    """
+    Pool de conexões abertas, compartilhado pelas threads de um processo.
+
+    Usado pelo backend games.backends.postgresql: o Django pede uma conexão ao
+    pool onde abriria uma nova e a devolve onde a fecharia (fim da requisição,
+    CONN_MAX_AGE = 0). As conexões ociosas são reaproveitadas da mais recente
+    para a mais antiga, e as que passaram de max_idle/max_lifetime são fechadas.
+    """
+
+    def __init__(self, max_size=10, timeout=10, max_idle=300, max_lifetime=3600):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.pid = os.getpid()
+        self._idle = []  # (conexão, aberta em, devolvida em), mais recente no fim
+        self._opened_at = {}  # id(conexão) -> aberta em, para as conexões em uso
+        self._size = 0  # conexões abertas: ociosas + em uso
+        self._closed = False
+        self.opened = 0  # conexões abertas desde a criação do pool
+        self._condition = threading.Condition()
+
+    def _expired(self, opened_at, returned_at, now):
+        return (
+            (self.max_lifetime and now - opened_at > self.max_lifetime)
+            or (self.max_idle and now - returned_at > self.max_idle)
+        )
+
+    def getconn(self, connect, check=None):
+        """
+        Conexão ociosa do pool ou, se não houver e o pool não estiver cheio, uma
+        nova aberta por connect().
+
+        Args:
+            connect: Função que abre uma conexão nova
+            check: Função opcional que testa uma conexão ociosa antes de entregá-la
+
+        Returns:
+            Conexão do driver (psycopg)
+
+        Raises:
+            PoolTimeout: Se o pool continuar cheio por mais de timeout segundos
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._condition:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout(
+                            f'Nenhuma das {self.max_size} conexões do pool ficou livre em {self.timeout}s'
+                        )
+                    self._condition.wait(remaining)
+                if self._idle:
+                    conn, opened_at, returned_at = self._idle.pop()
+                else:
+                    conn = None
+                    self._size += 1
+                    self.opened += 1
+
+            if conn is None:
+                try:
+                    conn = connect()
+                except BaseException:
+                    self._discard(None)
+                    raise
+                self._opened_at[id(conn)] = time.monotonic()
+                return conn
+
+            if self._expired(opened_at, returned_at, time.monotonic()) or (check and not check(conn)):
+                self._discard(conn)
+                continue
+            self._opened_at[id(conn)] = opened_at
+            return conn
+
+    def putconn(self, conn, discard=False):
+        """Devolve uma conexão ao pool (ou a fecha, se discard, fechada ou expirada)"""
+        opened_at = self._opened_at.pop(id(conn), None)
+        now = time.monotonic()
+        if discard or self._closed or opened_at is None or conn.closed or self._expired(opened_at, now, now):
+            self._discard(conn)
+            return
+        with self._condition:
+            self._idle.append((conn, opened_at, now))
+            self._condition.notify()
+
+    def _discard(self, conn):
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception as e:
+                logger.debug(f"Erro ao fechar conexão descartada do pool: {e}")
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def close(self):
+        """Fecha as conexões ociosas (as em uso são fechadas ao serem devolvidas)"""
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._closed = True
+        for conn, _, _ in idle:
+            self._discard(conn)
+
+    def stats(self):
+        """Conexões abertas agora, ociosas, em uso e abertas no total (para logs e benchmarks)"""
+        with self._condition:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'opened': self.opened,
+            }
+
+
+_pools = {}  # alias -> ConnectionPool
+_inherited_pools = []  # pools herdados via fork: mantidos sem fechar (ver get_pool)
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, options):
+    """
+    Pool do processo atual para o banco alias, criado na primeira chamada com
+    as opções de DATABASES[alias]['POOL'].
+
+    Um pool herdado do processo pai (fork) não é usado nem fechado: as conexões
+    dele pertencem ao pai, e fechá-las aqui encerraria as sessões do pai.
+    """
+    pool = _pools.get(alias)
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None or pool.pid != os.getpid():
+            if pool is not None:
+                _inherited_pools.append(pool)
+            pool = _pools[alias] = ConnectionPool(**options)
+        return pool
+
+
+def close_connection_pools():
+    """
+    Fecha as conexões do processo: as de cada thread e as ociosas dos pools.
+    Chamado no mestre do Gunicorn antes de criar os workers (games/warmup.py).
+    """
+    connections.close_all()
+    with _pools_lock:
+        pools = [pool for pool in _pools.values() if pool.pid == os.getpid()]
+        _pools.clear()
+    for pool in pools:
+        pool.close()
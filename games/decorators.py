@@ -0,0 +1,50 @@
+"""
+Decorators para views assíncronas (async def).
+
+No Django 4.2, user_passes_test e require_http_methods envolvem a view em uma
+função síncrona, e o Django passa a tratá-la como view síncrona (a corrotina
+nunca seria aguardada). As versões abaixo mantêm o mesmo comportamento, mas
+preservam a view como corrotina.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.http import HttpResponseNotAllowed
+from django.shortcuts import resolve_url
+from django.utils.log import log_response
+
+
+def async_user_passes_test(test_func, login_url=None):
+    """
+    Equivalente assíncrono de user_passes_test: redireciona para login_url
+    quando test_func(request.user) é falso. O teste roda fora do event loop,
+    pois carregar request.user consulta a sessão no banco.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        async def _wrapped_view(request, *args, **kwargs):
+            if await sync_to_async(test_func)(request.user):
+                return await view_func(request, *args, **kwargs)
+            return redirect_to_login(request.get_full_path(), resolve_url(login_url or settings.LOGIN_URL))
+        return _wrapped_view
+    return decorator
+
+
+def async_require_http_methods(request_method_list):
+    """Equivalente assíncrono de django.views.decorators.http.require_http_methods"""
+    def decorator(func):
+        @wraps(func)
+        async def inner(request, *args, **kwargs):
+            if request.method not in request_method_list:
+                response = HttpResponseNotAllowed(request_method_list)
+                log_response(
+                    'Method Not Allowed (%s): %s', request.method, request.path,
+                    response=response,
+                    request=request,
+                )
+                return response
+            return await func(request, *args, **kwargs)
+        return inner
+    return decorator
@@ -0,0 +1,94 @@
+"""
+Exportação do catálogo de jogos ativos em fluxo, para mirrors, nós de borda e
+análises externas.
+
+Usado pelo comando export_catalog e pela view api_export_catalog. As linhas são
+lidas com .iterator(chunk_size=...) (cursor do lado do servidor no PostgreSQL)
+e serializadas uma a uma, então a memória não cresce com o tamanho do catálogo.
+
+Formatos:
+    - 'ndjson':  um objeto JSON por linha
+    - 'msgpack': sequência de mapas MessagePack (requer o pacote msgpack)
+
+Por padrão a saída é comprimida com gzip (compatível com gunzip/zcat).
+"""
+import json
+import zlib
+
+try:
+    import msgpack
+except ImportError:  # dependência opcional, apenas para o formato msgpack
+    msgpack = None
+
+EXPORT_FIELDS = ('id', 'title', 'slug', 'description', 'cover_image', 'rom_url', 'created_at', 'updated_at')
+EXPORT_FORMATS = ('ndjson', 'msgpack')
+CONTENT_TYPES = {'ndjson': 'application/x-ndjson', 'msgpack': 'application/x-msgpack'}
+FLUSH_SIZE = 64 * 1024  # bytes acumulados antes de entregar um bloco
+
+
+class ExportFormatError(ValueError):
+    """Formato de exportação desconhecido ou indisponível neste ambiente"""
+
+
+def check_format(export_format):
+    if export_format not in EXPORT_FORMATS:
+        raise ExportFormatError(f"Formato '{export_format}' inválido. Use: {', '.join(EXPORT_FORMATS)}.")
+    if export_format == 'msgpack' and msgpack is None:
+        raise ExportFormatError("O formato 'msgpack' requer o pacote msgpack (pip install msgpack).")
+
+
+def iter_catalog_rows(chunk_size=2000):
+    """Jogos ativos como dicionários, em ordem de id, lidos em blocos de chunk_size"""
+    from .models import Game
+
+    rows = Game.objects.filter(is_active=True).order_by('pk').values_list(*EXPORT_FIELDS)
+    for values in rows.iterator(chunk_size=chunk_size):
+        row = dict(zip(EXPORT_FIELDS, values))
+        row['created_at'] = row['created_at'].isoformat()
+        row['updated_at'] = row['updated_at'].isoformat()
+        yield row
+
+
+def iter_encoded(rows, export_format):
+    """Serializa as linhas no formato escolhido, agrupando em blocos de ~FLUSH_SIZE bytes"""
+    if export_format == 'msgpack':
+        packer = msgpack.Packer()
+        encode = packer.pack
+    else:
+        dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+        encode = lambda row: (dumps(row) + '\n').encode('utf-8')  # noqa: E731
+
+    block = bytearray()
+    for row in rows:
+        block += encode(row)
+        if len(block) >= FLUSH_SIZE:
+            yield bytes(block)
+            block.clear()
+    if block:
+        yield bytes(block)
+
+
+def iter_gzip(blocks, level=6):
+    """Comprime um fluxo de blocos de bytes no formato gzip"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for block in blocks:
+        compressed = compressor.compress(block)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def iter_export(export_format='ndjson', compress=True, chunk_size=2000):
+    """
+    Gera o catálogo exportado em blocos de bytes.
+
+    Raises:
+        ExportFormatError: Se o formato for inválido ou o msgpack não estiver instalado
+    """
+    check_format(export_format)
+    blocks = iter_encoded(iter_catalog_rows(chunk_size), export_format)
+    return iter_gzip(blocks) if compress else blocks
+
+
+def export_filename(export_format, compress=True):
+    return f"catalog.{export_format}{'.gz' if compress else ''}"
@@ -1,4 +1,5 @@
 from django import forms
+from . import similarity
 from .models import GameRequest
 
 
@@ -29,9 +30,38 @@ class GameRequestForm(forms.ModelForm):
         })
     )
     
+    confirm_new = forms.BooleanField(
+        required=False,
+        label="Nenhum destes é o jogo que eu quero, enviar mesmo assim",
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+    
     class Meta:
         model = GameRequest
         fields = ['title', 'details']
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Jogos do catálogo e pedidos pendentes parecidos com o título enviado
+        self.duplicates = []
+    
+    def clean(self):
+        """
+        Antes de aceitar o pedido, procura títulos parecidos no índice de
+        trigramas (catálogo + pedidos pendentes). Se houver, o pedido só é
+        aceito quando o usuário confirma que nenhuma sugestão serve.
+        """
+        cleaned_data = super().clean()
+        title = cleaned_data.get('title')
+        if title and not cleaned_data.get('confirm_new'):
+            self.duplicates = similarity.find_duplicates(title)
+            if self.duplicates:
+                self.add_error(
+                    'title',
+                    'Encontramos jogos parecidos já no catálogo ou já solicitados. '
+                    'Confira as sugestões abaixo antes de enviar.'
+                )
+        return cleaned_data
 
 
 class AdminGameRequestForm(forms.ModelForm):
@@ -0,0 +1,462 @@
+"""
+Importação do catálogo de jogos a partir de arquivos JSON grandes.
+
+Usado pelo comando load_initial_games. O arquivo é lido em fluxo, registro a
+registro, sem carregar o documento inteiro na memória:
+
+    - lista JSON:  [{"name": ...}, {"name": ...}, ...]
+    - NDJSON:      um objeto por linha (ou objetos apenas separados por espaços)
+
+Os registros são processados em lotes: cada lote busca os jogos já existentes
+pela chave de conteúdo (content_key) e pelo slug, com consultas aos índices
+unique, e grava tudo com bulk_create/bulk_update.
+
+Cada lote é confirmado na sua própria transação e o progresso (offset em bytes
+e índice do último registro) é salvo em um arquivo de checkpoint
+(ImportCheckpoint), para que uma importação interrompida seja retomada de onde
+parou. A conversão/validação dos lotes pode ser feita em um pool de processos
+(parse_records / parse_line_range) enquanto um único processo grava no banco.
+"""
+import codecs
+import hashlib
+import json
+import os
+
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .slugs import allocate_slugs
+from .utils import build_content_key
+
+READ_SIZE = 1 << 20  # bytes lidos do arquivo por vez
+_WHITESPACE = ' \t\n\r'
+_BOM = codecs.BOM_UTF8
+
+
+class JsonRecordReader:
+    """
+    Lê os objetos de uma lista JSON ou de um arquivo NDJSON incrementalmente.
+
+    Iterar devolve (registro, offset), em que offset é a posição (em bytes) do
+    arquivo logo após o registro. Para retomar a leitura depois de um registro,
+    informe esse offset e o formato já detectado (self.format).
+    """
+
+    def __init__(self, path, offset=0, format=None, read_size=READ_SIZE):
+        if offset and format not in ('array', 'lines'):
+            raise ValueError('Para retomar a leitura a partir de um offset é preciso informar o formato.')
+        self.path = path
+        self.start_offset = offset
+        self.read_size = read_size
+        self.format = format  # 'array' ou 'lines', detectado pelo primeiro caractere
+
+    def __iter__(self):
+        decoder = json.JSONDecoder()
+        utf8 = codecs.getincrementaldecoder('utf-8')()
+
+        with open(self.path, 'rb') as f:
+            offset = self.start_offset
+            resuming = offset > 0
+            if resuming:
+                f.seek(offset)
+            elif f.read(len(_BOM)) == _BOM:
+                offset = len(_BOM)
+            else:
+                f.seek(0)
+
+            buf, pos, eof = '', 0, False
+
+            def fill():
+                """Descarta o trecho já consumido e lê mais do arquivo; False se já estava no fim"""
+                nonlocal buf, pos, eof
+                if eof:
+                    return False
+                data = f.read(self.read_size)
+                if not data:
+                    eof = True
+                buf = buf[pos:] + utf8.decode(data, final=eof)
+                pos = 0
+                return True
+
+            def skip_whitespace():
+                """Avança até o próximo caractere significativo; None no fim do arquivo"""
+                nonlocal pos, offset
+                while True:
+                    start = pos
+                    while pos < len(buf) and buf[pos] in _WHITESPACE:
+                        pos += 1
+                    offset += pos - start  # espaços são ASCII: 1 byte cada
+                    if pos < len(buf):
+                        return buf[pos]
+                    if not fill():
+                        return None
+
+            def advance(count):
+                nonlocal pos, offset
+                offset += len(buf[pos:pos + count].encode('utf-8'))
+                pos += count
+
+            def decode_value():
+                while True:
+                    try:
+                        value, end = decoder.raw_decode(buf, pos)
+                    except json.JSONDecodeError as e:
+                        if fill():
+                            continue
+                        raise ValueError(f'JSON inválido perto do byte {offset}: {e.msg}')
+                    # Um valor que termina junto com o buffer pode estar truncado (ex.: números)
+                    if end == len(buf) and not eof:
+                        fill()
+                        continue
+                    advance(end - pos)
+                    return value
+
+            if not resuming:
+                first = skip_whitespace()
+                if first is None:
+                    return
+                self.format = 'array' if first == '[' else 'lines'
+
+            if self.format == 'lines':
+                while skip_whitespace() is not None:
+                    yield decode_value(), offset
+                return
+
+            # Retomando após um registro da lista: o próximo caractere é ',' ou ']'
+            expect_separator = resuming
+            if not resuming:
+                advance(1)  # '['
+                if skip_whitespace() == ']':
+                    advance(1)
+                    expect_separator = None
+            while expect_separator is not None:
+                if expect_separator:
+                    separator = skip_whitespace()
+                    if separator == ']':
+                        advance(1)
+                        break
+                    if separator != ',':
+                        raise ValueError(f"JSON inválido no byte {offset}: esperado ',' ou ']'.")
+                    advance(1)
+                if skip_whitespace() is None:
+                    raise ValueError(f'Fim inesperado do arquivo no byte {offset}: lista JSON não foi fechada.')
+                yield decode_value(), offset
+                expect_separator = True
+            if skip_whitespace() is not None:
+                raise ValueError(f'Conteúdo inesperado após o fim da lista JSON (byte {offset}).')
+
+
+def detect_format(path):
+    """Retorna 'array' ou 'lines' pelo primeiro caractere significativo do arquivo (None se vazio)"""
+    with open(path, 'rb') as f:
+        head = f.read(4096).lstrip(_BOM + b' \t\r\n')
+    if not head:
+        return None
+    return 'array' if head[:1] == b'[' else 'lines'
+
+
+def iter_line_ranges(path, offset, batch_size):
+    """
+    Divide um arquivo NDJSON (um objeto por linha) em faixas de bytes com até
+    batch_size registros, sem decodificar o JSON: cada faixa é lida e
+    convertida por parse_line_range em outro processo.
+
+    Yields:
+        tuple: (início, fim, quantidade de registros) de cada faixa
+    """
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        if offset == 0 and f.read(len(_BOM)) != _BOM:
+            f.seek(0)
+        start = f.tell()
+        count = 0
+        for line in iter(f.readline, b''):
+            if line.strip():
+                count += 1
+                if count == batch_size:
+                    end = f.tell()
+                    yield start, end, count
+                    start, count = end, 0
+        if count:
+            yield start, f.tell(), count
+
+
+def parse_records(records):
+    """
+    Converte uma lista de (índice, registro) com parse_game_record.
+
+    Returns:
+        tuple: (lista de (índice, campos), lista de (índice, nome, motivo) dos ignorados)
+    """
+    parsed, errors = [], []
+    for index, game_data in records:
+        try:
+            parsed.append((index, parse_game_record(game_data)))
+        except ValueError as e:
+            name = game_data.get('name') if isinstance(game_data, dict) else None
+            errors.append((index, name, str(e)))
+    return parsed, errors
+
+
+def parse_line_range(path, start, end, first_index):
+    """
+    Lê e converte as linhas NDJSON entre os bytes start e end (para o pool de processos).
+
+    Raises:
+        ValueError: Se alguma linha não for JSON válido
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    records = []
+    index = first_index
+    position = start
+    for line in data.splitlines(keepends=True):
+        if line.strip():
+            try:
+                records.append((index, json.loads(line)))
+            except ValueError as e:
+                raise ValueError(f'JSON inválido na linha que começa no byte {position}: {e}')
+            index += 1
+        position += len(line)
+    return parse_records(records)
+
+
+class ImportCheckpoint:
+    """
+    Progresso de uma importação, salvo em JSON após cada lote confirmado.
+
+    Guarda um hash dos bytes imediatamente anteriores ao offset salvo: o trecho
+    já importado não pode mudar (o offset deixaria de apontar para o fim de um
+    registro), mas o restante do arquivo pode ser corrigido antes do --resume.
+    """
+
+    WINDOW = 4096  # bytes antes do offset usados na verificação
+
+    def __init__(self, path, source):
+        self.path = path
+        self.source = str(source)
+        self.format = None
+        self.offset = 0
+        self.index = 0
+        self.counts = {}
+
+    def fingerprint(self, offset):
+        start = max(0, offset - self.WINDOW)
+        with open(self.source, 'rb') as f:
+            f.seek(start)
+            return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def load(self):
+        """
+        Lê o checkpoint salvo.
+
+        Raises:
+            ValueError: Se o checkpoint for de outro arquivo ou o arquivo mudou desde então
+        """
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('source') != self.source or data.get('fingerprint') != self.fingerprint(data['offset']):
+            raise ValueError(
+                f'O checkpoint {self.path} não corresponde ao arquivo {self.source} '
+                f'(o trecho já importado foi alterado?).'
+            )
+        self.format = data['format']
+        self.offset = data['offset']
+        self.index = data['index']
+        self.counts = data.get('counts', {})
+
+    def save(self, format, offset, index, counts):
+        """Grava o progresso de forma atômica (arquivo temporário + os.replace)"""
+        self.format, self.offset, self.index, self.counts = format, offset, index, dict(counts)
+        data = {
+            'source': self.source,
+            'fingerprint': self.fingerprint(offset),
+            'format': format,
+            'offset': offset,
+            'index': index,
+            'counts': self.counts,
+        }
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if self.exists():
+            os.remove(self.path)
+
+
+def generate_description(game_title):
+    """Descrição padrão para jogos importados sem descrição"""
+    return f'Jogo retro clássico: {game_title}. Desfrute desta experiência nostálgica!'
+
+
+def parse_game_record(game_data):
+    """
+    Converte um registro do JSON nos campos do modelo Game.
+
+    Mapeamento: name -> title, src -> rom_url (e content_key), image -> cover_image,
+    description -> description (gerada se ausente), slug a partir do title.
+
+    Returns:
+        dict: Campos do jogo
+
+    Raises:
+        ValueError: Se o registro não puder ser importado (motivo na mensagem)
+    """
+    if not isinstance(game_data, dict):
+        raise ValueError('registro não é um objeto JSON')
+
+    title = str(game_data.get('name') or '').strip()
+    if not title:
+        raise ValueError('sem título')
+
+    slug = slugify(title)
+    if not slug:
+        raise ValueError(f'não foi possível gerar slug a partir de "{title}"')
+
+    rom_url = str(game_data.get('src') or '').strip()
+    return {
+        'slug': slug,
+        'title': title,
+        'rom_url': rom_url,
+        'content_key': build_content_key(rom_url),
+        'cover_image': str(game_data.get('image') or '').strip(),
+        'description': str(game_data.get('description') or '').strip() or generate_description(title),
+    }
+
+
+def apply_changes(game, fields, rename=True):
+    """
+    Atualiza um jogo existente com os campos importados, com as mesmas regras
+    de sempre: título (se rename), URLs apenas quando informadas, descrição
+    apenas se a atual estiver vazia ou for a padrão, e o jogo volta a ficar ativo.
+
+    Returns:
+        list: Nomes dos campos alterados
+    """
+    changed = []
+    title = fields['title']
+
+    if rename and game.title != title:
+        game.title = title
+        changed.append('title')
+
+    if fields['rom_url'] and game.rom_url != fields['rom_url']:
+        game.rom_url = fields['rom_url']
+        changed.append('rom_url')
+
+    if fields['content_key'] and game.content_key != fields['content_key']:
+        game.content_key = fields['content_key']
+        changed.append('content_key')
+
+    if fields['cover_image'] and game.cover_image != fields['cover_image']:
+        game.cover_image = fields['cover_image']
+        changed.append('cover_image')
+
+    if not game.description or game.description == generate_description(game.title):
+        if fields['description'] != generate_description(title):
+            game.description = fields['description']
+            changed.append('description')
+
+    if not game.is_active:
+        game.is_active = True
+        changed.append('is_active')
+
+    return changed
+
+
+def import_chunk(parsed, batch_size=1000):
+    """
+    Grava um lote de registros já convertidos por parse_game_record.
+
+    A identidade de um jogo é a chave de conteúdo (content_key, derivada de
+    rom_url): duas consultas pelos índices unique buscam os jogos existentes
+    pelas chaves e, para registros sem jogo com a mesma chave, pelos slugs.
+
+    - mesma chave: é o mesmo jogo, ainda que com outro título (o título
+      existente é mantido, os demais campos seguem apply_changes);
+    - mesmo slug, sem chave ou com a mesma chave: atualiza esse jogo;
+    - mesmo slug com outra ROM: é outro jogo, criado com slug -N.
+
+    Os novos são inseridos com bulk_create e os alterados com bulk_update,
+    que não disparam os sinais de Game: CatalogVersion.bump() fica a cargo de
+    quem chama, uma vez por importação (ver load_initial_games). Registros repetidos no lote (mesma chave, ou mesmo slug sem chave):
+    vale o último, e os anteriores são contados como 'skipped'.
+
+    Args:
+        parsed (list): Lista de (índice, campos)
+        batch_size (int): Tamanho dos lotes de INSERT/UPDATE
+
+    Returns:
+        list: (índice, título, 'created' | 'updated' | 'unchanged' | 'skipped', detalhe),
+        com os campos alterados como detalhe em 'updated' e o motivo em 'skipped'
+    """
+    from .models import Game  # importado aqui: as funções de conversão rodam em outros processos
+
+    by_identity = {}
+    results = []
+    for index, fields in parsed:
+        identity = ('key', fields['content_key']) if fields['content_key'] else ('slug', fields['slug'])
+        replaced = by_identity.get(identity)
+        if replaced is not None:
+            results.append((replaced[0], replaced[1]['title'], 'skipped', f'repetido no lote, vale o registro #{index}'))
+        by_identity[identity] = (index, fields)
+
+    keys = [value for kind, value in by_identity if kind == 'key']
+    existing_by_key = Game.objects.in_bulk(keys, field_name='content_key') if keys else {}
+    slugs = {
+        fields['slug'] for index, fields in by_identity.values()
+        if fields['content_key'] not in existing_by_key
+    }
+    existing_by_slug = Game.objects.in_bulk(list(slugs), field_name='slug') if slugs else {}
+    now = timezone.now()
+
+    claimed = set()
+    to_create, to_update, update_fields = [], [], set()
+    for index, fields in by_identity.values():
+        game = existing_by_key.get(fields['content_key'])
+        rename = game is None
+        if game is None:
+            game = existing_by_slug.get(fields['slug'])
+            if game is not None and (game.pk in claimed or game.content_key not in (None, fields['content_key'])):
+                game = None
+
+        if game is None:
+            to_create.append(Game(
+                title=fields['title'],
+                description=fields['description'],
+                cover_image=fields['cover_image'] or None,
+                rom_url=fields['rom_url'] or None,
+                content_key=fields['content_key'],
+                is_active=True,
+            ))
+            results.append((index, fields['title'], 'created', []))
+            continue
+
+        claimed.add(game.pk)
+        changed = apply_changes(game, fields, rename=rename)
+        if changed:
+            game.updated_at = now  # bulk_update não aplica auto_now
+            to_update.append(game)
+            update_fields.update(changed)
+            results.append((index, game.title, 'updated', changed))
+        else:
+            results.append((index, game.title, 'unchanged', []))
+
+    if to_create:
+        # Slugs reservados para o lote inteiro (games/slugs.py): sem colisões no INSERT
+        for game, slug in zip(to_create, allocate_slugs([game.title for game in to_create])):
+            game.slug = slug
+        Game.objects.bulk_create(to_create, batch_size=batch_size)
+    if to_update:
+        Game.objects.bulk_update(to_update, sorted(update_fields | {'updated_at'}), batch_size=batch_size)
+
+    return results
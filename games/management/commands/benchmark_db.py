@@ -0,0 +1,180 @@
+"""
+Management command Django que mede a vazão do SQLite com vários processos
+simultâneos, com e sem os ajustes de games/db.py.
+
+Propósito:
+    Simula workers do Gunicorn lendo o catálogo e os pedidos e gravando pedidos
+    (criação como em request_game e mudança de status como no acompanhamento da
+    coleta, ambos em transaction.atomic) ao mesmo tempo. Cada configuração roda
+    sobre uma cópia do banco (o banco original não é alterado) e o resultado
+    mostra operações por segundo, latências e erros "database is locked".
+
+    Requer dados: use generate_load_data antes em um banco vazio.
+
+Uso:
+    # Padrão do Django x ajustado (SQLITE_PRAGMAS/SQLITE_TRANSACTION_MODE)
+    python manage.py benchmark_db
+
+    # Mais processos, mais escritas e por mais tempo
+    python manage.py benchmark_db --processes 16 --write-ratio 0.3 --duration 20
+"""
+
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+from django.test.utils import override_settings
+
+from games import db
+from games.models import Game, GameRequest
+
+# Configurações comparadas: (rótulo, settings sobrescritos)
+PROFILES = (
+    ('padrão do Django', {'SQLITE_TUNING': False}),
+    ('ajustado', {'SQLITE_TUNING': True}),
+)
+STATUSES = ('pending', 'approved', 'rejected')
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def _worker(seed, deadline, write_ratio, slugs, user_ids, request_ids, results):
+    """Processo de carga: lê e grava até deadline e envia as medições pela fila"""
+    rng = random.Random(seed)
+    latencies = {'read': [], 'write': []}
+    errors = 0
+    try:
+        while time.time() < deadline:
+            kind = 'write' if rng.random() < write_ratio else 'read'
+            start = time.perf_counter()
+            try:
+                if kind == 'read':
+                    Game.objects.filter(slug=rng.choice(slugs), is_active=True).first()
+                    list(GameRequest.objects.filter(user_id=rng.choice(user_ids))
+                         .defer('ai_response_blob').order_by('-created_at')[:20])
+                elif rng.random() < 0.5:
+                    # Como request_game: cria o pedido e atualiza os contadores do usuário
+                    with transaction.atomic():
+                        GameRequest(user_id=rng.choice(user_ids), title='Benchmark', status='pending').save()
+                else:
+                    # Como o acompanhamento da coleta: lê o pedido e grava o novo status
+                    with transaction.atomic():
+                        game_request = GameRequest.objects.defer('ai_response_blob').get(pk=rng.choice(request_ids))
+                        game_request.status = rng.choice(STATUSES)
+                        game_request.save(update_fields=['status', 'updated_at'])
+            except OperationalError:
+                errors += 1
+                continue
+            latencies[kind].append(time.perf_counter() - start)
+    finally:
+        connections.close_all()
+    results.put((latencies, errors))
+
+
+class Command(BaseCommand):
+    help = 'Compara a vazão de leituras e escritas simultâneas no SQLite com e sem os ajustes de games/db.py.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=8,
+            help='Processos simultâneos, como workers do Gunicorn (padrão: 8).',
+        )
+        parser.add_argument(
+            '--duration', type=float, default=10,
+            help='Duração de cada configuração em segundos (padrão: 10).',
+        )
+        parser.add_argument(
+            '--write-ratio', type=float, default=0.2,
+            help='Fração das operações que são escritas (padrão: 0.2).',
+        )
+        parser.add_argument(
+            '--seed', type=int, default=42,
+            help='Semente das operações sorteadas (padrão: 42).',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('benchmark_db mede apenas o SQLite (DATABASE_URL=sqlite:///...).')
+        if options['processes'] < 1 or options['duration'] <= 0:
+            raise CommandError('--processes e --duration devem ser maiores que zero.')
+        if not 0 <= options['write_ratio'] <= 1:
+            raise CommandError('--write-ratio deve estar entre 0 e 1.')
+
+        slugs = list(Game.objects.filter(is_active=True).values_list('slug', flat=True)[:5000])
+        user_ids = list(GameRequest.objects.values_list('user_id', flat=True).distinct()[:1000])
+        request_ids = list(GameRequest.objects.values_list('pk', flat=True)[:5000])
+        if not (slugs and user_ids and request_ids):
+            raise CommandError('Sem dados para o benchmark. Gere-os antes com: python manage.py generate_load_data')
+
+        source = connection.settings_dict['NAME']
+        connections.close_all()
+        workdir = tempfile.mkdtemp(prefix='benchmark-db-')
+        try:
+            for label, overrides in PROFILES:
+                path = os.path.join(workdir, f'{len(os.listdir(workdir))}.sqlite3')
+                with sqlite3.connect(source) as original, sqlite3.connect(path) as copy:
+                    original.backup(copy)
+                    # O modo WAL fica gravado no arquivo: a cópia parte do modo padrão
+                    copy.execute('PRAGMA journal_mode = delete')
+                with override_settings(**overrides):
+                    self.run_profile(label, path, slugs, user_ids, request_ids, options)
+        finally:
+            connection.settings_dict['NAME'] = source
+            connections.close_all()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def run_profile(self, label, path, slugs, user_ids, request_ids, options):
+        connection.settings_dict['NAME'] = path
+        connection.ensure_connection()
+        effective = db.current_settings(connection)
+        # Os processos são criados com fork: nenhuma conexão aberta pode ser herdada
+        connections.close_all()
+
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        deadline = time.time() + options['duration']
+        processes = [
+            context.Process(
+                target=_worker,
+                args=(options['seed'] + index, deadline, options['write_ratio'], slugs, user_ids, request_ids, results),
+            )
+            for index in range(options['processes'])
+        ]
+        for process in processes:
+            process.start()
+        latencies = {'read': [], 'write': []}
+        errors = 0
+        for _ in processes:
+            process_latencies, process_errors = results.get()
+            for kind, values in process_latencies.items():
+                latencies[kind].extend(values)
+            errors += process_errors
+        for process in processes:
+            process.join()
+
+        self.stdout.write(self.style.SUCCESS(f'\n=== {label} ==='))
+        self.stdout.write(
+            f"journal_mode={effective['journal_mode']} synchronous={effective['synchronous']} "
+            f"mmap_size={effective['mmap_size']} cache_size={effective['cache_size']} "
+            f"busy_timeout={effective['busy_timeout']} BEGIN {effective['transaction_mode']}"
+        )
+        for kind, name in (('read', 'Leituras'), ('write', 'Escritas')):
+            values = latencies[kind]
+            self.stdout.write(
+                f'{name}: {len(values) / options["duration"]:.0f} ops/s '
+                f'(p50 {statistics.median(values) * 1000 if values else 0:.1f} ms, '
+                f'p99 {_percentile(values, 99) * 1000:.1f} ms)'
+            )
+        self.stdout.write(f'Erros "database is locked": {errors}')
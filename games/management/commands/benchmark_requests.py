@@ -0,0 +1,161 @@
+"""
+Management command Django que mede a latência das requisições e quantas
+conexões com o banco elas abrem, com a configuração de banco atual.
+
+Propósito:
+    Passa requisições pelo stack completo do Django (middlewares, sinais de
+    início/fim de requisição que fecham ou reaproveitam a conexão) em várias
+    threads, como um worker com threads ou o perfil ASGI, e mostra p50/p99 e
+    o número de conexões abertas. Rodando uma vez para cada configuração
+    (CONN_MAX_AGE=0, conexões persistentes, DB_POOL=True) dá para ver o custo
+    de abrir a conexão sair da latência típica.
+
+    Por padrão usa a página de detalhe dos jogos ativos (game_detail), que
+    consulta o banco a cada requisição.
+
+Uso:
+    CONN_MAX_AGE=0 python manage.py benchmark_requests
+    CONN_MAX_AGE=60 python manage.py benchmark_requests
+    DB_POOL=True python manage.py benchmark_requests --threads 8
+
+    # Outras páginas
+    python manage.py benchmark_requests --path / --path /catalog/
+"""
+
+import itertools
+import statistics
+import threading
+import time
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.core.handlers.wsgi import WSGIHandler
+from django.urls import reverse
+
+from games.models import Game
+
+
+def _request(handler, host, path):
+    """
+    Requisição GET pelo WSGIHandler, como o Gunicorn faria. (O Client de testes
+    do Django não serve aqui: ele mantém a conexão aberta entre as requisições.)
+
+    Returns:
+        str: Status HTTP
+    """
+    environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'HTTP_HOST': host, 'SERVER_NAME': host}
+    setup_testing_defaults(environ)
+    status = []
+    response = handler(environ, lambda response_status, headers, exc_info=None: status.append(response_status))
+    try:
+        for _ in response:
+            pass
+    finally:
+        response.close()  # dispara request_finished (fecha ou devolve a conexão)
+    return status[0]
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+class Command(BaseCommand):
+    help = 'Mede a latência das requisições e as conexões abertas com o banco na configuração atual.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=2000,
+            help='Total de requisições, divididas entre as threads (padrão: 2000).',
+        )
+        parser.add_argument(
+            '--threads', type=int, default=1,
+            help='Threads simultâneas (padrão: 1).',
+        )
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help='Caminho a requisitar (repetível; padrão: detalhe de até 200 jogos ativos).',
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['threads'] < 1:
+            raise CommandError('--requests e --threads devem ser maiores que zero.')
+
+        paths = options['paths'] or [
+            reverse('game_detail', args=[slug])
+            for slug in Game.objects.filter(is_active=True).values_list('slug', flat=True)[:200]
+        ]
+        if not paths:
+            raise CommandError('Sem jogos ativos. Gere dados com: python manage.py generate_load_data')
+        connections.close_all()
+
+        host = next((host for host in settings.ALLOWED_HOSTS if host not in ('*', '') and not host.startswith('.')),
+                    'localhost')
+        opened = itertools.count()
+        counter_lock = threading.Lock()
+
+        def count_connection(sender, **kwargs):
+            with counter_lock:
+                next(opened)
+
+        connection_created.connect(count_connection)
+        latencies = []
+        failures = []
+        per_thread = -(-options['requests'] // options['threads'])
+
+        handler = WSGIHandler()
+
+        def run(offset):
+            thread_latencies = []
+            try:
+                for index in range(per_thread):
+                    path = paths[(offset + index) % len(paths)]
+                    start = time.perf_counter()
+                    status = _request(handler, host, path)
+                    thread_latencies.append(time.perf_counter() - start)
+                    if not status.startswith('200'):
+                        failures.append(f'{path}: HTTP {status}')
+            finally:
+                connections.close_all()
+                latencies.extend(thread_latencies)
+
+        # Aquecimento fora da medição (imports, templates, primeira conexão)
+        for path in paths[:5]:
+            _request(handler, host, path)
+        connections.close_all()
+        opened = itertools.count()
+        opened_before = connection.pool.stats()['opened'] if connection.settings_dict.get('POOL') else 0
+
+        threads = [threading.Thread(target=run, args=(index * per_thread,)) for index in range(options['threads'])]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        connection_created.disconnect(count_connection)
+
+        if failures:
+            raise CommandError(f'{len(failures)} requisições falharam, ex.: {failures[0]}')
+
+        database = connection.settings_dict
+        pool = database.get('POOL')
+        # Com o pool, connection_created dispara a cada conexão entregue pelo pool:
+        # conta-se o que o pool realmente abriu
+        opened_total = connection.pool.stats()['opened'] - opened_before if pool else next(opened)
+        self.stdout.write(self.style.SUCCESS(
+            f"\n=== {connection.vendor} | CONN_MAX_AGE={database['CONN_MAX_AGE']} "
+            f"CONN_HEALTH_CHECKS={database['CONN_HEALTH_CHECKS']} "
+            f"pool={'max_size=%d' % pool['max_size'] if pool else 'não'} ==="
+        ))
+        self.stdout.write(
+            f'{len(latencies)} requisições em {options["threads"]} threads: {len(latencies) / elapsed:.0f} req/s'
+        )
+        self.stdout.write(
+            f'Latência: p50 {statistics.median(latencies) * 1000:.2f} ms, '
+            f'p90 {_percentile(latencies, 90) * 1000:.2f} ms, p99 {_percentile(latencies, 99) * 1000:.2f} ms'
+        )
+        self.stdout.write(f'Conexões abertas com o banco: {opened_total}')
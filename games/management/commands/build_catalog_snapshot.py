@@ -0,0 +1,42 @@
+"""
+Management command Django que gera o snapshot compartilhado do catálogo.
+
+Propósito:
+    Grava (ou revalida) o arquivo mapeado em memória lido pelos workers do
+    Gunicorn nas views home, catalog e api_get_game_info (ver games/snapshot.py).
+    Normalmente não é necessário: o snapshot é regerado após alterações em Game,
+    pelas importações em massa e no aquecimento do Gunicorn.
+
+Uso:
+    # Regerar o snapshot
+    python manage.py build_catalog_snapshot
+
+    # Regerar só se o catálogo mudou
+    python manage.py build_catalog_snapshot --if-changed
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from games import snapshot
+
+
+class Command(BaseCommand):
+    help = 'Gera o snapshot do catálogo compartilhado entre os workers (mmap em CATALOG_SNAPSHOT_DIR).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--if-changed', action='store_true',
+            help='Regera apenas se o catálogo mudou desde o último snapshot.',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.CATALOG_SNAPSHOT_ENABLED:
+            raise CommandError('Snapshot do catálogo desativado (CATALOG_SNAPSHOT_ENABLED=False).')
+
+        if options['if_changed'] and not snapshot.refresh_snapshot():
+            self.stdout.write(f'✓ Snapshot já atualizado: {snapshot.snapshot_size()} jogos em {snapshot.snapshot_path()}')
+            return
+
+        count = snapshot.write_snapshot() if not options['if_changed'] else snapshot.snapshot_size()
+        self.stdout.write(self.style.SUCCESS(f'✅ Snapshot gravado: {count} jogos em {snapshot.snapshot_path()}'))
@@ -0,0 +1,79 @@
+"""
+Management command Django que exporta os jogos ativos do catálogo em fluxo.
+
+Propósito:
+    Gera um arquivo compacto para mirrors, nós de borda e análises, com memória
+    constante independentemente do tamanho do catálogo (ver games/export.py).
+    O mesmo conteúdo é servido por GET /api/catalog/export/.
+
+Uso:
+    # NDJSON comprimido com gzip (padrão)
+    python manage.py export_catalog --output catalog.ndjson.gz
+
+    # MessagePack sem compressão, na saída padrão
+    python manage.py export_catalog --format msgpack --no-gzip --output - > catalog.msgpack
+
+    # Conferir o conteúdo
+    zcat catalog.ndjson.gz | head
+"""
+
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from games.export import EXPORT_FORMATS, ExportFormatError, export_filename, iter_export
+
+
+class Command(BaseCommand):
+    help = 'Exporta os jogos ativos do catálogo em NDJSON ou MessagePack (gzip por padrão), em fluxo.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=EXPORT_FORMATS, default='ndjson',
+            help='Formato de saída (padrão: ndjson).',
+        )
+        parser.add_argument(
+            '--output',
+            help="Arquivo de saída; '-' para a saída padrão (padrão: catalog.<formato>[.gz]).",
+        )
+        parser.add_argument(
+            '--no-gzip', action='store_true',
+            help='Não comprimir a saída.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Linhas lidas do banco por vez (padrão: 2000).',
+        )
+
+    def handle(self, *args, **options):
+        compress = not options['no_gzip']
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size deve ser maior que zero.')
+        try:
+            blocks = iter_export(options['format'], compress=compress, chunk_size=options['chunk_size'])
+        except ExportFormatError as e:
+            raise CommandError(str(e))
+
+        output = options['output'] or export_filename(options['format'], compress)
+        to_stdout = output == '-'
+        tmp_path = f'{output}.tmp'
+        written = 0
+
+        # Gravar em arquivo temporário e renomear ao final: leitores nunca veem
+        # uma exportação pela metade
+        stream = sys.stdout.buffer if to_stdout else open(tmp_path, 'wb')
+        try:
+            for block in blocks:
+                stream.write(block)
+                written += len(block)
+            stream.flush()
+        except BaseException:
+            if not to_stdout:
+                stream.close()
+                os.remove(tmp_path)
+            raise
+        if not to_stdout:
+            stream.close()
+            os.replace(tmp_path, output)
+            self.stdout.write(self.style.SUCCESS(f'Catálogo exportado em {output} ({written} bytes).'))
@@ -0,0 +1,347 @@
+"""
+Management command Django que gera dados sintéticos para testes de carga.
+
+Propósito:
+    Popular o banco com volumes realistas de jogos, usuários e pedidos de jogos
+    (GameRequest) para medir planos de consulta e latência das páginas com 10
+    mil, 100 mil ou 1 milhão de linhas. Os dados são reproduzíveis: a mesma
+    --seed gera os mesmos títulos, status, datas e respostas da IA.
+
+    Tudo é gravado com bulk_create em lotes (uma transação por lote), sem
+    passar por save() nem pelos sinais. Por isso os campos que save() mantém
+    (slug, content_key, ai_query_key) e os contadores de UserRequestStats são
+    preenchidos aqui diretamente.
+
+    Registros gerados são identificáveis pelo prefixo (--prefix): usuários
+    '<prefixo>0000001', jogos com rom_url em https://<prefixo>.invalid/ e os
+    pedidos desses usuários. --clear remove apenas esses registros.
+
+Uso:
+    # 10k jogos, 1k usuários e 10k pedidos (padrão)
+    python manage.py generate_load_data
+
+    # 100k / 1M linhas
+    python manage.py generate_load_data --games 100000 --users 10000 --requests 100000
+    python manage.py generate_load_data --games 1000000 --users 50000 --requests 1000000
+
+    # Remover os dados gerados (e gerar de novo com outra semente)
+    python manage.py generate_load_data --clear --games 0 --users 0 --requests 0
+    python manage.py generate_load_data --clear --seed 7
+"""
+
+import random
+from datetime import timedelta
+from itertools import accumulate
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from games import snapshot
+from games.models import CatalogVersion, Game, GameRequest, RequestSearchResult, UserRequestStats
+from games.slugs import slug_base, slug_max_length
+from games.utils import build_content_key, normalize_search_term
+
+User = get_user_model()
+
+# Vocabulário dos títulos gerados: combinações suficientes para poucos títulos
+# repetidos mesmo com 1M de jogos, mas com palavras recorrentes (como no
+# catálogo real) para que buscas por icontains encontrem muitos resultados
+TITLE_PREFIXES = [
+    'Super', 'Mega', 'Ultra', 'Final', 'Legend of', 'Return of', 'Castle', 'Street', 'Dragon', 'Shadow',
+    'Crystal', 'Metal', 'Star', 'Space', 'Ninja', 'Power', 'Golden', 'Dark', 'Mystic', 'Turbo',
+    'Pocket', 'Tiny', 'Iron', 'Thunder', 'Cyber', 'Neo', 'Royal', 'Wild', 'Lost', 'Secret',
+]
+TITLE_NOUNS = [
+    'Mario', 'Sonic', 'Zelda', 'Kong', 'Metroid', 'Fighter', 'Quest', 'Warrior', 'Racer', 'Knight',
+    'Hunter', 'Saga', 'Adventure', 'Island', 'Kingdom', 'Blaster', 'Commando', 'Wrestling', 'Soccer', 'Tennis',
+    'Pinball', 'Puzzle', 'Tetris', 'Pac', 'Bomber', 'Ranger', 'Pilot', 'Galaxy', 'Dungeon', 'Empire',
+    'Revenge', 'Legacy', 'Frontier', 'Odyssey', 'Chronicles', 'Arena', 'Rally', 'Force', 'Squad', 'Tactics',
+]
+TITLE_SUFFIXES = ['', '', '', '', ' II', ' III', ' IV', ' Deluxe', ' Turbo', ' DX', ' 64', ' Advance', ' Gold', ' Remix']
+CONSOLES = [
+    'NES', 'SNES', 'Game Boy', 'Game Boy Color', 'Game Boy Advance', 'Nintendo 64', 'Mega Drive',
+    'Master System', 'PlayStation', 'Arcade', 'Neo Geo', 'Atari 2600', 'PC Engine', 'Nintendo DS',
+]
+DESCRIPTION_WORDS = (
+    'plataforma ação aventura fases chefes cooperativo clássico retro trilha itens mundo exploração '
+    'corrida luta puzzle estratégia tiro nave dungeon segredos power-ups multiplayer pixel arte'
+).split()
+
+# Distribuição de status dos pedidos (pesos aproximados de uma fila real)
+STATUS_WEIGHTS = {'pending': 40, 'submitting': 2, 'approved': 35, 'rejected': 23}
+# Tamanho (em nomes de jogos/tarefas) da resposta da IA: a maioria pequena,
+# poucas muito grandes, como acontece com execuções longas da API
+RESPONSE_SIZES = [(0, 45), (3, 35), (40, 17), (400, 3)]
+ADMIN_NOTES = ['', '', '', 'Jogo já disponível no catálogo.', 'ROM não encontrada.', 'Pedido duplicado.']
+DATE_SPAN_DAYS = 365
+
+
+class Command(BaseCommand):
+    help = 'Gera jogos, usuários e pedidos sintéticos (reproduzíveis por --seed) para testes de carga.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--games', type=int, default=10000, help='Jogos a criar (padrão: 10000).')
+        parser.add_argument('--users', type=int, default=1000, help='Usuários a criar (padrão: 1000).')
+        parser.add_argument('--requests', type=int, default=10000, help='Pedidos de jogos a criar (padrão: 10000).')
+        parser.add_argument(
+            '--results-per-request', type=int, default=3,
+            help='Resultados de busca (RequestSearchResult) por pedido aprovado com resposta (padrão: 3).',
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Semente do gerador (padrão: 42).')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Linhas por lote/transação (padrão: 1000).')
+        parser.add_argument(
+            '--prefix', default='loadtest',
+            help="Prefixo que identifica os dados gerados (padrão: 'loadtest').",
+        )
+        parser.add_argument('--clear', action='store_true', help='Remover os dados gerados antes de criar novos.')
+
+    def handle(self, *args, **options):
+        for option in ('games', 'users', 'requests', 'results_per_request'):
+            if options[option] < 0:
+                raise CommandError(f"--{option.replace('_', '-')} não pode ser negativo.")
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size deve ser maior que zero.')
+        if options['requests'] and not options['users']:
+            raise CommandError('Para gerar pedidos é preciso gerar usuários (--users).')
+
+        self.prefix = options['prefix']
+        self.seed = options['seed']
+        self.batch_size = options['batch_size']
+        self.rom_host = f'https://{self.prefix}.invalid/'
+        self.now = timezone.now()
+
+        if options['clear']:
+            self.clear()
+        elif options['users'] and self.generated_users().exists():
+            raise CommandError(
+                f"Já existem usuários com o prefixo '{self.prefix}'. Use --clear para removê-los ou outro --prefix."
+            )
+        elif options['games'] and self.generated_games().exists():
+            raise CommandError(
+                f"Já existem jogos com o prefixo '{self.prefix}'. Use --clear para removê-los ou outro --prefix."
+            )
+
+        self.generate_games(options['games'])
+        user_pks = self.generate_users(options['users'])
+        self.generate_requests(options['requests'], user_pks, options['results_per_request'])
+
+        if settings.CATALOG_SNAPSHOT_ENABLED and (options['games'] or options['clear']):
+            self.progress('Snapshot do catálogo', snapshot.write_snapshot(), Game.objects.filter(is_active=True).count())
+
+    def rng(self, stream):
+        """Gerador independente por tipo de dado: mudar --users não altera os jogos gerados"""
+        return random.Random(f'{self.seed}:{stream}')
+
+    def generated_users(self):
+        return User.objects.filter(username__startswith=self.prefix)
+
+    def generated_games(self):
+        return Game.objects.filter(rom_url__startswith=self.rom_host)
+
+    def random_date(self, rng):
+        """Data no último ano, mais densa nos meses recentes"""
+        age = DATE_SPAN_DAYS * (rng.random() ** 2)
+        return self.now - timedelta(days=age)
+
+    def random_title(self, rng):
+        return (
+            f'{rng.choice(TITLE_PREFIXES)} {rng.choice(TITLE_NOUNS)}{rng.choice(TITLE_SUFFIXES)}'
+            f' ({rng.choice(CONSOLES)})'
+        )
+
+    def batches(self, total):
+        for start in range(0, total, self.batch_size):
+            yield start, min(start + self.batch_size, total)
+
+    def progress(self, label, done, total):
+        self.stdout.write(f'{label}: {done}/{total}')
+
+    def clear(self):
+        """
+        Remove os dados gerados em lotes. Pedidos e jogos têm receivers de
+        post_delete, então cada lote é carregado e excluído separadamente para
+        manter a memória constante.
+        """
+        requests = GameRequest.objects.filter(user__username__startswith=self.prefix)
+        counts = {
+            'pedidos': self.delete_in_batches(requests),
+            'jogos': self.delete_in_batches(self.generated_games()),
+            'usuários': self.delete_in_batches(self.generated_users()),
+        }
+        summary = ', '.join(f'{count} {label}' for label, count in counts.items())
+        self.stdout.write(self.style.WARNING(f'🗑️  Dados gerados removidos: {summary}.'))
+
+    def delete_in_batches(self, queryset):
+        deleted_count = 0
+        while True:
+            pks = list(queryset.order_by().values_list('pk', flat=True)[:self.batch_size])
+            if not pks:
+                return deleted_count
+            queryset.model.objects.filter(pk__in=pks).delete()
+            deleted_count += len(pks)
+
+    def generate_games(self, total):
+        """
+        Cria os jogos. O slug leva o número sequencial do jogo gerado, então é
+        único sem consultar o banco (games.slugs.allocate_slugs faria consultas
+        por prefixo que ficam lentas justamente nos volumes que queremos medir).
+        """
+        if not total:
+            return
+        rng = self.rng('games')
+        max_length = slug_max_length()
+        for start, end in self.batches(total):
+            games = []
+            for number in range(start + 1, end + 1):
+                title = self.random_title(rng)
+                suffix = f'-{self.prefix}-{number}'
+                rom_url = f'{self.rom_host}embed/{number}'
+                games.append(Game(
+                    title=title,
+                    slug=slug_base(title, max_length - len(suffix)) + suffix,
+                    description=' '.join(rng.choices(DESCRIPTION_WORDS, k=rng.randint(8, 40))).capitalize() + '.',
+                    cover_image=f'{self.rom_host}covers/{number}.jpg' if rng.random() < 0.9 else None,
+                    rom_url=rom_url,
+                    content_key=build_content_key(rom_url),
+                    is_active=rng.random() < 0.95,
+                ))
+            with transaction.atomic():
+                Game.objects.bulk_create(games)
+                # created_at usa auto_now_add, ignorado pelo bulk_create: datas em um segundo passo
+                for game in games:
+                    game.created_at = game.updated_at = self.random_date(rng)
+                Game.objects.bulk_update(games, ['created_at', 'updated_at'])
+                CatalogVersion.bump()  # bulk_create não dispara os sinais de Game
+            self.progress('Jogos', end, total)
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} jogos criados.'))
+
+    def generate_users(self, total):
+        if not total:
+            return []
+        rng = self.rng('users')
+        # Mesmo hash para todos: senha inutilizável, sem o custo do PBKDF2 por usuário
+        password = make_password(None)
+        user_pks = []
+        for start, end in self.batches(total):
+            users = [
+                User(
+                    username=f'{self.prefix}{number:07d}',
+                    email=f'{self.prefix}{number:07d}@{self.prefix}.invalid',
+                    password=password,
+                    date_joined=self.now - timedelta(days=DATE_SPAN_DAYS + rng.random() * DATE_SPAN_DAYS),
+                )
+                for number in range(start + 1, end + 1)
+            ]
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+            user_pks.extend(user.pk for user in users)
+            self.progress('Usuários', end, total)
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} usuários criados.'))
+        return user_pks
+
+    def response_data(self, rng, title):
+        """Resposta sintética do /status da API, no formato lido por collector.extract_game_names"""
+        size = rng.choices([size for size, _ in RESPONSE_SIZES], [weight for _, weight in RESPONSE_SIZES])[0]
+        names = [title] + [self.random_title(rng) for _ in range(min(size, 8))]
+        return {
+            'state': 'SUCCESS',
+            'result': '\n'.join(names),
+            'last_executed_task': {'name': 'search_games', 'output': '\n'.join(names)},
+            'tasks': [
+                {
+                    'name': f'task_{index}',
+                    'output': ' '.join(rng.choices(DESCRIPTION_WORDS + TITLE_NOUNS, k=30)),
+                }
+                for index in range(size)
+            ],
+        }, names
+
+    def generate_requests(self, total, user_pks, results_per_request):
+        """
+        Cria os pedidos com a mistura de status de STATUS_WEIGHTS, distribuídos
+        entre os usuários de forma desigual (poucos usuários com muitos pedidos),
+        e os contadores de UserRequestStats correspondentes.
+        """
+        if not total:
+            return
+        rng = self.rng('requests')
+        statuses = list(STATUS_WEIGHTS)
+        status_weights = list(accumulate(STATUS_WEIGHTS.values()))
+        user_weights = list(accumulate(1 / (rank ** 0.8) for rank in range(1, len(user_pks) + 1)))
+        stats = {}
+        results_count = 0
+
+        for start, end in self.batches(total):
+            game_requests, responses = [], []
+            for _ in range(start, end):
+                title = self.random_title(rng)
+                status = rng.choices(statuses, cum_weights=status_weights)[0]
+                game_request = GameRequest(
+                    user_id=rng.choices(user_pks, cum_weights=user_weights)[0],
+                    title=title,
+                    details=' '.join(rng.choices(DESCRIPTION_WORDS, k=rng.randint(0, 25))),
+                    status=status,
+                    ai_query=f'{title} jogo retro',
+                    ready_for_ai=status != 'pending' or rng.random() < 0.3,
+                )
+                game_request.ai_query_key = normalize_search_term(game_request.ai_query)
+                names = []
+                if status in ('approved', 'rejected', 'submitting'):
+                    game_request.kickoff_id = f'{self.prefix}-{rng.getrandbits(64):016x}'
+                    game_request.execution_status = {
+                        'approved': 'completed',
+                        'rejected': rng.choice(['completed', 'failed']),
+                        'submitting': rng.choice(['pending', 'running']),
+                    }[status]
+                if game_request.execution_status == 'completed':
+                    data, names = self.response_data(rng, title)
+                    game_request.ai_response_blob = GameRequest.compress_response_data(data)
+                    game_request.game_names = names
+                    game_request.searched_names = len(names) if status == 'approved' else 0
+                if status == 'rejected':
+                    game_request.admin_note = rng.choice(ADMIN_NOTES)
+                game_requests.append(game_request)
+                responses.append(names if status == 'approved' else [])
+
+                counters = stats.setdefault(game_request.user_id, dict.fromkeys(('total', 'pending', 'approved', 'rejected'), 0))
+                counters['total'] += 1
+                counters[UserRequestStats.STATUS_COUNTERS[status]] += 1
+
+            with transaction.atomic():
+                GameRequest.objects.bulk_create(game_requests)
+                for game_request in game_requests:
+                    game_request.created_at = self.random_date(rng)
+                    game_request.updated_at = game_request.created_at + timedelta(hours=rng.random() * 72)
+                    if game_request.execution_status:
+                        game_request.status_checked_at = game_request.updated_at
+                GameRequest.objects.bulk_update(game_requests, ['created_at', 'updated_at', 'status_checked_at'])
+
+                results = []
+                for game_request, names in zip(game_requests, responses):
+                    for position, name in enumerate(names[:results_per_request]):
+                        number = rng.randint(1, 10 ** 6)
+                        results.append(RequestSearchResult(
+                            game_request=game_request,
+                            game_name=name,
+                            title=name,
+                            image_url=f'{self.rom_host}covers/r{number}.jpg',
+                            game_url=f'{self.rom_host}{game_request.pk}/{position}/{number}',
+                            embed_url=f'{self.rom_host}embed/r{number}',
+                            position=position,
+                        ))
+                RequestSearchResult.objects.bulk_create(results)
+                results_count += len(results)
+            self.progress('Pedidos', end, total)
+
+        # Usuários recém-criados ainda não têm contadores (bulk_create não dispara sinais)
+        UserRequestStats.objects.bulk_create(
+            [UserRequestStats(user_id=user_id, **counters) for user_id, counters in stats.items()],
+            batch_size=self.batch_size,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {total} pedidos criados ({results_count} resultados de busca, {len(stats)} usuários com pedidos).'
+        ))
@@ -20,6 +20,15 @@ Formato esperado do JSON:
         ...
     ]
 
+    Também é aceito NDJSON (um objeto por linha). O arquivo é lido em fluxo e
+    processado em lotes de --batch-size registros (consultas pelos jogos
+    existentes + bulk_create/bulk_update por lote), então arquivos com centenas
+    de milhares de jogos são importados em segundos e com memória constante.
+
+    Jogos são identificados pela ROM (content_key: id do retrogames.cc em
+    src, ou hash da URL): o mesmo src com outro título atualiza o jogo
+    existente em vez de criar um duplicado.
+
 Mapeamento de campos JSON -> Modelo Game:
     - name -> title
     - src -> rom_url (URL da ROM/jogo no retrogames.cc)
@@ -35,6 +44,26 @@ Uso:
     # Limpar todos os jogos existentes antes de recarregar
     python manage.py load_initial_games --reset
 
+    # Arquivo grande em NDJSON, lotes de 5000, listando cada jogo processado
+    python manage.py load_initial_games --json-file jogos.ndjson --batch-size 5000 -v 2
+
+    # Converter/validar os lotes em 4 processos (um único processo grava no banco)
+    python manage.py load_initial_games --json-file jogos.ndjson --workers 4
+
+    # Retomar uma importação interrompida a partir do último lote confirmado
+    python manage.py load_initial_games --json-file jogos.ndjson --resume
+
+Lotes e checkpoint:
+    Cada lote é confirmado em sua própria transação. Depois de cada lote, o
+    offset (bytes) e o índice do último registro são gravados no arquivo de
+    checkpoint (padrão: <arquivo>.checkpoint). Se a importação falhar, os lotes
+    anteriores continuam no banco e --resume continua do ponto salvo. O
+    checkpoint é removido ao final de uma importação completa.
+
+    Com --workers, NDJSON deve ter exatamente um objeto por linha: cada processo
+    lê e decodifica uma faixa de linhas. Em listas JSON o arquivo é decodificado
+    no processo principal e os processos apenas convertem/validam os registros.
+
 Localização do arquivo:
     O arquivo JSON deve estar localizado em:
     <project_root>/data/exemplos_iniciais.json
@@ -43,21 +72,31 @@ Localização do arquivo:
     deve ser criado manualmente).
 """
 
-import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from django.conf import settings
-from django.utils.text import slugify
 
-from games.models import Game
+from games.importer import (
+    ImportCheckpoint,
+    JsonRecordReader,
+    detect_format,
+    import_chunk,
+    iter_line_ranges,
+    parse_line_range,
+    parse_records,
+)
+from games import snapshot
+from games.models import CatalogVersion, Game
 
 
 class Command(BaseCommand):
     help = (
         'Carrega jogos iniciais a partir do arquivo JSON exemplos_iniciais.json. '
         'O arquivo deve estar localizado em data/exemplos_iniciais.json. '
-        'O comando é idempotente e não cria jogos duplicados (usa slug como identificador único).'
+        'O comando é idempotente e não cria jogos duplicados (identifica o jogo pela ROM em "src" ou, sem ela, pelo slug).'
     )
 
     # Caminho padrão do arquivo JSON (relativo ao BASE_DIR do Django)
@@ -70,7 +109,7 @@ class Command(BaseCommand):
         parser.add_argument(
             '--json-file',
             type=str,
-            help=f'Caminho alternativo para o arquivo JSON (padrão: {self.DEFAULT_JSON_PATH})',
+            help=f'Caminho alternativo para o arquivo JSON ou NDJSON (padrão: {self.DEFAULT_JSON_PATH})',
         )
         parser.add_argument(
             '--reset',
@@ -78,6 +117,28 @@ class Command(BaseCommand):
             help='Remove todos os jogos existentes antes de recarregar do JSON. '
                  'ATENÇÃO: Esta ação é destrutiva e não pode ser desfeita!',
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Registros processados por lote (consulta de slugs + bulk_create/bulk_update). Padrão: 1000.',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Retoma a importação a partir do checkpoint salvo pela execução anterior.',
+        )
+        parser.add_argument(
+            '--checkpoint-file',
+            type=str,
+            help='Arquivo de checkpoint (padrão: <arquivo JSON>.checkpoint).',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Processos que convertem/validam os lotes em paralelo (padrão: 1, sem pool).',
+        )
 
     def handle(self, *args, **options):
         """
@@ -85,6 +146,15 @@ class Command(BaseCommand):
         """
         self.stdout.write(self.style.SUCCESS('=== CARREGANDO JOGOS INICIAIS ==='))
         
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size deve ser maior que zero.')
+        if options['workers'] < 1:
+            raise CommandError('--workers deve ser maior que zero.')
+        if options['resume'] and options['reset']:
+            raise CommandError('--resume e --reset não podem ser usados juntos.')
+        self.verbosity = options['verbosity']
+        
         # Determinar o caminho do arquivo JSON
         json_path = options.get('json_file') or self.DEFAULT_JSON_PATH
         
@@ -103,203 +173,192 @@ class Command(BaseCommand):
             )
             raise CommandError(self.style.ERROR(error_msg))
         
-        # Carregar e validar JSON
-        try:
-            games_data = self.load_json_file(json_file_path)
+        checkpoint = ImportCheckpoint(
+            options.get('checkpoint_file') or f'{json_file_path}.checkpoint', json_file_path.resolve()
+        )
+        self.counts = {'created': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0}
+        
+        if options['resume']:
+            if not checkpoint.exists():
+                raise CommandError(f'Nenhum checkpoint encontrado em {checkpoint.path}.')
+            try:
+                checkpoint.load()
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.counts.update(checkpoint.counts)
             self.stdout.write(
-                self.style.SUCCESS(f'Arquivo JSON carregado com sucesso. {len(games_data)} jogos encontrados.')
+                self.style.WARNING(f'↩️  Retomando após o registro #{checkpoint.index} (byte {checkpoint.offset}).')
             )
-        except json.JSONDecodeError as e:
-            error_msg = (
-                f'Erro ao decodificar JSON: {e}\n'
-                f'O arquivo {json_file_path} não é um JSON válido. '
-                f'Verifique a sintaxe do arquivo antes de tentar novamente.'
+        elif checkpoint.exists():
+            self.stdout.write(
+                self.style.WARNING(
+                    f'⚠️  Checkpoint anterior em {checkpoint.path} ignorado (use --resume para continuar de onde parou).'
+                )
             )
-            raise CommandError(self.style.ERROR(error_msg))
-        except Exception as e:
-            error_msg = f'Erro inesperado ao ler arquivo JSON: {e}'
-            raise CommandError(self.style.ERROR(error_msg))
         
-        # Processar jogos dentro de uma transação
+        total = checkpoint.index
         try:
-            with transaction.atomic():
-                # Opção --reset: limpar todos os jogos existentes
-                if options.get('reset', False):
-                    deleted_count = Game.objects.count()
-                    Game.objects.all().delete()
-                    self.stdout.write(
-                        self.style.WARNING(
-                            f'⚠️  RESET: {deleted_count} jogos foram removidos do banco de dados.'
-                        )
-                    )
-                
-                # Processar cada jogo do JSON
-                created_count = 0
-                updated_count = 0
-                skipped_count = 0
-                
-                for index, game_data in enumerate(games_data, start=1):
-                    try:
-                        result = self.create_or_update_game(game_data, index)
-                        if result == 'created':
-                            created_count += 1
-                        elif result == 'updated':
-                            updated_count += 1
-                        elif result == 'skipped':
-                            skipped_count += 1
-                    except Exception as e:
-                        self.stdout.write(
-                            self.style.ERROR(
-                                f'❌ Erro ao processar jogo #{index} ({game_data.get("name", "sem nome")}): {e}'
-                            )
-                        )
-                        skipped_count += 1
-                
-                # Exibir resumo
-                self.stdout.write(self.style.SUCCESS('\n=== RESUMO ==='))
-                self.stdout.write(f'✅ Jogos criados: {created_count}')
-                self.stdout.write(f'🔄 Jogos atualizados: {updated_count}')
-                self.stdout.write(f'⏭️  Jogos ignorados (com erro): {skipped_count}')
-                self.stdout.write(f'📊 Total processado: {len(games_data)}')
+            # Opção --reset: limpar todos os jogos existentes
+            if options.get('reset', False):
+                deleted_count = self.delete_all_games(batch_size)
                 self.stdout.write(
-                    self.style.SUCCESS(f'\n✅ Processamento concluído com sucesso!')
+                    self.style.WARNING(
+                        f'⚠️  RESET: {deleted_count} jogos foram removidos do banco de dados.'
+                    )
                 )
+            
+            # Ler o arquivo em fluxo e confirmar lote a lote, salvando o checkpoint
+            written = self.counts['created'] + self.counts['updated']
+            try:
+                for parsed, errors, offset, total in self.iter_chunks(json_file_path, checkpoint, batch_size,
+                                                                      options['workers']):
+                    for index, name, reason in errors:
+                        self.skip(index, name, reason)
+                    with transaction.atomic():
+                        self.write_chunk(parsed, batch_size, total)
+                    checkpoint.save(checkpoint.format, offset, total, self.counts)
+            finally:
+                # bulk_create/bulk_update não disparam os sinais de Game: uma nova
+                # versão do catálogo por execução (inclusive interrompida), não por lote
+                if self.counts['created'] + self.counts['updated'] > written:
+                    CatalogVersion.bump()
+            
+            checkpoint.clear()
+            
+            # bulk_create/bulk_update não disparam sinais: regerar o snapshot do catálogo aqui
+            if settings.CATALOG_SNAPSHOT_ENABLED:
+                snapshot.write_snapshot()
+            
+            # Exibir resumo
+            self.stdout.write(self.style.SUCCESS('\n=== RESUMO ==='))
+            self.stdout.write(f'✅ Jogos criados: {self.counts["created"]}')
+            self.stdout.write(f'🔄 Jogos atualizados: {self.counts["updated"]}')
+            self.stdout.write(f'✓ Jogos já existentes (sem alterações): {self.counts["unchanged"]}')
+            self.stdout.write(f'⏭️  Jogos ignorados (com erro ou repetidos): {self.counts["skipped"]}')
+            self.stdout.write(f'📊 Total processado: {total}')
+            self.stdout.write(
+                self.style.SUCCESS(f'\n✅ Processamento concluído com sucesso!')
+            )
         
+        except ValueError as e:
+            error_msg = (
+                f'Erro ao decodificar JSON: {e}\n'
+                f'O arquivo {json_file_path} não é um JSON válido. '
+                f'Verifique a sintaxe do arquivo antes de tentar novamente.'
+            )
+            raise CommandError(self.style.ERROR(error_msg + self.resume_hint(checkpoint)))
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'\n❌ ERRO FATAL: {e}'))
-            raise CommandError(f'Falha ao processar jogos: {e}')
+            raise CommandError(f'Falha ao processar jogos: {e}' + self.resume_hint(checkpoint))
+
+    def resume_hint(self, checkpoint):
+        if not checkpoint.exists():
+            return ''
+        return (
+            f'\nOs lotes até o registro #{checkpoint.index} já foram gravados. '
+            f'Corrija o problema e rode novamente com --resume para continuar.'
+        )
 
-    def load_json_file(self, file_path):
+    def iter_chunks(self, json_file_path, checkpoint, batch_size, workers):
         """
-        Carrega e valida o arquivo JSON.
-        
-        Args:
-            file_path: Caminho para o arquivo JSON
-            
-        Returns:
-            list: Lista de dicionários contendo dados dos jogos
-            
-        Raises:
-            json.JSONDecodeError: Se o JSON estiver malformado
-            FileNotFoundError: Se o arquivo não existir
+        Lê o arquivo a partir do checkpoint e entrega os lotes convertidos, na ordem.
+
+        Com workers > 1 a conversão roda em um ProcessPoolExecutor, com no máximo
+        2 lotes por processo em andamento para manter a memória limitada.
+
+        Yields:
+            tuple: (lista de (índice, campos), ignorados, offset após o lote, índice do último registro)
         """
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Validar que é uma lista
-        if not isinstance(data, list):
-            raise ValueError('O JSON deve conter uma lista de objetos (array).')
+        if checkpoint.format is None:
+            checkpoint.format = detect_format(json_file_path)
+            if checkpoint.format is None:
+                return
         
-        # Validar que cada item é um dicionário
-        for i, item in enumerate(data):
-            if not isinstance(item, dict):
-                raise ValueError(f'Item #{i+1} do JSON não é um objeto válido.')
+        if workers == 1:
+            for records, offset, last_index in self.iter_record_batches(json_file_path, checkpoint, batch_size):
+                yield (*parse_records(records), offset, last_index)
+            return
         
-        return data
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            if checkpoint.format == 'lines':
+                # Cada processo lê e decodifica a própria faixa de linhas
+                index = checkpoint.index
+                for start, end, count in iter_line_ranges(json_file_path, checkpoint.offset, batch_size):
+                    future = executor.submit(parse_line_range, str(json_file_path), start, end, index + 1)
+                    index += count
+                    pending.append((future, end, index))
+                    if len(pending) >= workers * 2:
+                        future, offset, last_index = pending.popleft()
+                        yield (*future.result(), offset, last_index)
+            else:
+                for records, offset, last_index in self.iter_record_batches(json_file_path, checkpoint, batch_size):
+                    pending.append((executor.submit(parse_records, records), offset, last_index))
+                    if len(pending) >= workers * 2:
+                        future, offset, last_index = pending.popleft()
+                        yield (*future.result(), offset, last_index)
+            while pending:
+                future, offset, last_index = pending.popleft()
+                yield (*future.result(), offset, last_index)
+
+    def iter_record_batches(self, json_file_path, checkpoint, batch_size):
+        """Agrupa os registros do JsonRecordReader em lotes de (índice, registro)"""
+        reader = JsonRecordReader(json_file_path, offset=checkpoint.offset, format=checkpoint.format)
+        records = []
+        index = checkpoint.index
+        offset = checkpoint.offset
+        for index, (game_data, offset) in enumerate(reader, start=checkpoint.index + 1):
+            records.append((index, game_data))
+            if len(records) >= batch_size:
+                yield records, offset, index
+                records = []
+        if records:
+            yield records, offset, index
 
-    def generate_description(self, game_title):
+    def delete_all_games(self, batch_size):
         """
-        Gera uma descrição padrão para o jogo se não fornecida.
-        
-        Args:
-            game_title: Título do jogo
-            
-        Returns:
-            str: Descrição padrão
+        Remove todos os jogos em lotes. Com receivers de post_delete em Game o
+        Django não consegue apagar a tabela de uma vez e carregaria todos os
+        objetos na memória; em lotes, a memória fica constante.
         """
-        return f'Jogo retro clássico: {game_title}. Desfrute desta experiência nostálgica!'
+        deleted_count = 0
+        while True:
+            pks = list(Game.objects.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                return deleted_count
+            Game.objects.filter(pk__in=pks).delete()
+            deleted_count += len(pks)
 
-    def create_or_update_game(self, game_data, index):
+    def skip(self, index, name, reason):
+        """Registra um registro ignorado (sempre exibido, como aviso)"""
+        self.counts['skipped'] += 1
+        self.stdout.write(
+            self.style.WARNING(f'⚠️  Registro #{index} ({name or "sem nome"}): Ignorado ({reason})')
+        )
+
+    def write_chunk(self, chunk, batch_size, total):
         """
-        Cria ou atualiza um jogo no banco de dados.
-        Usa slug como identificador único para garantir idempotência.
-        
-        Args:
-            game_data: Dicionário com dados do jogo do JSON
-            index: Índice do jogo na lista (para logs)
-            
-        Returns:
-            str: 'created', 'updated' ou 'skipped'
+        Grava um lote com games.importer.import_chunk. O detalhe por jogo só é
+        exibido com --verbosity 2; no nível padrão, uma linha de progresso por lote.
         """
-        # Extrair dados do JSON
-        title = game_data.get('name', '').strip()
-        if not title:
-            self.stdout.write(self.style.WARNING(f'⚠️  Registro #{index}: Ignorado (sem título)'))
-            return 'skipped'
-        
-        # Gerar slug a partir do título (usado como identificador único)
-        slug = slugify(title)
-        if not slug:
-            self.stdout.write(
-                self.style.WARNING(f'⚠️  Registro #{index}: Ignorado (não foi possível gerar slug a partir de "{title}")')
-            )
-            return 'skipped'
-        
-        # Extrair outros campos
-        rom_url = game_data.get('src', '').strip()
-        cover_image = game_data.get('image', '').strip()
-        
-        # Gerar descrição padrão se não fornecida
-        description = game_data.get('description', '').strip()
-        if not description:
-            description = self.generate_description(title)
-        
-        # Buscar ou criar jogo usando slug como identificador único
-        game, created = Game.objects.get_or_create(
-            slug=slug,
-            defaults={
-                'title': title,
-                'description': description,
-                'cover_image': cover_image if cover_image else None,
-                'rom_url': rom_url if rom_url else None,
-                'is_active': True,
-            }
-        )
-        
-        if created:
-            self.stdout.write(
-                self.style.SUCCESS(f'✅ [{index}] Criado jogo: {title}')
-            )
-            return 'created'
-        else:
-            # Jogo já existe - atualizar campos relevantes
-            updated_fields = []
-            
-            if game.title != title:
-                game.title = title
-                updated_fields.append('title')
-            
-            if game.rom_url != rom_url and rom_url:
-                game.rom_url = rom_url
-                updated_fields.append('rom_url')
-            
-            if game.cover_image != cover_image and cover_image:
-                game.cover_image = cover_image
-                updated_fields.append('cover_image')
-            
-            # Atualizar descrição apenas se estiver vazia ou for a descrição padrão antiga
-            if not game.description or game.description == self.generate_description(game.title):
-                if description and description != self.generate_description(title):
-                    game.description = description
-                    updated_fields.append('description')
-            
-            # Garantir que está ativo
-            if not game.is_active:
-                game.is_active = True
-                updated_fields.append('is_active')
-            
-            if updated_fields:
-                game.save()
+        for index, title, result, detail in import_chunk(chunk, batch_size=batch_size):
+            if result == 'skipped':
+                self.skip(index, title, detail)
+                continue
+            self.counts[result] += 1
+            if self.verbosity < 2:
+                continue
+            if result == 'created':
+                self.stdout.write(self.style.SUCCESS(f'✅ [{index}] Criado jogo: {title}'))
+            elif result == 'updated':
                 self.stdout.write(
-                    self.style.WARNING(
-                        f'🔄 [{index}] Atualizado jogo: {title} - campos: {", ".join(updated_fields)}'
-                    )
+                    self.style.WARNING(f'🔄 [{index}] Atualizado jogo: {title} - campos: {", ".join(detail)}')
                 )
-                return 'updated'
             else:
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f'✓ [{index}] Jogo já existe (sem alterações): {title}'
-                    )
-                )
-                return 'skipped'
+                self.stdout.write(self.style.SUCCESS(f'✓ [{index}] Jogo já existe (sem alterações): {title}'))
+        
+        if self.verbosity >= 1:
+            self.stdout.write(
+                f'... {total} registros lidos '
+                f'({self.counts["created"]} criados, {self.counts["updated"]} atualizados)'
+            )
@@ -0,0 +1,161 @@
+"""
+Management command Django que acompanha, em segundo plano, as execuções em
+andamento na API de coleta de jogos.
+
+Propósito:
+    Em vez de cada página de detalhe aberta consultar /status a cada 3 segundos,
+    um único processo percorre todas as GameRequest com execution_status='running',
+    consulta a API uma vez por kickoff_id (usando a sessão HTTP compartilhada) e
+    persiste o resultado. A página de detalhe passa apenas a ler o estado salvo.
+
+Backoff adaptativo:
+    Cada kickoff começa a ser verificado a cada GAME_COLLECTOR_POLL_MIN_INTERVAL
+    segundos; enquanto continuar em andamento, o intervalo cresce 50% a cada
+    verificação até GAME_COLLECTOR_POLL_MAX_INTERVAL. Erros de comunicação
+    dobram o intervalo.
+
+Webhooks:
+    Com GAME_COLLECTOR_WEBHOOK_SECRET configurado a conclusão chega pelo webhook
+    (collector_webhook) e o poller funciona apenas como fallback: o intervalo
+    inicial passa a ser o máximo. O poller também devolve para 'running'
+    execuções presas em 'processing' sem heartbeat há mais de
+    GAME_COLLECTOR_STALE_CLAIM_SECONDS (ex.: worker reiniciado no meio do
+    pós-processamento do webhook) e para 'pending' aprovações presas em
+    'submitting' há mais de GAME_COLLECTOR_SUBMIT_STALE_SECONDS, e resolve as
+    aprovações que aguardavam o /kickoff de uma delas.
+
+Uso:
+    # Rodar continuamente (ex.: como serviço separado no docker-compose)
+    python manage.py poll_kickoffs
+
+    # Fazer uma única passada e sair (ex.: via cron)
+    python manage.py poll_kickoffs --once
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from games import collector
+from games.models import GameRequest
+
+
+class Command(BaseCommand):
+    help = (
+        'Verifica periodicamente o status de todas as execuções em andamento na API '
+        'de coleta de jogos e salva os resultados no banco de dados.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Verifica todas as execuções em andamento uma única vez e encerra.',
+        )
+        parser.add_argument(
+            '--min-interval',
+            type=float,
+            default=(
+                settings.GAME_COLLECTOR_POLL_MAX_INTERVAL if settings.GAME_COLLECTOR_WEBHOOK_SECRET
+                else settings.GAME_COLLECTOR_POLL_MIN_INTERVAL
+            ),
+            help='Intervalo inicial (segundos) entre verificações de um mesmo kickoff.',
+        )
+        parser.add_argument(
+            '--max-interval',
+            type=float,
+            default=settings.GAME_COLLECTOR_POLL_MAX_INTERVAL,
+            help='Intervalo máximo (segundos) entre verificações de um mesmo kickoff.',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Número máximo de consultas simultâneas ao /status (padrão: 4).',
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        self.min_interval = options['min_interval']
+        self.max_interval = options['max_interval']
+        # kickoff_id -> (intervalo atual, próximo momento de verificação)
+        self.schedule = {}
+
+        self.stdout.write(self.style.SUCCESS('=== POLLER DE EXECUÇÕES INICIADO ==='))
+
+        with ThreadPoolExecutor(max_workers=max(1, options['concurrency'])) as executor:
+            while True:
+                close_old_connections()
+                checked = self.poll(executor, force=options['once'])
+
+                if options['once']:
+                    self.stdout.write(self.style.SUCCESS(f'{checked} execução(ões) verificada(s).'))
+                    return
+
+                now = time.monotonic()
+                next_due = min((due for _, due in self.schedule.values()), default=now + self.min_interval)
+                time.sleep(min(max(next_due - now, 0.5), self.min_interval))
+
+    def poll(self, executor, force=False):
+        """
+        Verifica os kickoffs em andamento cujo próximo horário já chegou.
+
+        As consultas HTTP rodam em paralelo no executor; a gravação no banco
+        acontece na thread principal.
+
+        Returns:
+            int: Número de kickoffs verificados
+        """
+        released = collector.release_stale_claims(settings.GAME_COLLECTOR_STALE_CLAIM_SECONDS)
+        if released:
+            self.stdout.write(self.style.WARNING(f'{released} execução(ões) presa(s) em processamento devolvida(s) ao poller.'))
+        released = collector.release_stale_approvals(settings.GAME_COLLECTOR_SUBMIT_STALE_SECONDS)
+        if released:
+            self.stdout.write(self.style.WARNING(f'{released} aprovação(ões) presa(s) em envio devolvida(s) para pendente.'))
+        resolved = collector.resolve_waiting_requests()
+        if resolved:
+            self.stdout.write(self.style.WARNING(f'{resolved} aprovação(ões) que aguardavam outro envio resolvida(s).'))
+
+        running = set(
+            GameRequest.objects.filter(execution_status='running', kickoff_id__isnull=False)
+            .values_list('kickoff_id', flat=True)
+            .distinct()
+        )
+
+        # Esquecer kickoffs que não estão mais em andamento
+        for kickoff_id in list(self.schedule):
+            if kickoff_id not in running:
+                del self.schedule[kickoff_id]
+
+        now = time.monotonic()
+        due = [
+            kickoff_id for kickoff_id in running
+            if force or kickoff_id not in self.schedule or self.schedule[kickoff_id][1] <= now
+        ]
+        if not due:
+            return 0
+
+        futures = {kickoff_id: executor.submit(collector.fetch_status, kickoff_id) for kickoff_id in due}
+
+        for kickoff_id, future in futures.items():
+            interval = self.schedule.get(kickoff_id, (self.min_interval / 1.5, 0))[0]
+            try:
+                status_data = future.result()
+                execution_status = collector.apply_status(kickoff_id, status_data)
+                interval = min(interval * 1.5, self.max_interval)
+                if self.verbosity >= 2 or execution_status != 'running':
+                    self.stdout.write(f'[{kickoff_id}] {execution_status}')
+            except requests.exceptions.RequestException as e:
+                interval = min(max(interval, self.min_interval) * 2, self.max_interval)
+                self.stdout.write(self.style.WARNING(f'[{kickoff_id}] Erro ao verificar status: {e}'))
+            except Exception as e:
+                interval = self.max_interval
+                self.stdout.write(self.style.ERROR(f'[{kickoff_id}] Erro inesperado: {e}'))
+
+            self.schedule[kickoff_id] = (interval, time.monotonic() + interval)
+
+        return len(due)
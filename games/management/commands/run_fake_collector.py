@@ -0,0 +1,255 @@
+"""
+Management command Django que sobe uma imitação local da API de coleta de
+jogos (game-collector), para testes de carga e latência sem depender do
+serviço hospedado.
+
+Propósito:
+    Implementa os dois endpoints usados pelo site:
+        POST /kickoff            -> {"kickoff_id": "..."}
+        GET  /status/{kickoff_id} -> {"state": "RUNNING" | "SUCCESS" | "FAILED", "result": "..."}
+
+    Cada execução fica RUNNING por --run-time segundos e então termina com
+    SUCCESS (ou FAILED, conforme --execution-failure-rate). O resultado é uma
+    lista de nomes de jogos separados por \\n, como a API real.
+
+    Latência (--latency/--jitter) e taxa de erros HTTP 500 (--failure-rate)
+    são aplicadas a todas as respostas. Se o /kickoff trouxer crewWebhookUrl e
+    GAME_COLLECTOR_WEBHOOK_SECRET estiver configurado, o webhook de conclusão é
+    enviado assinado, como a API real faria.
+
+Uso:
+    # Terminal 1: subir a API falsa
+    python manage.py run_fake_collector --port 8765 --latency 0.2 --failure-rate 0.05
+
+    # Terminal 2: apontar o site para ela
+    GAME_COLLECTOR_API_URL=http://127.0.0.1:8765 python manage.py runserver
+
+    # Resultado fixo a partir de um arquivo (um nome por linha ou lista JSON)
+    python manage.py run_fake_collector --result-file nomes.txt
+"""
+
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from games import collector
+
+
+class FakeCollectorState:
+    """Execuções criadas pelo /kickoff e opções de simulação, compartilhadas entre threads"""
+
+    def __init__(self, options, result_names):
+        self.options = options
+        self.result_names = result_names
+        self.executions = {}
+        self.lock = threading.Lock()
+        self.counters = {'kickoff': 0, 'status': 0, 'errors': 0, 'webhooks': 0}
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def create_execution(self, search_term, crew_webhook_url):
+        kickoff_id = str(uuid.uuid4())
+        failed = random.random() < self.options['execution_failure_rate']
+        execution = {
+            'search_term': search_term,
+            'done_at': time.monotonic() + self.options['run_time'],
+            'failed': failed,
+            'result': '\n'.join(self.build_names(search_term)),
+        }
+        with self.lock:
+            self.executions[kickoff_id] = execution
+
+        if crew_webhook_url:
+            timer = threading.Timer(self.options['run_time'], self.send_webhook, (kickoff_id, crew_webhook_url))
+            timer.daemon = True
+            timer.start()
+        return kickoff_id
+
+    def build_names(self, search_term):
+        if self.result_names is not None:
+            return self.result_names
+        term = search_term.replace(' jogo retro', '').strip() or 'Jogo'
+        return [f"{term} {index}" for index in range(1, self.options['names'] + 1)]
+
+    def status_payload(self, kickoff_id):
+        with self.lock:
+            execution = self.executions.get(kickoff_id)
+        if execution is None:
+            return None
+        if time.monotonic() < execution['done_at']:
+            return {'kickoff_id': kickoff_id, 'state': 'RUNNING', 'result': None}
+        if execution['failed']:
+            return {'kickoff_id': kickoff_id, 'state': 'FAILED', 'result': None, 'error': 'Falha simulada'}
+        return {'kickoff_id': kickoff_id, 'state': 'SUCCESS', 'result': execution['result']}
+
+    def send_webhook(self, kickoff_id, url):
+        payload = self.status_payload(kickoff_id)
+        body = json.dumps(payload).encode('utf-8')
+        try:
+            requests.post(
+                url,
+                data=body,
+                headers={'Content-Type': 'application/json', 'X-Signature': f"sha256={collector.sign_payload(body)}"},
+                timeout=10
+            )
+            self.count('webhooks')
+        except requests.exceptions.RequestException:
+            self.count('errors')
+
+
+class FakeCollectorHandler(BaseHTTPRequestHandler):
+    """Handler HTTP dos endpoints /kickoff e /status/{id}"""
+
+    state = None
+    status_path = re.compile(r'^/status/([^/?]+)/?$')
+
+    def log_message(self, format, *args):
+        if self.state.options['verbosity'] >= 2:
+            super().log_message(format, *args)
+
+    def simulate(self):
+        """Aplica a latência configurada e decide se a resposta será um erro 500"""
+        options = self.state.options
+        delay = options['latency'] + random.uniform(0, options['jitter'])
+        if delay > 0:
+            time.sleep(delay)
+        if random.random() < options['failure_rate']:
+            self.state.count('errors')
+            self.send_json({'error': 'Erro simulado'}, status=500)
+            return False
+        return True
+
+    def send_json(self, data, status=200):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/kickoff':
+            self.send_json({'error': 'Not found'}, status=404)
+            return
+        self.state.count('kickoff')
+
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            search_term = str(payload['inputs']['search_term']).strip()
+        except (ValueError, KeyError, TypeError):
+            self.send_json({'error': 'inputs.search_term é obrigatório'}, status=422)
+            return
+        if not search_term:
+            self.send_json({'error': 'inputs.search_term é obrigatório'}, status=422)
+            return
+
+        if not self.simulate():
+            return
+        kickoff_id = self.state.create_execution(search_term, payload.get('crewWebhookUrl') or '')
+        self.send_json({'kickoff_id': kickoff_id})
+
+    def do_GET(self):
+        match = self.status_path.match(self.path)
+        if not match:
+            self.send_json({'error': 'Not found'}, status=404)
+            return
+        self.state.count('status')
+
+        if not self.simulate():
+            return
+        payload = self.state.status_payload(match.group(1))
+        if payload is None:
+            self.send_json({'error': 'Kickoff não encontrado'}, status=404)
+            return
+        self.send_json(payload)
+
+
+class Command(BaseCommand):
+    help = (
+        'Sobe uma API falsa de coleta de jogos (/kickoff e /status/{id}) com latência, '
+        'taxa de falhas e resultados configuráveis, para testes de carga locais.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Endereço de escuta (padrão: 127.0.0.1).')
+        parser.add_argument('--port', type=int, default=8765, help='Porta de escuta (padrão: 8765).')
+        parser.add_argument(
+            '--latency', type=float, default=0.0,
+            help='Atraso fixo (segundos) aplicado a cada resposta.',
+        )
+        parser.add_argument(
+            '--jitter', type=float, default=0.0,
+            help='Atraso aleatório adicional (0 a N segundos) em cada resposta.',
+        )
+        parser.add_argument(
+            '--failure-rate', type=float, default=0.0,
+            help='Fração das requisições (0 a 1) respondidas com HTTP 500.',
+        )
+        parser.add_argument(
+            '--run-time', type=float, default=5.0,
+            help='Tempo (segundos) que cada execução permanece RUNNING (padrão: 5).',
+        )
+        parser.add_argument(
+            '--execution-failure-rate', type=float, default=0.0,
+            help='Fração das execuções (0 a 1) que terminam com state FAILED.',
+        )
+        parser.add_argument(
+            '--names', type=int, default=3,
+            help='Quantidade de nomes gerados a partir do termo de busca (padrão: 3).',
+        )
+        parser.add_argument(
+            '--result-file',
+            help='Arquivo com os nomes retornados em toda execução (um por linha ou lista JSON).',
+        )
+
+    def handle(self, *args, **options):
+        for name in ('failure_rate', 'execution_failure_rate'):
+            if not 0 <= options[name] <= 1:
+                raise CommandError(f"--{name.replace('_', '-')} deve estar entre 0 e 1.")
+
+        result_names = self.load_result_file(options['result_file']) if options['result_file'] else None
+
+        FakeCollectorHandler.state = state = FakeCollectorState(options, result_names)
+        try:
+            server = ThreadingHTTPServer((options['host'], options['port']), FakeCollectorHandler)
+        except OSError as e:
+            raise CommandError(f"Não foi possível escutar em {options['host']}:{options['port']}: {e}")
+        server.daemon_threads = True
+
+        url = f"http://{options['host']}:{options['port']}"
+        self.stdout.write(self.style.SUCCESS(f'=== API FALSA DE COLETA EM {url} ==='))
+        self.stdout.write(f'Use GAME_COLLECTOR_API_URL={url} no site. Ctrl+C para encerrar.')
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            counters = ', '.join(f'{name}={value}' for name, value in state.counters.items())
+            self.stdout.write(self.style.SUCCESS(f'Encerrado. Requisições atendidas: {counters}'))
+
+    def load_result_file(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except OSError as e:
+            raise CommandError(f'Não foi possível ler {path}: {e}')
+
+        try:
+            data = json.loads(content)
+        except ValueError:
+            return [line.strip() for line in content.splitlines() if line.strip()]
+        if not isinstance(data, list):
+            raise CommandError('--result-file em JSON deve conter uma lista de nomes.')
+        return [str(name).strip() for name in data if str(name).strip()]
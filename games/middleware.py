@@ -0,0 +1,100 @@
+"""
+Middleware de desenvolvimento/testes que conta as queries SQL de cada requisição.
+
+- Consultas com o mesmo formato repetidas QUERY_REPEAT_THRESHOLD vezes ou mais
+  (sintoma típico de N+1, ex.: acessar request.user.username por linha de uma
+  lista) são registradas no log 'games.queries'.
+- Views com orçamento em QUERY_BUDGETS (nome da URL -> máximo de queries) que
+  o ultrapassarem geram um aviso ou, com QUERY_BUDGET_STRICT, levantam
+  QueryBudgetExceeded, fazendo o teste falhar.
+
+As queries de sessão/autenticação feitas antes da view (request.user) não
+entram na contagem, para que o orçamento meça apenas a própria view.
+Ativado por QUERY_BUDGET_ENABLED (padrão: DEBUG; sempre ativo e estrito em
+retro_games_cloud/test_settings.py).
+"""
+import logging
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('games.queries')
+
+# Listas de placeholders de tamanho variável (IN (%s, %s, ...)) e literais
+_PLACEHOLDER_LIST = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Uma view executou mais queries do que o orçamento declarado em QUERY_BUDGETS"""
+
+
+def normalize_query(sql):
+    """Reduz uma query ao seu formato, sem valores, para detectar repetições"""
+    sql = _PLACEHOLDER_LIST.sub('(%s...)', sql)
+    return _LITERALS.sub('?', sql)
+
+
+class QueryRecorder:
+    """execute_wrapper que registra o SQL de cada query executada"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def repeated_shapes(self, threshold):
+        """Formatos de query executados threshold vezes ou mais, com a contagem"""
+        counts = Counter(normalize_query(sql) for sql in self.queries)
+        return [(shape, count) for shape, count in counts.most_common() if count >= threshold]
+
+
+class QueryBudgetMiddleware:
+    """Conta as queries da view, aponta repetições (N+1) e aplica QUERY_BUDGETS"""
+
+    def __init__(self, get_response):
+        if not settings.QUERY_BUDGET_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # Carregar sessão e usuário antes de começar a contar
+        user = getattr(request, 'user', None)
+        if user is not None:
+            user.is_authenticated
+
+        recorder = QueryRecorder()
+        wrappers = [connections[alias].execute_wrapper(recorder) for alias in connections]
+        for wrapper in wrappers:
+            wrapper.__enter__()
+        try:
+            response = self.get_response(request)
+        finally:
+            for wrapper in reversed(wrappers):
+                wrapper.__exit__(None, None, None)
+
+        self.check(request, recorder)
+        response['X-Query-Count'] = str(len(recorder.queries))
+        return response
+
+    def check(self, request, recorder):
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else request.path
+
+        for shape, count in recorder.repeated_shapes(settings.QUERY_REPEAT_THRESHOLD):
+            logger.warning(f"[{view_name}] Possível N+1: query repetida {count}x: {shape[:300]}")
+
+        budget = settings.QUERY_BUDGETS.get(view_name)
+        if budget is not None and len(recorder.queries) > budget:
+            message = (
+                f"[{view_name}] {len(recorder.queries)} queries executadas; orçamento: {budget}.\n"
+                + '\n'.join(f"  {sql[:200]}" for sql in recorder.queries)
+            )
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0013_add_api_fields_to_gamerequest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamerequest',
+            name='status_checked_at',
+            field=models.DateTimeField(blank=True, help_text='Momento da última consulta ao /status da API (feita pelo poller ou pela view)', null=True, verbose_name='Última Verificação de Status'),
+        ),
+        migrations.AddIndex(
+            model_name='gamerequest',
+            index=models.Index(fields=['execution_status'], name='games_gamer_executi_f7ce2e_idx'),
+        ),
+    ]
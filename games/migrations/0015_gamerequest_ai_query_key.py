@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:56
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def normalize_search_term(text):
+    """Cópia de games.utils.normalize_search_term no momento desta migração"""
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', text)
+    without_accents = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(without_accents.casefold().split())
+
+
+def populate_ai_query_keys(apps, schema_editor):
+    """Preenche ai_query_key para as requisições existentes"""
+    GameRequest = apps.get_model('games', 'GameRequest')
+    for game_request in GameRequest.objects.exclude(ai_query='').only('pk', 'ai_query').iterator():
+        GameRequest.objects.filter(pk=game_request.pk).update(
+            ai_query_key=normalize_search_term(game_request.ai_query)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0014_gamerequest_status_checked_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamerequest',
+            name='ai_query_key',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='ai_query sem acentos, em minúsculas e com espaços colapsados. Usada para reaproveitar buscas anteriores do mesmo termo.', max_length=500, verbose_name='Consulta Normalizada'),
+        ),
+        migrations.RunPython(populate_ai_query_keys, migrations.RunPython.noop),
+    ]
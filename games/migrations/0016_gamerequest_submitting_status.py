@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0015_gamerequest_ai_query_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='gamerequest',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pendente'), ('submitting', 'Enviando para a API'), ('approved', 'Aprovado'), ('rejected', 'Rejeitado')], default='pending', max_length=20, verbose_name='Status'),
+        ),
+    ]
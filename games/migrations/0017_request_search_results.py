@@ -0,0 +1,119 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+import json
+import zlib
+
+
+def split_ai_response_data(apps, schema_editor):
+    """
+    Move game_names, searched_names e retrogames_results do JSON ai_response_data
+    para as novas colunas/tabela e grava o restante compactado em ai_response_blob.
+    """
+    GameRequest = apps.get_model('games', 'GameRequest')
+    RequestSearchResult = apps.get_model('games', 'RequestSearchResult')
+
+    queryset = GameRequest.objects.exclude(ai_response_data__isnull=True).only('pk', 'ai_response_data')
+    for game_request in queryset.iterator(chunk_size=200):
+        data = game_request.ai_response_data
+        if not isinstance(data, dict):
+            data = {'ai_data': data}
+        data = dict(data)
+        game_names = data.pop('game_names', None) or []
+        results = data.pop('retrogames_results', None) or []
+        searched_names = data.pop('searched_names', len(game_names) if results else 0)
+
+        GameRequest.objects.filter(pk=game_request.pk).update(
+            ai_response_blob=zlib.compress(json.dumps(data, ensure_ascii=False).encode('utf-8')),
+            game_names=game_names,
+            searched_names=searched_names,
+        )
+
+        seen_urls = set()
+        rows = []
+        for result in results:
+            if not isinstance(result, dict) or not result.get('game_url') or result['game_url'] in seen_urls:
+                continue
+            seen_urls.add(result['game_url'])
+            rows.append(RequestSearchResult(
+                game_request_id=game_request.pk,
+                title=(result.get('title') or '')[:300],
+                image_url=(result.get('image_url') or '')[:1000],
+                game_url=result['game_url'][:1000],
+                embed_url=result.get('embed_url') or '',
+                position=len(rows),
+            ))
+        RequestSearchResult.objects.bulk_create(rows)
+
+
+def merge_ai_response_data(apps, schema_editor):
+    """Reverte: reconstrói ai_response_data a partir das novas colunas e da tabela de resultados"""
+    GameRequest = apps.get_model('games', 'GameRequest')
+    RequestSearchResult = apps.get_model('games', 'RequestSearchResult')
+
+    queryset = GameRequest.objects.exclude(ai_response_blob__isnull=True)
+    for game_request in queryset.iterator(chunk_size=200):
+        data = json.loads(zlib.decompress(game_request.ai_response_blob))
+        data['game_names'] = game_request.game_names
+        data['searched_names'] = game_request.searched_names
+        data['retrogames_results'] = list(
+            RequestSearchResult.objects.filter(game_request_id=game_request.pk)
+            .order_by('position', 'id')
+            .values('title', 'image_url', 'game_url', 'embed_url')
+        )
+        GameRequest.objects.filter(pk=game_request.pk).update(ai_response_data=data)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0016_gamerequest_submitting_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamerequest',
+            name='ai_response_blob',
+            field=models.BinaryField(blank=True, help_text='Resposta completa do /status da API, em JSON compactado com zlib. Use a propriedade ai_response_data para ler/gravar.', null=True, verbose_name='Dados Retornados pela IA (compactados)'),
+        ),
+        migrations.AddField(
+            model_name='gamerequest',
+            name='game_names',
+            field=models.JSONField(blank=True, default=list, help_text='Nomes de jogos extraídos da resposta da API, na ordem retornada', verbose_name='Nomes Retornados pela IA'),
+        ),
+        migrations.AddField(
+            model_name='gamerequest',
+            name='searched_names',
+            field=models.PositiveIntegerField(default=0, help_text='Quantos dos nomes retornados já foram buscados no retrogames.cc', verbose_name='Nomes Buscados'),
+        ),
+        migrations.CreateModel(
+            name='RequestSearchResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('game_name', models.CharField(blank=True, help_text='Nome retornado pela IA (ou termo da busca manual) que gerou este resultado', max_length=500, verbose_name='Nome Buscado')),
+                ('title', models.CharField(max_length=300, verbose_name='Título')),
+                ('image_url', models.CharField(blank=True, max_length=1000, verbose_name='URL da Imagem')),
+                ('game_url', models.CharField(max_length=1000, verbose_name='URL do Jogo')),
+                ('embed_url', models.TextField(blank=True, verbose_name='URL/Código do Embed')),
+                ('position', models.PositiveIntegerField(default=0, verbose_name='Posição')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Data de Criação')),
+                ('game_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_results', to='games.gamerequest', verbose_name='Pedido de Jogo')),
+            ],
+            options={
+                'verbose_name': 'Resultado de Busca',
+                'verbose_name_plural': 'Resultados de Busca',
+                'ordering': ['position', 'id'],
+                'indexes': [models.Index(fields=['game_request', 'position'], name='games_reque_game_re_0708b0_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='requestsearchresult',
+            constraint=models.UniqueConstraint(fields=('game_request', 'game_url'), name='unique_search_result_per_request'),
+        ),
+        migrations.RunPython(split_ai_response_data, merge_ai_response_data),
+        migrations.RemoveField(
+            model_name='gamerequest',
+            name='ai_response_data',
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0017_request_search_results'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundRateBucket',
+            fields=[
+                ('key', models.CharField(max_length=200, primary_key=True, serialize=False, verbose_name='Destino')),
+                ('tokens', models.FloatField(verbose_name='Fichas Disponíveis')),
+                ('updated_at', models.FloatField(verbose_name='Última Atualização (timestamp)')),
+            ],
+            options={
+                'verbose_name': 'Bucket de Limite de Requisições',
+                'verbose_name_plural': 'Buckets de Limite de Requisições',
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0018_outboundratebucket'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='gamerequest',
+            name='games_gamer_status_c8a755_idx',
+        ),
+        migrations.AddIndex(
+            model_name='gamerequest',
+            index=models.Index(fields=['-created_at', '-id'], name='gamereq_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gamerequest',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='gamereq_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gamerequest',
+            index=models.Index(fields=['ready_for_ai', '-created_at', '-id'], name='gamereq_ready_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gamerequest',
+            index=models.Index(fields=['status', 'ready_for_ai', '-created_at', '-id'], name='gamereq_status_ready_idx'),
+        ),
+    ]
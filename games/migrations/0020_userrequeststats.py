@@ -0,0 +1,61 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:15
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+STATUS_COUNTERS = {'pending': 'pending', 'submitting': 'pending', 'approved': 'approved', 'rejected': 'rejected'}
+
+
+def backfill_user_request_stats(apps, schema_editor):
+    """Calcula os contadores iniciais de cada usuário com uma única consulta agrupada"""
+    GameRequest = apps.get_model('games', 'GameRequest')
+    UserRequestStats = apps.get_model('games', 'UserRequestStats')
+
+    stats = {}
+    rows = GameRequest.objects.order_by().values_list('user_id', 'status').annotate(count=models.Count('pk'))
+    for user_id, status, count in rows:
+        counts = stats.setdefault(user_id, {'total': 0, 'pending': 0, 'approved': 0, 'rejected': 0})
+        counts['total'] += count
+        if status in STATUS_COUNTERS:
+            counts[STATUS_COUNTERS[status]] += count
+
+    UserRequestStats.objects.bulk_create(
+        [UserRequestStats(user_id=user_id, **counts) for user_id, counts in stats.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('games', '0019_gamerequest_queue_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserRequestStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='request_stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Total de Pedidos')),
+                ('pending', models.PositiveIntegerField(default=0, verbose_name='Pendentes')),
+                ('approved', models.PositiveIntegerField(default=0, verbose_name='Aprovados')),
+                ('rejected', models.PositiveIntegerField(default=0, verbose_name='Rejeitados')),
+            ],
+            options={
+                'verbose_name': 'Estatísticas de Pedidos do Usuário',
+                'verbose_name_plural': 'Estatísticas de Pedidos dos Usuários',
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='gamerequest',
+            name='games_gamer_user_id_e35b38_idx',
+        ),
+        migrations.AddIndex(
+            model_name='gamerequest',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='gamereq_user_created_idx'),
+        ),
+        migrations.RunPython(backfill_user_request_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:05
+
+import hashlib
+import re
+from urllib.parse import urlparse
+
+from django.db import migrations, models
+
+
+RETROGAMES_EMBED_ID = re.compile(r'^/embed/(\d+)(?:[-./]|$)')
+
+
+def build_content_key(url):
+    """Cópia de games.utils.build_content_key no momento desta migração"""
+    if not url:
+        return None
+    parsed = urlparse(url.strip())
+    host = (parsed.hostname or '').lower()
+    if not host:
+        return None
+    if host == 'retrogames.cc' or host.endswith('.retrogames.cc'):
+        match = RETROGAMES_EMBED_ID.match(parsed.path)
+        if match:
+            return f'retrogames:{int(match.group(1))}'
+    canonical = host + parsed.path.rstrip('/') + (f'?{parsed.query}' if parsed.query else '')
+    return 'url:' + hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+def backfill_content_keys(apps, schema_editor):
+    """
+    Preenche content_key a partir de rom_url. Quando a mesma ROM aparece em mais
+    de um jogo, o mais antigo fica com a chave e os demais são desativados (sem
+    chave), para revisão no admin: nada é apagado.
+    """
+    Game = apps.get_model('games', 'Game')
+
+    seen = set()
+    keyed, duplicates = [], []
+    for game in Game.objects.order_by('pk').only('pk', 'rom_url', 'is_active').iterator(chunk_size=2000):
+        content_key = build_content_key(game.rom_url)
+        if content_key is None:
+            continue
+        if content_key in seen:
+            game.is_active = False
+            duplicates.append(game)
+            continue
+        seen.add(content_key)
+        game.content_key = content_key
+        keyed.append(game)
+
+    Game.objects.bulk_update(keyed, ['content_key'], batch_size=500)
+    Game.objects.bulk_update(duplicates, ['is_active'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0020_userrequeststats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='content_key',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, verbose_name='Chave de conteúdo'),
+        ),
+        migrations.RunPython(backfill_content_keys, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='game',
+            name='content_key',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True, verbose_name='Chave de conteúdo'),
+        ),
+    ]
@@ -1,7 +1,13 @@
+import json
+import zlib
+
+from django.core.exceptions import ValidationError
 from django.db import models
-from django.utils.text import slugify
 from django.conf import settings
 
+from .slugs import allocate_slug
+from .utils import build_content_key, normalize_search_term
+
 
 class Category(models.Model):
     """Modelo para categorias de jogos"""
@@ -45,6 +51,10 @@ class Game(models.Model):
     )
     is_active = models.BooleanField(default=True, verbose_name="Ativo",
                                    help_text="Se desmarcado, o jogo não aparecerá no catálogo")
+    # Identidade do conteúdo (mesma ROM), derivada de rom_url por build_content_key:
+    # 'retrogames:<id>' ou 'url:<sha1>'. Única: impede o mesmo jogo com outro título.
+    content_key = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False,
+                                   verbose_name="Chave de conteúdo")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -56,11 +66,46 @@ class Game(models.Model):
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Guarda a rom_url carregada do banco para saber em save() se ela mudou"""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_rom_url = instance.__dict__.get('rom_url', models.DEFERRED)
+        return instance
+
+    def rom_url_changed(self):
+        """
+        Indica se rom_url é nova ou foi alterada desde a leitura do banco. Jogos
+        desativados como duplicados na migração 0021 ficam sem content_key
+        enquanto a ROM não mudar, e continuam editáveis.
+        """
+        if self._state.adding:
+            return True
+        return self.__dict__.get('rom_url', models.DEFERRED) != getattr(self, '_loaded_rom_url', None)
+
+    def clean(self):
+        """Impede cadastrar pelo admin uma ROM que já está no catálogo"""
+        super().clean()
+        content_key = build_content_key(self.rom_url) if self.rom_url_changed() else None
+        if content_key:
+            duplicate = Game.objects.filter(content_key=content_key).exclude(pk=self.pk).first()
+            if duplicate:
+                raise ValidationError({'rom_url': f'Este jogo já está no catálogo como "{duplicate.title}".'})
+
     def save(self, *args, **kwargs):
-        """Gera slug automaticamente se não fornecido"""
+        """
+        Gera slug automaticamente se não fornecido (único, com sufixo -N se
+        necessário) e recalcula content_key quando rom_url muda.
+        """
         if not self.slug:
-            self.slug = slugify(self.title)
+            self.slug = allocate_slug(self.title, exclude_pk=self.pk)
+        if self.rom_url_changed():
+            self.content_key = build_content_key(self.rom_url)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'rom_url' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'content_key'}
         super().save(*args, **kwargs)
+        self._loaded_rom_url = self.__dict__.get('rom_url', models.DEFERRED)
 
     def get_absolute_url(self):
         """Retorna a URL absoluta do jogo"""
@@ -76,9 +121,14 @@ class GameRequest(models.Model):
     """
     STATUS_CHOICES = [
         ('pending', 'Pendente'),
+        ('submitting', 'Enviando para a API'),
         ('approved', 'Aprovado'),
         ('rejected', 'Rejeitado'),
     ]
+    # Status a partir dos quais uma requisição pode ser aprovada. A aprovação
+    # passa pelo estado intermediário 'submitting' (compare-and-set), o que
+    # garante um único /kickoff por requisição mesmo com cliques duplicados.
+    APPROVABLE_STATUSES = ('pending', 'rejected')
     
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -114,6 +164,14 @@ class GameRequest(models.Model):
         help_text="Consulta/nome que será enviado para a IA para obter os dados completos do jogo. Será preenchido automaticamente com uma sugestão baseada no título e console, mas pode ser editado pelo administrador.",
         blank=True
     )
+    ai_query_key = models.CharField(
+        max_length=500,
+        blank=True,
+        db_index=True,
+        editable=False,
+        verbose_name="Consulta Normalizada",
+        help_text="ai_query sem acentos, em minúsculas e com espaços colapsados. Usada para reaproveitar buscas anteriores do mesmo termo."
+    )
     ready_for_ai = models.BooleanField(
         default=False,
         verbose_name="Pronta para Enviar à IA",
@@ -134,11 +192,29 @@ class GameRequest(models.Model):
         verbose_name="Status da Execução",
         help_text="Status atual da execução na API (pending, running, completed, failed)"
     )
-    ai_response_data = models.JSONField(
+    ai_response_blob = models.BinaryField(
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name="Dados Retornados pela IA (compactados)",
+        help_text="Resposta completa do /status da API, em JSON compactado com zlib. Use a propriedade ai_response_data para ler/gravar."
+    )
+    game_names = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name="Nomes Retornados pela IA",
+        help_text="Nomes de jogos extraídos da resposta da API, na ordem retornada"
+    )
+    searched_names = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Nomes Buscados",
+        help_text="Quantos dos nomes retornados já foram buscados no retrogames.cc"
+    )
+    status_checked_at = models.DateTimeField(
         blank=True,
         null=True,
-        verbose_name="Dados Retornados pela IA",
-        help_text="Dados completos retornados pela API após a busca do jogo"
+        verbose_name="Última Verificação de Status",
+        help_text="Momento da última consulta ao /status da API (feita pelo poller ou pela view)"
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Data de Criação")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Última Atualização")
@@ -148,18 +224,81 @@ class GameRequest(models.Model):
         verbose_name_plural = "Pedidos de Jogos"
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['status', '-created_at']),
-            models.Index(fields=['user', '-created_at']),
+            # Fila de administração: paginação por (-created_at, -id) com e sem filtros
+            models.Index(fields=['-created_at', '-id'], name='gamereq_created_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='gamereq_status_created_idx'),
+            models.Index(fields=['ready_for_ai', '-created_at', '-id'], name='gamereq_ready_created_idx'),
+            # Filtro combinado e estatísticas por status/ready_for_ai (index-only scan)
+            models.Index(fields=['status', 'ready_for_ai', '-created_at', '-id'], name='gamereq_status_ready_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='gamereq_user_created_idx'),
+            models.Index(fields=['execution_status']),
         ]
     
     def __str__(self):
         return f"{self.title} ({self.user.username}) - {self.get_status_display()}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Guarda o status carregado do banco para detectar transições em save()"""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+    
     def save(self, *args, **kwargs):
-        """Preenche automaticamente ai_query se estiver vazio"""
+        """
+        Preenche automaticamente ai_query se estiver vazio, mantém ai_query_key
+        sincronizado e atualiza os contadores do usuário (UserRequestStats)
+        quando o pedido é criado ou muda de status.
+        """
         if not self.ai_query and self.title:
             self.ai_query = f"{self.title} jogo retro"
+        self.ai_query_key = normalize_search_term(self.ai_query)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'ai_query' in update_fields and 'ai_query_key' not in update_fields:
+            kwargs['update_fields'] = list(update_fields) + ['ai_query_key']
+        
+        adding = self._state.adding
+        track_status = update_fields is None or 'status' in update_fields
+        previous_status = None
+        if not adding and track_status:
+            previous_status = getattr(self, '_loaded_status', None)
+            if previous_status is None:
+                previous_status = GameRequest.objects.filter(pk=self.pk).values_list('status', flat=True).first()
+        
         super().save(*args, **kwargs)
+        
+        if adding:
+            UserRequestStats.record_transition(self.user_id, None, self.status)
+        elif track_status and previous_status != self.status:
+            UserRequestStats.record_transition(self.user_id, previous_status, self.status)
+        self._loaded_status = self.status
+    
+    @staticmethod
+    def compress_response_data(data):
+        """Serializa a resposta da API em JSON compactado (valor de ai_response_blob)"""
+        if data is None:
+            return None
+        return zlib.compress(json.dumps(data, ensure_ascii=False).encode('utf-8'))
+    
+    @property
+    def ai_response_data(self):
+        """
+        Resposta completa da API, descompactada sob demanda (e apenas uma vez
+        por instância). Listagens devem usar .defer('ai_response_blob').
+        """
+        if not hasattr(self, '_ai_response_data'):
+            blob = self.ai_response_blob
+            self._ai_response_data = json.loads(zlib.decompress(blob)) if blob else None
+        return self._ai_response_data
+    
+    @ai_response_data.setter
+    def ai_response_data(self, data):
+        self.ai_response_blob = self.compress_response_data(data)
+        self._ai_response_data = data
+    
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.__dict__.pop('_ai_response_data', None)
     
     def to_game_kwargs(self):
         """
@@ -182,6 +321,193 @@ class GameRequest(models.Model):
         }
 
 
+
+class UserRequestStats(models.Model):
+    """
+    Contadores de pedidos de um usuário por status, mantidos nas transições de
+    GameRequest.status (save(), aprovação via compare-and-set e exclusão), para
+    que "Meus Pedidos" não precise contar a tabela a cada acesso.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='request_stats',
+        verbose_name="Usuário"
+    )
+    total = models.PositiveIntegerField(default=0, verbose_name="Total de Pedidos")
+    pending = models.PositiveIntegerField(default=0, verbose_name="Pendentes")
+    approved = models.PositiveIntegerField(default=0, verbose_name="Aprovados")
+    rejected = models.PositiveIntegerField(default=0, verbose_name="Rejeitados")
+    
+    # Contador de cada status ('submitting' é exibido ao usuário como pendente)
+    STATUS_COUNTERS = {
+        'pending': 'pending',
+        'submitting': 'pending',
+        'approved': 'approved',
+        'rejected': 'rejected',
+    }
+    
+    class Meta:
+        verbose_name = "Estatísticas de Pedidos do Usuário"
+        verbose_name_plural = "Estatísticas de Pedidos dos Usuários"
+    
+    def __str__(self):
+        return f"{self.user_id}: {self.total} pedido(s)"
+    
+    @classmethod
+    def record_transition(cls, user_id, old_status, new_status, rebuild_missing=True):
+        """
+        Ajusta os contadores de um pedido que passou de old_status para
+        new_status (None = pedido criado ou excluído) com um UPDATE atômico.
+        Se o usuário ainda não tem contadores, eles são recalculados
+        (exceto com rebuild_missing=False).
+        """
+        old_counter = cls.STATUS_COUNTERS.get(old_status)
+        new_counter = cls.STATUS_COUNTERS.get(new_status)
+        deltas = {}
+        if old_status is None:
+            deltas['total'] = 1
+        elif new_status is None:
+            deltas['total'] = -1
+        if old_counter != new_counter:
+            if old_counter:
+                deltas[old_counter] = deltas.get(old_counter, 0) - 1
+            if new_counter:
+                deltas[new_counter] = deltas.get(new_counter, 0) + 1
+        if not deltas:
+            return
+        
+        updated = cls.objects.filter(user_id=user_id).update(
+            **{field: models.F(field) + delta for field, delta in deltas.items()}
+        )
+        if not updated and rebuild_missing:
+            cls.rebuild(user_id)
+    
+    @classmethod
+    def rebuild(cls, user_id):
+        """Recalcula os contadores de um usuário a partir de GameRequest"""
+        counts = {field: 0 for field in ('total', 'pending', 'approved', 'rejected')}
+        for status, count in (
+            GameRequest.objects.filter(user_id=user_id).order_by()
+            .values_list('status').annotate(count=models.Count('pk'))
+        ):
+            counts['total'] += count
+            counter = cls.STATUS_COUNTERS.get(status)
+            if counter:
+                counts[counter] += count
+        stats, _ = cls.objects.update_or_create(user_id=user_id, defaults=counts)
+        return stats
+    
+    @classmethod
+    def for_user(cls, user):
+        """Retorna os contadores do usuário, criando-os na primeira consulta"""
+        stats = cls.objects.filter(user=user).first()
+        return stats or cls.rebuild(user.pk)
+
+
+class RequestSearchResult(models.Model):
+    """
+    Jogo encontrado no retrogames.cc para um dos nomes retornados pela IA
+    (ou para uma busca manual do administrador) em um pedido de jogo.
+    """
+    game_request = models.ForeignKey(
+        GameRequest,
+        on_delete=models.CASCADE,
+        related_name='search_results',
+        verbose_name="Pedido de Jogo"
+    )
+    game_name = models.CharField(
+        max_length=500,
+        blank=True,
+        verbose_name="Nome Buscado",
+        help_text="Nome retornado pela IA (ou termo da busca manual) que gerou este resultado"
+    )
+    title = models.CharField(max_length=300, verbose_name="Título")
+    image_url = models.CharField(max_length=1000, blank=True, verbose_name="URL da Imagem")
+    game_url = models.CharField(max_length=1000, verbose_name="URL do Jogo")
+    embed_url = models.TextField(blank=True, verbose_name="URL/Código do Embed")
+    position = models.PositiveIntegerField(default=0, verbose_name="Posição")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Data de Criação")
+    
+    # Campos expostos para o front-end (mesmo formato de search_games_on_retrogames)
+    API_FIELDS = ('id', 'title', 'image_url', 'game_url', 'embed_url')
+    
+    class Meta:
+        verbose_name = "Resultado de Busca"
+        verbose_name_plural = "Resultados de Busca"
+        ordering = ['position', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['game_request', 'game_url'], name='unique_search_result_per_request'),
+        ]
+        indexes = [
+            models.Index(fields=['game_request', 'position']),
+        ]
+    
+    def __str__(self):
+        return f"{self.title} ({self.game_request_id})"
+    
+    @classmethod
+    def from_result(cls, game_request_id, result, game_name='', position=0):
+        """Cria (sem salvar) um resultado a partir de um dicionário de search_games_on_retrogames"""
+        return cls(
+            game_request_id=game_request_id,
+            game_name=game_name[:500],
+            title=(result.get('title') or '')[:300],
+            image_url=(result.get('image_url') or '')[:1000],
+            game_url=result['game_url'][:1000],
+            embed_url=result.get('embed_url') or '',
+            position=position,
+        )
+
+
+class OutboundRateBucket(models.Model):
+    """
+    Estado de um token bucket de games/ratelimit.py, usado quando
+    OUTBOUND_RATE_LIMIT_BACKEND='database' para compartilhar o limite de
+    requisições externas entre máquinas.
+    """
+    key = models.CharField(max_length=200, primary_key=True, verbose_name="Destino")
+    tokens = models.FloatField(verbose_name="Fichas Disponíveis")
+    updated_at = models.FloatField(verbose_name="Última Atualização (timestamp)")
+    
+    class Meta:
+        verbose_name = "Bucket de Limite de Requisições"
+        verbose_name_plural = "Buckets de Limite de Requisições"
+    
+    def __str__(self):
+        return f"{self.key}: {self.tokens:.2f}"
+
+
+class CatalogVersion(models.Model):
+    """
+    Contador de alterações do catálogo (linha única), incrementado pelos sinais
+    de Game e pelas gravações em massa (bulk_create/bulk_update/update), que não
+    disparam sinais nem sempre mudam updated_at; importações incrementam uma
+    vez por execução. Faz parte da impressão digital
+    do snapshot do catálogo (games/snapshot.py).
+    """
+    version = models.PositiveBigIntegerField(default=0, verbose_name="Versão")
+    
+    class Meta:
+        verbose_name = "Versão do Catálogo"
+        verbose_name_plural = "Versões do Catálogo"
+    
+    def __str__(self):
+        return f"Catálogo v{self.version}"
+    
+    @classmethod
+    def bump(cls):
+        """Incrementa a versão com um UPDATE atômico (cria a linha se não existir)"""
+        if not cls.objects.filter(pk=1).update(version=models.F('version') + 1):
+            cls.objects.get_or_create(pk=1)
+            cls.objects.filter(pk=1).update(version=models.F('version') + 1)
+    
+    @classmethod
+    def current(cls):
+        """Versão atual (0 se o catálogo nunca foi alterado)"""
+        return cls.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+
 # ============================================================================
 # MODELOS LEGADOS - REMOVIDOS PARA O TDE
 # ============================================================================
@@ -0,0 +1,269 @@
+"""
+Limite de taxa (token bucket) para chamadas HTTP externas, compartilhado entre
+os workers do Gunicorn.
+
+Cada destino configurado em OUTBOUND_RATE_LIMITS (retrogames.cc, API de coleta)
+tem um orçamento de N requisições por segundo com rajada máxima B. O estado do
+bucket fica fora do processo, para que todos os workers dividam o mesmo orçamento:
+
+    - 'file' (padrão): um arquivo por destino em OUTBOUND_RATE_LIMIT_DIR
+      (/dev/shm, em memória), protegido por fcntl.flock. Compartilhado entre
+      os processos de uma mesma máquina.
+    - 'database': uma linha de OutboundRateBucket por destino, lida com
+      SELECT ... FOR UPDATE. Compartilhado entre máquinas que usam o mesmo banco.
+    - 'memory': apenas dentro do processo (desenvolvimento, ou sistemas sem fcntl).
+
+Quando não há ficha disponível a chamada não falha: ela reserva a próxima ficha
+(o saldo fica negativo, formando uma fila) e aguarda a sua vez. Se a espera
+passar de OUTBOUND_RATE_LIMIT_MAX_WAIT segundos, RateLimitTimeout é levantada
+sem consumir o orçamento.
+
+As views assíncronas usam o mesmo orçamento através de build_async_client
+(httpx): a espera pela ficha é feita com asyncio.sleep, sem bloquear o event loop.
+"""
+import asyncio
+import logging
+import os
+import re
+import struct
+import threading
+import time
+import weakref
+from urllib.parse import urlparse
+
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_STATE = struct.Struct('<dd')  # saldo de fichas, momento da última atualização
+
+
+class RateLimitTimeout(requests.exceptions.RequestException):
+    """A espera por uma ficha do bucket ultrapassaria o prazo máximo"""
+
+
+def _take(tokens, updated_at, now, rate, burst, max_wait):
+    """
+    Recarrega o bucket e reserva uma ficha.
+
+    Returns:
+        tuple: (novo saldo, segundos de espera) ou None se a espera passaria de max_wait
+    """
+    tokens = min(float(burst), tokens + max(0.0, now - updated_at) * rate)
+    wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+    if wait > max_wait:
+        return None
+    return tokens - 1, wait
+
+
+class MemoryBucketBackend:
+    """Buckets em memória, válidos apenas dentro do processo"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def reserve(self, key, rate, burst, max_wait):
+        with self._lock:
+            now = time.time()
+            tokens, updated_at = self._buckets.get(key, (float(burst), now))
+            taken = _take(tokens, updated_at, now, rate, burst, max_wait)
+            if taken is None:
+                return None
+            self._buckets[key] = (taken[0], now)
+            return taken[1]
+
+
+class FileBucketBackend:
+    """Buckets em arquivos (um por destino) protegidos por fcntl.flock"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, f"retro-games-ratelimit-{re.sub(r'[^A-Za-z0-9_.-]', '_', key)}")
+
+    def reserve(self, key, rate, burst, max_wait):
+        fd = os.open(self.path(key), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            now = time.time()
+            data = os.pread(fd, _STATE.size, 0)
+            tokens, updated_at = _STATE.unpack(data) if len(data) == _STATE.size else (float(burst), now)
+            taken = _take(tokens, updated_at, now, rate, burst, max_wait)
+            if taken is None:
+                return None
+            os.pwrite(fd, _STATE.pack(taken[0], now), 0)
+            return taken[1]
+        finally:
+            os.close(fd)  # também libera o flock
+
+
+class DatabaseBucketBackend:
+    """Buckets em OutboundRateBucket, compartilhados por todas as máquinas"""
+
+    def reserve(self, key, rate, burst, max_wait):
+        from .models import OutboundRateBucket
+
+        with transaction.atomic():
+            now = time.time()
+            bucket, _ = OutboundRateBucket.objects.select_for_update().get_or_create(
+                key=key, defaults={'tokens': float(burst), 'updated_at': now}
+            )
+            taken = _take(bucket.tokens, bucket.updated_at, now, rate, burst, max_wait)
+            if taken is None:
+                return None
+            OutboundRateBucket.objects.filter(key=key).update(tokens=taken[0], updated_at=now)
+            return taken[1]
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Retorna o backend configurado em OUTBOUND_RATE_LIMIT_BACKEND (criado uma vez por processo)"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                name = settings.OUTBOUND_RATE_LIMIT_BACKEND
+                if name == 'database':
+                    _backend = DatabaseBucketBackend()
+                elif name == 'file' and fcntl is not None:
+                    _backend = FileBucketBackend(settings.OUTBOUND_RATE_LIMIT_DIR)
+                else:
+                    if name != 'memory':
+                        logger.warning(f"Backend de rate limit '{name}' indisponível; usando memória do processo")
+                    _backend = MemoryBucketBackend()
+    return _backend
+
+
+def get_budget(host):
+    """
+    Encontra o orçamento de um host em OUTBOUND_RATE_LIMITS (o próprio host ou
+    um subdomínio dele).
+
+    Returns:
+        tuple: (chave do bucket, requisições por segundo, rajada) ou None se o host não tem limite
+    """
+    host = (host or '').lower()
+    for key, (rate, burst) in settings.OUTBOUND_RATE_LIMITS.items():
+        if rate > 0 and (host == key or host.endswith('.' + key)):
+            return key, rate, burst
+    return None
+
+
+def reserve(key, rate, burst, max_wait=None):
+    """
+    Reserva uma ficha do bucket 'key' sem aguardar.
+
+    Returns:
+        float: Segundos a esperar antes de usar a ficha
+
+    Raises:
+        RateLimitTimeout: Se a espera passaria de max_wait (padrão: OUTBOUND_RATE_LIMIT_MAX_WAIT)
+    """
+    if max_wait is None:
+        max_wait = settings.OUTBOUND_RATE_LIMIT_MAX_WAIT
+    wait = get_backend().reserve(key, rate, max(1, burst), max_wait)
+    if wait is None:
+        raise RateLimitTimeout(f"Limite de requisições para {key} excedido (espera maior que {max_wait:g}s)")
+    if wait > 0:
+        logger.debug(f"Rate limit {key}: aguardando {wait:.2f}s")
+    return wait
+
+
+def acquire(key, rate, burst, max_wait=None):
+    """Obtém uma ficha do bucket 'key', aguardando na fila se necessário (ver reserve)"""
+    wait = reserve(key, rate, burst, max_wait)
+    if wait > 0:
+        time.sleep(wait)
+
+
+async def aacquire(key, rate, burst, max_wait=None):
+    """Versão assíncrona de acquire: a espera não bloqueia o event loop"""
+    # O backend 'database' usa o ORM, que não pode ser chamado direto de código assíncrono
+    wait = await sync_to_async(reserve)(key, rate, burst, max_wait)
+    if wait > 0:
+        await asyncio.sleep(wait)
+
+
+class RateLimitedAdapter(requests.adapters.HTTPAdapter):
+    """HTTPAdapter que consome uma ficha do orçamento do host antes de cada envio"""
+
+    def send(self, request, *args, **kwargs):
+        budget = get_budget(urlparse(request.url).hostname)
+        if budget:
+            acquire(*budget)
+        return super().send(request, *args, **kwargs)
+
+
+def build_session(pool_connections=4, pool_maxsize=16):
+    """Cria uma sessão HTTP com pool de conexões e limite de taxa por host"""
+    session = requests.Session()
+    adapter = RateLimitedAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+async def _rate_limit_hook(request):
+    """Event hook do httpx: consome uma ficha do orçamento do host antes de cada envio"""
+    budget = get_budget(request.url.host)
+    if budget:
+        await aacquire(*budget)
+
+
+def build_async_client(max_connections=16, timeout=15):
+    """Cria um cliente HTTP assíncrono (httpx) com pool de conexões e limite de taxa por host"""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        timeout=timeout,
+        follow_redirects=True,
+        event_hooks={'request': [_rate_limit_hook]},
+    )
+
+
+# Clientes assíncronos por event loop: o pool de conexões do httpx pertence ao
+# loop em que foi criado. Com Uvicorn há um loop por worker (clientes reaproveitados
+# entre requisições); sob WSGI, o Django cria um loop por requisição assíncrona
+# (asyncio.run via async_to_sync), e os clientes são fechados quando ele termina.
+_async_clients = weakref.WeakKeyDictionary()
+
+
+async def _close_with_loop(loop, clients):
+    """
+    Tarefa que fica pendente enquanto o loop existir. Ao fim do loop o
+    asyncio.run cancela as tarefas pendentes e os clientes criados nele são
+    fechados (aclose), liberando as conexões.
+    """
+    try:
+        await loop.create_future()
+    finally:
+        _async_clients.pop(loop, None)
+        for client in clients.values():
+            await client.aclose()
+
+
+def get_async_client(name, max_connections=16):
+    """Retorna o cliente assíncrono 'name' do event loop atual, criando-o na primeira chamada"""
+    loop = asyncio.get_running_loop()
+    if loop not in _async_clients:
+        clients = {}
+        # A tarefa é guardada junto dos clientes: o loop só mantém referências fracas a ela
+        _async_clients[loop] = (clients, loop.create_task(_close_with_loop(loop, clients)))
+    clients, _ = _async_clients[loop]
+    if name not in clients:
+        clients[name] = build_async_client(max_connections=max_connections)
+    return clients[name]
@@ -0,0 +1,63 @@
+"""
+Receivers de sinais do app games.
+
+Conectados em GamesConfig.ready().
+"""
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import db, similarity, snapshot
+from .models import CatalogVersion, Game, GameRequest, UserRequestStats
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    """Aplica SQLITE_PRAGMAS e SQLITE_TRANSACTION_MODE a cada nova conexão SQLite"""
+    if connection.vendor == 'sqlite':
+        db.configure_sqlite(connection)
+
+
+@receiver(post_delete, sender=GameRequest)
+def discount_deleted_request(sender, instance, **kwargs):
+    """Remove dos contadores do usuário um pedido excluído (inclusive em exclusões em massa)"""
+    # Sem recriar contadores ausentes: na exclusão do próprio usuário eles já foram apagados
+    UserRequestStats.record_transition(instance.user_id, instance.status, None, rebuild_missing=False)
+
+
+@receiver(post_save, sender=Game)
+def index_saved_game(sender, instance, raw=False, **kwargs):
+    """Mantém o índice de duplicados (games/similarity.py) em dia com o catálogo"""
+    if not raw:
+        similarity.index_game(instance)
+
+
+@receiver(post_save, sender=Game)
+@receiver(post_delete, sender=Game)
+def rebuild_catalog_snapshot(sender, instance, raw=False, **kwargs):
+    """
+    Incrementa CatalogVersion e regera o snapshot compartilhado do catálogo
+    (games/snapshot.py) após o commit. Cargas de fixtures (raw) ficam de fora:
+    quem carrega em massa incrementa a versão uma vez no fim.
+    """
+    if raw:
+        return
+    CatalogVersion.bump()
+    transaction.on_commit(snapshot.request_rebuild)
+
+
+@receiver(post_save, sender=GameRequest)
+def index_saved_request(sender, instance, raw=False, **kwargs):
+    if not raw:
+        similarity.index_request(instance)
+
+
+@receiver(post_delete, sender=Game)
+def unindex_deleted_game(sender, instance, **kwargs):
+    similarity.unindex('game', instance.pk)
+
+
+@receiver(post_delete, sender=GameRequest)
+def unindex_deleted_request(sender, instance, **kwargs):
+    similarity.unindex('request', instance.pk)
@@ -0,0 +1,206 @@
+"""
+Índice de similaridade por trigramas para detectar pedidos duplicados.
+
+Mantém em memória os títulos dos jogos ativos do catálogo e dos pedidos ainda
+pendentes, com um índice invertido trigrama -> entradas. Uma busca só visita as
+entradas que compartilham algum trigrama com o título procurado, sem varrer as
+tabelas, e ordena os candidatos pela similaridade de Jaccard entre os conjuntos
+de trigramas.
+
+O índice é carregado na primeira busca de cada processo, atualizado pelos
+sinais de Game/GameRequest (games/signals.py) e recarregado a cada
+DUPLICATE_INDEX_TTL segundos, o que cobre alterações feitas por outros workers
+ou por .update() em massa.
+"""
+import math
+import threading
+import time
+from collections import defaultdict, namedtuple
+
+from django.conf import settings
+
+from .utils import normalize_search_term
+
+# Pedidos que ainda podem virar um jogo do catálogo
+INDEXED_REQUEST_STATUSES = ('pending', 'submitting')
+
+DuplicateMatch = namedtuple('DuplicateMatch', ['kind', 'pk', 'title', 'slug', 'score'])
+
+
+def trigrams(text):
+    """
+    Conjunto de trigramas de um título normalizado (sem acentos, casefold), com
+    cada palavra delimitada por espaços, como no pg_trgm.
+
+    Exemplo: "Mario" -> {'  m', ' ma', 'mar', 'ari', 'rio', 'io '}
+    """
+    words = ''.join(c if c.isalnum() else ' ' for c in normalize_search_term(text)).split()
+    grams = set()
+    for word in words:
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """Índice invertido de trigramas para títulos de jogos e pedidos"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # (kind, pk) -> (title, slug, trigramas)
+        self._postings = defaultdict(set)  # trigrama -> {(kind, pk)}
+        self.loaded_at = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for gram in entry[2]:
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+
+    def add(self, kind, pk, title, slug=None):
+        grams = trigrams(title)
+        key = (kind, pk)
+        with self._lock:
+            self._discard(key)
+            if not grams:
+                return
+            self._entries[key] = (title, slug, grams)
+            for gram in grams:
+                self._postings[gram].add(key)
+
+    def remove(self, kind, pk):
+        with self._lock:
+            self._discard((kind, pk))
+
+    def load(self, games, requests):
+        """Substitui o conteúdo por (pk, título, slug) dos jogos e (pk, título) dos pedidos"""
+        fresh = TrigramIndex()
+        for pk, title, slug in games:
+            fresh.add('game', pk, title, slug)
+        for pk, title in requests:
+            fresh.add('request', pk, title)
+        with self._lock:
+            self._entries, self._postings = fresh._entries, fresh._postings
+            self.loaded_at = time.monotonic()
+
+    def search(self, title, threshold=0.5, limit=5, exclude=None):
+        """
+        Retorna as entradas com similaridade >= threshold, da mais parecida para a menos.
+
+        Args:
+            title (str): Título procurado
+            threshold (float): Similaridade mínima (Jaccard de trigramas, 0 a 1)
+            limit (int): Máximo de resultados
+            exclude (tuple): Chave (kind, pk) a ignorar (ex.: o próprio pedido)
+
+        Returns:
+            list[DuplicateMatch]
+        """
+        grams = trigrams(title)
+        if not grams:
+            return []
+
+        with self._lock:
+            # Filtro de prefixo: com Jaccard >= threshold a entrada compartilha ao
+            # menos ceil(threshold * |grams|) trigramas, logo contém pelo menos um
+            # dos (|grams| - mínimo + 1) trigramas mais raros da busca. Só as
+            # listas desses trigramas são percorridas.
+            required = max(1, math.ceil(threshold * len(grams)))
+            rarest = sorted(grams, key=lambda gram: len(self._postings.get(gram, ())))
+            candidates = set()
+            for gram in rarest[:len(grams) - required + 1]:
+                candidates.update(self._postings.get(gram, ()))
+            candidates.discard(exclude)
+
+            matches = []
+            for key in candidates:
+                entry_title, slug, entry_grams = self._entries[key]
+                common = len(grams & entry_grams)
+                score = common / (len(grams) + len(entry_grams) - common)
+                if score >= threshold:
+                    matches.append(DuplicateMatch(key[0], key[1], entry_title, slug, round(score, 3)))
+
+        # Jogos do catálogo primeiro em caso de empate: já podem ser jogados
+        matches.sort(key=lambda m: (-m.score, m.kind != 'game', m.pk))
+        return matches[:limit]
+
+
+_index = TrigramIndex()
+_load_lock = threading.Lock()
+
+
+def index_expired():
+    """Indica se o índice do processo ainda não foi carregado ou passou de DUPLICATE_INDEX_TTL"""
+    ttl = settings.DUPLICATE_INDEX_TTL
+    return _index.loaded_at is None or bool(ttl and time.monotonic() - _index.loaded_at > ttl)
+
+
+def get_index():
+    """Retorna o índice do processo, (re)carregando do banco se vazio ou expirado"""
+    if index_expired():
+        with _load_lock:
+            if index_expired():
+                rebuild_index()
+    return _index
+
+
+def rebuild_index():
+    """Recarrega o índice com os jogos ativos e os pedidos pendentes (duas consultas)"""
+    from .models import Game, GameRequest
+
+    _index.load(
+        Game.objects.filter(is_active=True).values_list('pk', 'title', 'slug').iterator(),
+        GameRequest.objects.filter(status__in=INDEXED_REQUEST_STATUSES).values_list('pk', 'title').iterator(),
+    )
+
+
+def find_duplicates(title, exclude_request=None):
+    """
+    Jogos do catálogo e pedidos pendentes com título parecido com 'title'.
+
+    Args:
+        title (str): Título informado pelo usuário
+        exclude_request (int): pk de um pedido a ignorar
+
+    Returns:
+        list[DuplicateMatch]: até DUPLICATE_MAX_SUGGESTIONS resultados
+    """
+    return get_index().search(
+        title,
+        threshold=settings.DUPLICATE_SIMILARITY_THRESHOLD,
+        limit=settings.DUPLICATE_MAX_SUGGESTIONS,
+        exclude=('request', exclude_request) if exclude_request else None,
+    )
+
+
+def index_game(game):
+    """Atualiza a entrada de um jogo (somente se o índice já foi carregado neste processo)"""
+    if _index.loaded_at is None:
+        return
+    if game.is_active:
+        _index.add('game', game.pk, game.title, game.slug)
+    else:
+        _index.remove('game', game.pk)
+
+
+def index_request(game_request):
+    """Atualiza a entrada de um pedido (somente se o índice já foi carregado neste processo)"""
+    if _index.loaded_at is None:
+        return
+    if game_request.status in INDEXED_REQUEST_STATUSES:
+        _index.add('request', game_request.pk, game_request.title)
+    else:
+        _index.remove('request', game_request.pk)
+
+
+def unindex(kind, pk):
+    if _index.loaded_at is not None:
+        _index.remove(kind, pk)
@@ -0,0 +1,108 @@
+"""
+Alocação de slugs únicos para jogos, em lote.
+
+Títulos parecidos ("Pokémon Quetzal Alpha 0.6.9" repetido, "Donkey Kong!" e
+"Donkey Kong") geram o mesmo slugify. Em vez de tentar inserir e depender da
+restrição unique (uma consulta ou IntegrityError por tentativa), os slugs de
+um lote inteiro são reservados de uma vez:
+
+    1. uma consulta por igualdade (índice unique) descobre quais slugs base já existem;
+    2. só para as bases já usadas (ou repetidas no próprio lote), uma consulta
+       por prefixo traz os sufixos ocupados (base-2, base-3, ...);
+    3. os sufixos livres são escolhidos em memória.
+
+A restrição unique continua valendo como proteção contra inserções
+concorrentes entre a alocação e o INSERT.
+"""
+from collections import Counter
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+from django.utils.text import slugify
+
+DEFAULT_SLUG = 'jogo'  # para títulos sem nenhum caractere aproveitável
+SUFFIX_ROOM = 8  # espaço reservado para o sufixo '-N' dentro do max_length
+QUERY_CHUNK = 200  # valores por consulta (limites de parâmetros/expressões do SQLite)
+
+
+def slug_max_length():
+    from .models import Game
+    return Game._meta.get_field('slug').max_length
+
+
+def slug_base(title, max_length=None):
+    """Slug sem sufixo para um título, limitado a max_length"""
+    max_length = max_length or slug_max_length()
+    return (slugify(title or '') or DEFAULT_SLUG)[:max_length].strip('-') or DEFAULT_SLUG
+
+
+def _chunks(values, size=QUERY_CHUNK):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def taken_slugs(bases, exclude_pk=None):
+    """
+    Slugs já usados que podem colidir com as bases informadas.
+
+    Returns:
+        set: Slugs existentes iguais a alguma base ou no formato base-N
+    """
+    from .models import Game
+
+    queryset = Game.objects.all()
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+
+    max_length = slug_max_length()
+    counts = Counter(bases)
+    taken = set()
+    for chunk in _chunks(counts):
+        taken.update(queryset.filter(slug__in=chunk).values_list('slug', flat=True))
+
+    # Sufixos só importam para bases já usadas no banco ou repetidas no lote
+    crowded = sorted({base[:max_length - SUFFIX_ROOM] for base in counts if base in taken or counts[base] > 1})
+    for chunk in _chunks(crowded):
+        condition = reduce(or_, (Q(slug__startswith=prefix) for prefix in chunk))
+        taken.update(queryset.filter(condition).values_list('slug', flat=True))
+    return taken
+
+
+def allocate_slugs(titles, exclude_pk=None):
+    """
+    Reserva um slug único para cada título, na ordem recebida.
+
+    O primeiro título de cada base recebe a base (se estiver livre); os
+    seguintes recebem base-2, base-3, ... pulando os já existentes.
+
+    Args:
+        titles (list): Títulos dos jogos a criar
+        exclude_pk (int): Jogo a desconsiderar (ao renomear um jogo existente)
+
+    Returns:
+        list: Slugs, na mesma ordem de titles
+    """
+    max_length = slug_max_length()
+    bases = [slug_base(title, max_length) for title in titles]
+    taken = taken_slugs(bases, exclude_pk=exclude_pk)
+
+    next_suffix = {}
+    slugs = []
+    for base in bases:
+        candidate = base
+        number = next_suffix.get(base, 2)
+        while candidate in taken:
+            suffix = f'-{number}'
+            candidate = f'{base[:max_length - len(suffix)]}{suffix}'
+            number += 1
+        next_suffix[base] = number
+        taken.add(candidate)
+        slugs.append(candidate)
+    return slugs
+
+
+def allocate_slug(title, exclude_pk=None):
+    """Slug único para um único jogo (ver allocate_slugs)"""
+    return allocate_slugs([title], exclude_pk=exclude_pk)[0]
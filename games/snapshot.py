@@ -0,0 +1,428 @@
+"""
+Snapshot compacto do catálogo de jogos ativos, compartilhado entre os workers
+do Gunicorn por um arquivo mapeado em memória (mmap) em /dev/shm.
+
+Em vez de cada worker manter (ou consultar no banco) a sua própria cópia do
+catálogo, um único buffer contíguo é gravado no arquivo e mapeado por todos os
+processos da máquina: as páginas ficam uma única vez no page cache e a memória
+de cada worker não cresce com o catálogo. As views home, catalog e
+api_get_game_info leem diretamente do buffer, sem acessar o banco.
+
+Layout do arquivo (tipos nativos da máquina, que é quem lê o arquivo):
+
+    cabeçalho   HEADER: magic, versão, n (jogos), impressão digital do catálogo
+    ids         int64[n], na ordem do catálogo (título)
+    offsets     uint32[n + 1] para cada campo de STRING_FIELDS (início de cada
+                string no heap; o fim é o início da seguinte)
+    slug_order  uint32[n], posições ordenadas pelo slug (busca binária)
+    heap        strings UTF-8, campo a campo
+
+Atualização:
+    - o arquivo novo é gravado ao lado e trocado com os.replace (atômico): quem
+      já mapeou o anterior continua lendo-o até perceber a troca (os.stat);
+    - sinais de Game pedem uma reconstrução em segundo plano após o commit;
+    - um snapshot mais antigo que CATALOG_SNAPSHOT_TTL é revalidado em segundo
+      plano (uma consulta de agregação e a leitura de CatalogVersion; só é
+      reconstruído se o catálogo mudou), o que cobre alterações feitas por
+      outras máquinas/containers e gravações em massa sem sinais;
+    - gravações são serializadas entre processos com fcntl.flock.
+
+Sem snapshot (desativado, ainda não gerado ou ilegível) as views consultam o banco.
+"""
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from collections.abc import Sequence
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'RGCS'
+VERSION = 2
+# magic, versão, n, (reservado, alinha os arrays a 8 bytes), total de jogos,
+# maior pk, maior updated_at (timestamp), CatalogVersion.version
+HEADER = struct.Struct('=4sIIIqqdq')
+STRING_FIELDS = ('title', 'slug', 'cover_image', 'description', 'rom_url')
+OPTIONAL_FIELDS = ('cover_image', 'description', 'rom_url')  # '' no buffer, None na leitura
+REVALIDATE_INTERVAL = 5  # segundos mínimos entre pedidos de revalidação no mesmo processo
+
+
+class CatalogEntry(namedtuple('CatalogEntry', ('id',) + STRING_FIELDS)):
+    """Jogo lido do snapshot, com os mesmos atributos usados pelos templates"""
+    __slots__ = ()
+
+    @property
+    def pk(self):
+        return self.id
+
+
+def snapshot_path():
+    """
+    Caminho do arquivo de snapshot. O nome inclui um hash do banco configurado,
+    para que projetos/bancos diferentes na mesma máquina não compartilhem o arquivo.
+    """
+    database = settings.DATABASES['default']
+    identity = f"{database.get('ENGINE')}|{database.get('NAME')}|{database.get('HOST')}|{database.get('PORT')}"
+    digest = hashlib.sha1(identity.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(settings.CATALOG_SNAPSHOT_DIR, f'retro-games-catalog-{digest}.bin')
+
+
+def catalog_fingerprint():
+    """
+    Impressão digital do catálogo: muda quando jogos são criados, excluídos ou
+    salvos, e a cada CatalogVersion.bump() (sinais de Game e gravações em massa,
+    ex.: is_active alterado por .update() sem updated_at).
+
+    Returns:
+        tuple: (total de jogos, maior pk, maior updated_at como timestamp, versão)
+    """
+    from django.db.models import Count, Max
+
+    from .models import CatalogVersion, Game
+
+    row = Game.objects.aggregate(total=Count('pk'), max_pk=Max('pk'), max_updated=Max('updated_at'))
+    return (
+        row['total'],
+        row['max_pk'] or 0,
+        row['max_updated'].timestamp() if row['max_updated'] else 0.0,
+        CatalogVersion.current(),
+    )
+
+
+def build_buffer(rows, fingerprint):
+    """
+    Monta o conteúdo do arquivo a partir de (id, title, slug, cover_image,
+    description, rom_url), já na ordem do catálogo.
+
+    Returns:
+        bytes: Conteúdo completo do snapshot
+    """
+    ids = array('q')
+    columns = [[] for _ in STRING_FIELDS]
+    for row in rows:
+        ids.append(row[0])
+        for column, value in zip(columns, row[1:]):
+            column.append((value or '').encode('utf-8'))
+
+    count = len(ids)
+    offsets = []
+    position = 0
+    for column in columns:
+        field_offsets = array('I')
+        for value in column:
+            field_offsets.append(position)
+            position += len(value)
+        field_offsets.append(position)
+        offsets.append(field_offsets)
+    if position > 0xFFFFFFFF:
+        raise ValueError('Catálogo grande demais para o formato do snapshot (heap acima de 4 GiB)')
+
+    slugs = columns[STRING_FIELDS.index('slug')]
+    slug_order = array('I', sorted(range(count), key=slugs.__getitem__))
+
+    parts = [HEADER.pack(MAGIC, VERSION, count, 0, *fingerprint), ids.tobytes()]
+    parts.extend(field_offsets.tobytes() for field_offsets in offsets)
+    parts.append(slug_order.tobytes())
+    parts.extend(b''.join(column) for column in columns)
+    return b''.join(parts)
+
+
+class CatalogSnapshot(Sequence):
+    """Leitura do buffer mapeado: sequência de CatalogEntry na ordem do catálogo"""
+
+    def __init__(self, buffer):
+        magic, version, count, _, *fingerprint = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('Arquivo de snapshot do catálogo inválido ou de outra versão')
+        self._buffer = buffer
+        self._count = count
+        self.fingerprint = tuple(fingerprint)
+
+        view = memoryview(buffer)
+        position = HEADER.size
+        self._ids = view[position:position + 8 * count].cast('q')
+        position += 8 * count
+        self._offsets = []
+        for _ in STRING_FIELDS:
+            self._offsets.append(view[position:position + 4 * (count + 1)].cast('I'))
+            position += 4 * (count + 1)
+        self._slug_order = view[position:position + 4 * count].cast('I')
+        self._heap = position + 4 * count
+        self._slug_field = STRING_FIELDS.index('slug')
+
+    def __len__(self):
+        return self._count
+
+    def _string(self, field, index):
+        offsets = self._offsets[field]
+        return self._buffer[self._heap + offsets[index]:self._heap + offsets[index + 1]]
+
+    def _entry(self, index):
+        values = [self._string(field, index).decode('utf-8') for field in range(len(STRING_FIELDS))]
+        for name in OPTIONAL_FIELDS:
+            field = STRING_FIELDS.index(name)
+            values[field] = values[field] or None
+        return CatalogEntry(self._ids[index], *values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._entry(i) for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return self._entry(index)
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self._entry(index)
+
+    def find_slug(self, slug):
+        """Jogo com o slug informado (busca binária, sem decodificar o catálogo) ou None"""
+        target = slug.encode('utf-8')
+        order = self._slug_order
+        keys = _SlugKeys(self, order)
+        position = bisect_left(keys, target)
+        if position < len(order) and keys[position] == target:
+            return self._entry(order[position])
+        return None
+
+
+class _SlugKeys(Sequence):
+    """Visão dos slugs (bytes) na ordem de slug_order, para o bisect"""
+
+    def __init__(self, snapshot, order):
+        self._snapshot = snapshot
+        self._order = order
+
+    def __len__(self):
+        return len(self._order)
+
+    def __getitem__(self, position):
+        return self._snapshot._string(self._snapshot._slug_field, self._order[position])
+
+
+# ============================================================================
+# GRAVAÇÃO
+# ============================================================================
+
+class _FileLock:
+    """flock exclusivo em <snapshot>.lock, serializando gravações entre processos"""
+
+    def __init__(self, path, blocking=True):
+        self.path = f'{path}.lock'
+        self.blocking = blocking
+        self.fd = None
+
+    def __enter__(self):
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if fcntl is None:
+            return True
+        try:
+            fcntl.flock(self.fd, fcntl.LOCK_EX | (0 if self.blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            return False
+        return True
+
+    def __exit__(self, *exc_info):
+        os.close(self.fd)  # também libera o flock
+
+
+def _read_header(path):
+    try:
+        with open(path, 'rb') as snapshot_file:
+            magic, version, count, _, *fingerprint = HEADER.unpack(snapshot_file.read(HEADER.size))
+    except (OSError, struct.error):
+        return None
+    if magic != MAGIC or version != VERSION:
+        return None
+    return count, tuple(fingerprint)
+
+
+def _read_fingerprint(path):
+    header = _read_header(path)
+    return header and header[1]
+
+
+def snapshot_size():
+    """
+    Número de jogos no snapshot gravado, lido só do cabeçalho (sem mapear o
+    arquivo nem agendar revalidação).
+
+    Returns:
+        int: ou None se não há snapshot válido
+    """
+    header = _read_header(snapshot_path())
+    return header and header[0]
+
+
+def _write(path):
+    from .models import Game
+
+    fingerprint = catalog_fingerprint()
+    rows = (
+        Game.objects.filter(is_active=True).order_by('title', 'pk')
+        .values_list('pk', *STRING_FIELDS).iterator(chunk_size=2000)
+    )
+    data = build_buffer(rows, fingerprint)
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'wb') as snapshot_file:
+        snapshot_file.write(data)
+    os.replace(tmp_path, path)
+    return HEADER.unpack_from(data, 0)[2]
+
+
+def write_snapshot():
+    """
+    Gera o snapshot a partir do banco e o troca atomicamente.
+
+    Returns:
+        int: Número de jogos no snapshot
+    """
+    path = snapshot_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _FileLock(path):
+        count = _write(path)
+    logger.info(f"Snapshot do catálogo gravado em {path} ({count} jogos)")
+    return count
+
+
+def refresh_snapshot():
+    """
+    Revalida o snapshot: reconstrói se o catálogo mudou (ou se não existe) e,
+    caso contrário, apenas renova a data do arquivo. Não espera se outro
+    processo já estiver gravando.
+
+    Returns:
+        bool: True se o snapshot foi reconstruído
+    """
+    path = snapshot_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _FileLock(path, blocking=False) as acquired:
+        if not acquired:
+            return False
+        if _read_fingerprint(path) == catalog_fingerprint():
+            os.utime(path)
+            return False
+        _write(path)
+    return True
+
+
+# ============================================================================
+# LEITURA (por processo)
+# ============================================================================
+
+_current = None  # (identidade do arquivo, CatalogSnapshot)
+_current_lock = threading.Lock()
+_dirty = False
+_rebuild_lock = threading.Lock()
+_revalidate_lock = threading.Lock()
+_revalidate_requested_at = 0.0
+
+
+def get_snapshot():
+    """
+    Snapshot atual do catálogo, mapeado uma vez por processo e remapeado quando
+    o arquivo é trocado.
+
+    Returns:
+        CatalogSnapshot: ou None (desativado, ainda não gerado ou ilegível); nesse
+        caso quem chama deve consultar o banco
+    """
+    global _current
+    if not settings.CATALOG_SNAPSHOT_ENABLED:
+        return None
+    path = snapshot_path()
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        _request_revalidation()
+        return None
+
+    if settings.CATALOG_SNAPSHOT_TTL and time.time() - stat.st_mtime > settings.CATALOG_SNAPSHOT_TTL:
+        _request_revalidation()
+
+    identity = (stat.st_dev, stat.st_ino)
+    current = _current
+    if current is not None and current[0] == identity:
+        return current[1]
+
+    with _current_lock:
+        if _current is not None and _current[0] == identity:
+            return _current[1]
+        try:
+            with open(path, 'rb') as snapshot_file:
+                buffer = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+            snapshot = CatalogSnapshot(buffer)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Snapshot do catálogo ilegível ({path}): {e}")
+            return None
+        _current = (identity, snapshot)
+        return snapshot
+
+
+def _run_in_background(func):
+    from .collector import run_in_background
+    run_in_background(func)
+
+
+def _request_revalidation():
+    """Agenda refresh_snapshot em segundo plano (no máximo uma por REVALIDATE_INTERVAL)"""
+    global _revalidate_requested_at
+    now = time.monotonic()
+    if _revalidate_lock.locked() or now - _revalidate_requested_at < REVALIDATE_INTERVAL:
+        return
+    _revalidate_requested_at = now
+    _run_in_background(_revalidate)
+
+
+def _revalidate():
+    if not _revalidate_lock.acquire(blocking=False):
+        return
+    try:
+        refresh_snapshot()
+    finally:
+        _revalidate_lock.release()
+
+
+def request_rebuild():
+    """
+    Pede a reconstrução do snapshot em segundo plano (chamado após o commit de
+    alterações em Game). Vários pedidos seguidos resultam em poucas gravações:
+    enquanto uma reconstrução roda, novos pedidos apenas marcam o snapshot como
+    desatualizado e ela é repetida ao final.
+    """
+    global _dirty
+    if not settings.CATALOG_SNAPSHOT_ENABLED:
+        return
+    _dirty = True
+    if not _rebuild_lock.locked():
+        _run_in_background(_rebuild_while_dirty)
+
+
+def _rebuild_while_dirty():
+    global _dirty
+    while True:
+        if not _rebuild_lock.acquire(blocking=False):
+            return
+        try:
+            while _dirty:
+                _dirty = False
+                write_snapshot()
+        finally:
+            _rebuild_lock.release()
+        if not _dirty:
+            return
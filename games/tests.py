@@ -1,3 +1,464 @@
-from django.test import TestCase
+import hashlib
+import hmac
+import json
+import os
+import re
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import requests
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import collector, signals, similarity, slugs
+from .management.commands.load_initial_games import Command as LoadInitialGamesCommand
+from .middleware import QueryBudgetExceeded
+from .models import CatalogVersion, Game, GameRequest, RequestSearchResult
+
+
+class GameContentKeyTests(TestCase):
+    """content_key (identidade da ROM) e os duplicados desativados pela migração 0021"""
+
+    ROM_URL = 'https://www.retrogames.cc/embed/12345-super-mario-world.html'
+
+    def setUp(self):
+        self.original = Game.objects.create(title='Super Mario World', rom_url=self.ROM_URL)
+        # Estado deixado pelo backfill da 0021: mesma ROM, desativado e sem content_key
+        self.duplicate = Game.objects.create(title='Super Mario World (cópia)', rom_url='https://example.com/tmp')
+        Game.objects.filter(pk=self.duplicate.pk).update(rom_url=self.ROM_URL, content_key=None, is_active=False)
+
+    def test_backfilled_duplicate_can_be_saved(self):
+        duplicate = Game.objects.get(pk=self.duplicate.pk)
+        duplicate.title = 'Super Mario World (revisado)'
+        duplicate.full_clean()
+        duplicate.save()
+
+        duplicate.refresh_from_db()
+        self.assertEqual(duplicate.title, 'Super Mario World (revisado)')
+        self.assertIsNone(duplicate.content_key)
+
+    def test_backfilled_duplicate_gets_key_when_rom_changes(self):
+        duplicate = Game.objects.get(pk=self.duplicate.pk)
+        duplicate.rom_url = 'https://www.retrogames.cc/embed/67890-super-mario-world-2.html'
+        duplicate.full_clean()
+        duplicate.save()
+
+        duplicate.refresh_from_db()
+        self.assertEqual(duplicate.content_key, 'retrogames:67890')
+
+    def test_changing_rom_to_existing_one_is_rejected(self):
+        game = Game.objects.create(title='Outro Jogo', rom_url='https://www.retrogames.cc/embed/555-outro.html')
+        game.rom_url = self.ROM_URL
+        with self.assertRaisesMessage(ValidationError, 'Este jogo já está no catálogo'):
+            game.full_clean()
+
+
+@override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_STRICT=True, CATALOG_SNAPSHOT_ENABLED=False)
+class QueryBudgetTests(TestCase):
+    """
+    Cada view em QUERY_BUDGETS deve caber no seu orçamento (modo estrito:
+    excedê-lo levanta QueryBudgetExceeded). Há várias linhas por lista para
+    que um N+1 apareça na contagem.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.games = [
+            Game.objects.create(title=f'Jogo {index}', rom_url=f'https://www.retrogames.cc/embed/{index}-jogo.html')
+            for index in range(1, 9)
+        ]
+        cls.user = User.objects.create_user('jogador', password='senha')
+        cls.staff = User.objects.create_user('admin', password='senha', is_staff=True)
+        cls.requests = [
+            GameRequest.objects.create(user=user, title=f'Pedido {index}', details='Detalhes', status='pending')
+            for index in range(5)
+            for user in (cls.user, cls.staff)
+        ]
+        cls.completed = GameRequest.objects.create(
+            user=cls.user, title='Concluído', details='Detalhes', status='approved',
+            kickoff_id='kickoff-1', execution_status='completed',
+        )
+
+    # admin_check_api_status consultando a API porque o poller está atrasado:
+    # o SELECT inicial, o UPDATE de apply_status, a releitura e os resultados
+    CHECK_STATUS_FALLBACK_BUDGET = 4
+
+    def setUp(self):
+        cache.clear()
+        # Orçamentos medem o estado estável: índice de duplicados já carregado
+        similarity.rebuild_index()
+
+    def assertWithinBudget(self, response, view_name, budget=None):
+        self.assertLess(response.status_code, 400)
+        self.assertLessEqual(int(response['X-Query-Count']), budget or settings.QUERY_BUDGETS[view_name])
+
+    def test_public_views(self):
+        for view_name, args in (
+            ('home', []),
+            ('catalog', []),
+            ('game_detail', [self.games[0].slug]),
+            ('api_get_game_info', [self.games[0].slug]),
+        ):
+            with self.subTest(view_name):
+                self.assertWithinBudget(self.client.get(reverse(view_name, args=args)), view_name)
+
+    def test_user_views(self):
+        self.client.force_login(self.user)
+        self.assertWithinBudget(self.client.get(reverse('my_game_requests')), 'my_game_requests')
+        self.assertWithinBudget(self.client.get(reverse('request_game')), 'request_game')
+        response = self.client.post(reverse('request_game'), {
+            'title': 'Sonic the Hedgehog', 'details': 'Mega Drive', 'confirm_new': 'on',
+        })
+        self.assertRedirects(response, reverse('my_game_requests'), fetch_redirect_response=False)
+        self.assertWithinBudget(response, 'request_game')
+
+    def test_admin_views(self):
+        self.client.force_login(self.staff)
+        for view_name, args in (
+            ('admin_game_requests_list', []),
+            ('admin_game_request_detail', [self.requests[0].pk]),
+            ('admin_check_api_status', [self.completed.pk]),
+        ):
+            with self.subTest(view_name):
+                self.assertWithinBudget(self.client.get(reverse(view_name, args=args)), view_name)
+
+    def test_check_status_fallback_to_api(self):
+        self.client.force_login(self.staff)
+        running = GameRequest.objects.create(
+            user=self.user, title='Em andamento', details='Detalhes', status='approved',
+            kickoff_id='kickoff-2', execution_status='running',
+        )
+        budget = self.CHECK_STATUS_FALLBACK_BUDGET
+        with override_settings(QUERY_BUDGETS={**settings.QUERY_BUDGETS, 'admin_check_api_status': budget}), \
+                mock.patch.object(collector, 'afetch_status', mock.AsyncMock(return_value={'state': 'RUNNING'})) as fetch:
+            response = self.client.get(reverse('admin_check_api_status', args=[running.pk]))
+        fetch.assert_awaited_once()
+        self.assertWithinBudget(response, 'admin_check_api_status', budget)
+
+    def test_exceeding_budget_fails_in_strict_mode(self):
+        with override_settings(QUERY_BUDGETS={'game_detail': 1}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse('game_detail', args=[self.games[0].slug]))
+
+
+WEBHOOK_URLS = {'taskWebhookUrl': '', 'stepWebhookUrl': '', 'crewWebhookUrl': ''}
+
+
+class FollowerApprovalTests(TestCase):
+    """Aprovação da mesma consulta enquanto outra ainda envia o /kickoff: sem espera"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('jogador', password='senha')
+        self.leader = GameRequest.objects.create(user=self.user, title='Zelda', ai_query='Zelda', status='pending')
+        self.follower = GameRequest.objects.create(user=self.user, title='Zelda', ai_query='  ZELDA ', status='pending')
+        self.assertEqual(collector.claim_approval(self.leader), 'pending')
+
+    @mock.patch.object(collector, 'post_kickoff')
+    def test_follower_returns_without_kickoff_and_is_attached_by_leader(self, post_kickoff):
+        result = collector.approve_request(self.follower, WEBHOOK_URLS)
+        self.assertEqual(result['outcome'], 'in_flight')
+        post_kickoff.assert_not_called()
+        self.follower.refresh_from_db()
+        self.assertEqual((self.follower.status, self.follower.execution_status), ('approved', 'running'))
+        self.assertIsNone(self.follower.kickoff_id)
+
+        # A líder recebe o kickoff_id e sai de 'submitting'
+        GameRequest.objects.filter(pk=self.leader.pk).update(
+            status='approved', execution_status='running', kickoff_id='kickoff-1'
+        )
+        self.assertEqual(collector.resolve_followers(self.leader.ai_query_key), 1)
+        self.follower.refresh_from_db()
+        self.assertEqual(self.follower.kickoff_id, 'kickoff-1')
+
+    def test_follower_returns_to_pending_when_leader_fails(self):
+        collector.approve_request(self.follower, WEBHOOK_URLS)
+        collector.release_approval(self.leader, 'pending')
+        self.assertEqual(collector.resolve_waiting_requests(), 1)
+        self.follower.refresh_from_db()
+        self.assertEqual(self.follower.status, 'pending')
+        self.assertIsNone(self.follower.execution_status)
+
+
+def fake_search(game_name, max_results=5):
+    """Substitui a busca no retrogames.cc: um resultado por nome"""
+    return [{'title': game_name, 'game_url': f'https://www.retrogames.cc/{game_name.lower()}.html'}]
+
+
+@override_settings(GAME_COLLECTOR_WEBHOOK_SECRET='segredo')
+@mock.patch.object(collector, 'search_games_on_retrogames', fake_search)
+@mock.patch.object(collector, 'run_in_background', lambda func, *args: func(*args))
+class CollectorWebhookTests(TestCase):
+    """Webhook de conclusão: assinatura HMAC, idempotência e claims abandonados"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('jogador', password='senha')
+        self.game_request = GameRequest.objects.create(
+            user=self.user, title='Zelda', status='approved', kickoff_id='kickoff-1', execution_status='running',
+        )
+        self.body = json.dumps({'kickoff_id': 'kickoff-1', 'result': 'Zelda\nZelda II'}).encode('utf-8')
+        self.url = reverse('collector_webhook', args=['crew'])
+
+    def post(self, signature):
+        return self.client.post(self.url, self.body, content_type='application/json', HTTP_X_SIGNATURE=signature)
+
+    def sign(self, body):
+        return hmac.new(b'segredo', body, hashlib.sha256).hexdigest()
+
+    def test_bad_or_missing_signature_is_rejected(self):
+        for signature in ('', 'sha256=' + '0' * 64, self.sign(b'outro corpo')):
+            with self.subTest(signature=signature), self.assertLogs('games.views', 'WARNING'):
+                self.assertEqual(self.post(signature).status_code, 403)
+        self.game_request.refresh_from_db()
+        self.assertEqual(self.game_request.execution_status, 'running')
+
+    def test_valid_signature_completes_request_and_replay_is_duplicate(self):
+        response = self.post(self.sign(self.body))
+        self.assertEqual(response.status_code, 202)
+        self.game_request.refresh_from_db()
+        self.assertEqual(self.game_request.execution_status, 'completed')
+        self.assertEqual(self.game_request.game_names, ['Zelda', 'Zelda II'])
+        self.assertEqual(self.game_request.search_results.count(), 2)
+
+        # Reenvio (com o prefixo sha256=): não processa de novo
+        response = self.post('sha256=' + self.sign(self.body))
+        self.assertEqual(response.json(), {'status': 'duplicate'})
+        self.assertEqual(self.game_request.search_results.count(), 2)
+
+    def test_stale_claim_is_released_by_poller(self):
+        self.assertEqual(collector.claim_completion('kickoff-1'), 1)
+        GameRequest.objects.filter(pk=self.game_request.pk).update(
+            status_checked_at=timezone.now() - timedelta(seconds=settings.GAME_COLLECTOR_STALE_CLAIM_SECONDS + 1)
+        )
+        with mock.patch.object(collector, 'fetch_status', return_value={'state': 'RUNNING'}):
+            call_command('poll_kickoffs', '--once', stdout=StringIO())
+        self.game_request.refresh_from_db()
+        self.assertEqual(self.game_request.execution_status, 'running')
+
+    def test_lost_claim_stops_post_processing(self):
+        self.assertEqual(collector.claim_completion('kickoff-1'), 1)
+        claimed_at = GameRequest.objects.get(pk=self.game_request.pk).status_checked_at
+        # Outro processo reivindica de novo após release_stale_claims: o heartbeat antigo não vale mais
+        collector.release_stale_claims(-1)
+        collector.claim_completion('kickoff-1')
+        self.assertIsNone(collector.renew_claim([self.game_request.pk], claimed_at, searched_names=1))
+
+
+@mock.patch.object(collector, 'post_kickoff', return_value='kickoff-novo')
+class ApprovalClaimTests(TestCase):
+    """Compare-and-set da aprovação por 'submitting' (collector.claim_approval)"""
+
+    def setUp(self):
+        self.staff = User.objects.create_user('admin', password='senha', is_staff=True)
+        self.game_request = GameRequest.objects.create(user=self.staff, title='Zelda', status='pending')
+        self.url = reverse('admin_approve_request', args=[self.game_request.pk])
+        self.client.force_login(self.staff)
+
+    def approve(self):
+        return self.client.post(self.url, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+    def test_second_approve_while_submitting_is_conflict(self, post_kickoff):
+        self.assertEqual(collector.claim_approval(self.game_request), 'pending')
+        response = self.approve()
+        self.assertEqual(response.status_code, 409)
+        post_kickoff.assert_not_called()
+        self.game_request.refresh_from_db()
+        self.assertEqual(self.game_request.status, 'submitting')
+
+    def test_claim_is_released_when_kickoff_fails(self, post_kickoff):
+        for error in (requests.exceptions.ConnectionError('API fora do ar'), RuntimeError('falha inesperada')):
+            with self.subTest(error=type(error).__name__):
+                post_kickoff.side_effect = error
+                with self.assertLogs('games.collector', 'WARNING'):
+                    self.assertEqual(self.approve().status_code, 500)
+                self.game_request.refresh_from_db()
+                self.assertEqual(self.game_request.status, 'pending')
+                self.assertIsNone(self.game_request.kickoff_id)
+
+    def test_completed_request_is_not_approvable(self, post_kickoff):
+        GameRequest.objects.filter(pk=self.game_request.pk).update(
+            status='approved', kickoff_id='kickoff-1', execution_status='completed'
+        )
+        self.game_request.refresh_from_db()
+        self.assertIsNone(collector.claim_approval(self.game_request))
+        self.assertEqual(self.approve().status_code, 409)
+        post_kickoff.assert_not_called()
+        self.game_request.refresh_from_db()
+        self.assertEqual((self.game_request.status, self.game_request.kickoff_id), ('approved', 'kickoff-1'))
+
+    def test_approve_starts_kickoff(self, post_kickoff):
+        response = self.approve()
+        self.assertEqual(response.json()['kickoff_id'], 'kickoff-novo')
+        self.game_request.refresh_from_db()
+        self.assertEqual((self.game_request.status, self.game_request.execution_status), ('approved', 'running'))
+
+
+@mock.patch.object(collector, 'post_kickoff', return_value='kickoff-novo')
+class ReapprovalTests(TestCase):
+    """Reaprovar uma requisição com resultados de um kickoff anterior"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('jogador', password='senha')
+        self.game_request = GameRequest.objects.create(
+            user=self.user, title='Zelda', status='rejected', kickoff_id='kickoff-antigo',
+            execution_status='completed', game_names=['Zelda'], searched_names=1,
+            ai_response_blob=GameRequest.compress_response_data({'result': 'Zelda'}),
+        )
+        RequestSearchResult.objects.create(
+            game_request=self.game_request, game_name='Zelda', title='Zelda', game_url='https://www.retrogames.cc/zelda.html',
+        )
+
+    def test_new_kickoff_discards_previous_results(self, post_kickoff):
+        result = collector.approve_request(self.game_request, WEBHOOK_URLS, force_refresh=True)
+        self.assertEqual(result['outcome'], 'started')
+        self.game_request.refresh_from_db()
+        self.assertEqual(self.game_request.kickoff_id, 'kickoff-novo')
+        self.assertIsNone(self.game_request.ai_response_blob)
+        self.assertEqual((self.game_request.game_names, self.game_request.searched_names), ([], 0))
+        self.assertFalse(self.game_request.search_results.exists())
+
+
+@override_settings(GAME_COLLECTOR_BULK_CONCURRENCY=1)
+class BulkApproveTests(TransactionTestCase):
+    """
+    Aprovação em lote pela view: um /kickoff por termo normalizado e o resumo
+    por resultado. TransactionTestCase: bulk_approve grava em threads próprias
+    (uma só aqui: o SQLite em memória dos testes trava escritas simultâneas).
+    """
+
+    def setUp(self):
+        self.staff = User.objects.create_user('admin', password='senha', is_staff=True)
+        self.client.force_login(self.staff)
+
+    def create(self, ai_query, status='pending'):
+        return GameRequest.objects.create(user=self.staff, title=ai_query, ai_query=ai_query, status=status).pk
+
+    def test_one_kickoff_per_normalized_term(self):
+        pks = [
+            self.create('Zelda'), self.create('  ZÉLDA '), self.create('zelda'),
+            self.create('Super Mario'),
+            self.create('Metroid', status='approved'),
+            999999,
+        ]
+        kickoffs = iter(['kickoff-1', 'kickoff-2'])
+        with mock.patch.object(collector, 'post_kickoff', side_effect=lambda *args, **kwargs: next(kickoffs)) as post_kickoff:
+            response = self.client.post(
+                reverse('admin_bulk_approve_requests'), {'request_ids': pks}, HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+            )
+
+        self.assertEqual(sorted(call.args[0] for call in post_kickoff.call_args_list), ['Super Mario', 'Zelda'])
+        data = response.json()
+        self.assertEqual(data['summary'], {'started': 2, 'in_flight': 2, 'conflict': 1, 'not_found': 1})
+        self.assertEqual(data['approved'], 4)
+        self.assertEqual([result['id'] for result in data['results']], pks)
+        zelda_kickoffs = set(GameRequest.objects.filter(pk__in=pks[:3]).values_list('kickoff_id', flat=True))
+        self.assertEqual(len(zelda_kickoffs), 1)
+
+
+@override_settings(CATALOG_SNAPSHOT_ENABLED=False)
+class LoadInitialGamesTests(TestCase):
+    """Importação em lotes: checkpoint/--resume, repetidos no lote e --workers"""
+
+    RECORDS = (
+        {'name': 'Alpha', 'src': 'https://www.retrogames.cc/embed/1-alpha.html'},
+        {'name': 'Alpha 2', 'src': 'https://www.retrogames.cc/embed/1-alpha.html'},  # repete #1 no lote
+        {'name': 'Beta', 'src': 'https://www.retrogames.cc/embed/2-beta.html'},
+        {'name': 'Gamma', 'src': 'https://www.retrogames.cc/embed/3-gamma.html'},
+        {'name': ''},  # sem título
+        {'name': 'Delta', 'src': 'https://www.retrogames.cc/embed/4-delta.html'},
+    )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'jogos.ndjson')
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(record) + '\n' for record in self.RECORDS)
+
+    def load(self, *args):
+        output = StringIO()
+        call_command('load_initial_games', '--json-file', self.path, '--batch-size', '3', *args, stdout=output)
+        return dict(re.findall(r'(Jogos criados|Jogos ignorados|Total processado)[^:\n]*: (\d+)', output.getvalue()))
+
+    def assertImported(self, summary):
+        self.assertEqual(summary, {'Jogos criados': '4', 'Jogos ignorados': '2', 'Total processado': '6'})
+        self.assertEqual(
+            sorted(Game.objects.values_list('title', flat=True)), ['Alpha 2', 'Beta', 'Delta', 'Gamma']
+        )
+
+    def test_resume_after_interrupted_chunk(self):
+        write_chunk = LoadInitialGamesCommand.write_chunk
+        written = []
+
+        def interrupted(command, *args):
+            if written:
+                raise RuntimeError('importação interrompida')
+            written.append(args)
+            return write_chunk(command, *args)
+
+        with mock.patch.object(LoadInitialGamesCommand, 'write_chunk', interrupted):
+            with self.assertRaisesMessage(CommandError, 'importação interrompida'):
+                self.load()
+        self.assertEqual(Game.objects.count(), 2)  # só o primeiro lote foi confirmado
+        self.assertTrue(os.path.exists(f'{self.path}.checkpoint'))
+        self.assertEqual(CatalogVersion.current(), 1)
+
+        self.assertImported(self.load('--resume'))
+        self.assertFalse(os.path.exists(f'{self.path}.checkpoint'))
+        self.assertEqual(CatalogVersion.current(), 2)
+
+    def test_workers(self):
+        self.assertImported(self.load('--workers', '2'))
+        self.assertEqual(CatalogVersion.current(), 1)  # uma versão por execução, não por lote
+
+    def test_unchanged_import_keeps_version(self):
+        self.load()
+        self.assertEqual(self.load()['Jogos criados'], '0')
+        self.assertEqual(CatalogVersion.current(), 1)
+
+    def test_raw_save_does_not_bump_version(self):
+        game = Game.objects.create(title='Alpha')
+        version = CatalogVersion.current()
+        signals.rebuild_catalog_snapshot(Game, game, raw=True)
+        self.assertEqual(CatalogVersion.current(), version)
+
+
+class AllocateSlugsTests(TestCase):
+    """Slugs únicos e determinísticos para títulos que colidem, no lote e com o banco"""
+
+    TITLES = ['Donkey Kong!', 'Donkey Kong', 'donkey kong', 'Metroid', 'Metroid', '', '!!!']
+
+    def setUp(self):
+        self.existing = Game.objects.create(title='Donkey Kong')
+        Game.objects.create(title='Donkey Kong III', slug='donkey-kong-3')
+
+    def test_colliding_titles(self):
+        allocated = slugs.allocate_slugs(self.TITLES)
+
+        self.assertEqual(
+            allocated,
+            ['donkey-kong-2', 'donkey-kong-4', 'donkey-kong-5', 'metroid', 'metroid-2', 'jogo', 'jogo-2'],
+        )
+        self.assertEqual(slugs.allocate_slugs(self.TITLES), allocated)
+        # A restrição unique aceita o lote inteiro
+        Game.objects.bulk_create(Game(title=title, slug=slug) for title, slug in zip(self.TITLES, allocated))
+        self.assertEqual(Game.objects.filter(slug__in=allocated).count(), len(allocated))
+
+    def test_long_titles_keep_suffix_within_max_length(self):
+        max_length = slugs.slug_max_length()
+        allocated = slugs.allocate_slugs(['a' * 250] * 3)
+
+        self.assertEqual(len(set(allocated)), 3)
+        self.assertEqual(allocated[0], 'a' * max_length)
+        self.assertEqual(allocated[2], 'a' * (max_length - 2) + '-3')
+
+    def test_exclude_pk_keeps_own_slug(self):
+        self.assertEqual(slugs.allocate_slug('Donkey Kong', exclude_pk=self.existing.pk), 'donkey-kong')
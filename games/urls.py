@@ -18,6 +18,10 @@ urlpatterns = [
     
     # API Endpoints
     path('api/game/<slug:slug>/', views.api_get_game_info, name='api_get_game_info'),
+    path('api/catalog/export/', views.api_export_catalog, name='api_export_catalog'),
+    
+    # Webhooks da API de coleta de jogos (assinados com HMAC)
+    path('webhooks/collector/<str:event>/', views.collector_webhook, name='collector_webhook'),
 ]
 
 # ============================================================================
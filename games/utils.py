@@ -1,17 +1,166 @@
 """
 Utilitários para busca e processamento de jogos no retrogames.cc
 """
+import hashlib
+import re
 import requests
+import threading
+import unicodedata
+from asgiref.sync import sync_to_async
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse, quote_plus
 import logging
 
+from . import ratelimit
+
 logger = logging.getLogger(__name__)
 
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Retorna a sessão HTTP compartilhada para o retrogames.cc, com conexões
+    keep-alive em pool e o orçamento de requisições de OUTBOUND_RATE_LIMITS
+    (compartilhado entre os workers, ver games/ratelimit.py).
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = ratelimit.build_session(pool_connections=2, pool_maxsize=16)
+    return _session
+
+
+def get_async_client():
+    """Cliente HTTP assíncrono para o retrogames.cc (views async), com o mesmo orçamento de get_session"""
+    return ratelimit.get_async_client('retrogames', max_connections=16)
+
+
+# Headers para simular um navegador
+RETROGAMES_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7',
+}
+
+
+def normalize_search_term(text):
+    """
+    Normaliza um termo de busca para comparação: remove acentos, aplica casefold
+    e colapsa espaços em branco.
+
+    Exemplo: "  Pokémon   QUETZAL " -> "pokemon quetzal"
+
+    Args:
+        text (str): Termo de busca
+
+    Returns:
+        str: Termo normalizado (vazio se text for vazio)
+    """
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', text)
+    without_accents = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(without_accents.casefold().split())
+
+
+# Id numérico do jogo no retrogames.cc: /embed/45227-pokemon-quetzal-alpha-0-6-9.html
+_RETROGAMES_EMBED_ID = re.compile(r'^/embed/(\d+)(?:[-./]|$)')
+
+
+def build_content_key(url):
+    """
+    Chave de conteúdo de um jogo a partir da URL da ROM/embed, usada para
+    detectar o mesmo jogo importado com títulos diferentes.
+
+    - retrogames.cc: 'retrogames:<id>' (o id numérico do /embed/)
+    - outras URLs: 'url:<sha1>' da URL normalizada (host em minúsculas, sem
+      esquema, fragmento ou barra final)
+
+    Exemplo: "https://www.retrogames.cc/embed/45227-pokemon.html" -> "retrogames:45227"
+
+    Returns:
+        str: Chave de conteúdo ou None se a URL for vazia/inválida
+    """
+    if not url:
+        return None
+    parsed = urlparse(url.strip())
+    host = (parsed.hostname or '').lower()
+    if not host:
+        return None
+    if host == 'retrogames.cc' or host.endswith('.retrogames.cc'):
+        match = _RETROGAMES_EMBED_ID.match(parsed.path)
+        if match:
+            return f'retrogames:{int(match.group(1))}'
+    canonical = host + parsed.path.rstrip('/') + (f'?{parsed.query}' if parsed.query else '')
+    return 'url:' + hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+def parse_embed_page(html, game_url):
+    """
+    Extrai a URL do embed do HTML da página do jogo buscando o textarea readonly.
+    
+    Args:
+        html (str): Conteúdo da página do jogo
+        game_url (str): URL da página (usada no fallback)
+    
+    Returns:
+        str: URL do embed ou None se não encontrado
+    
+    Raises:
+        ValueError: Se a página do embed estiver offline
+    """
+    if 'offline' in html.lower():
+        raise ValueError("A página do embed está offline ou inacessível")
+    
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # Buscar textarea readonly
+    all_textareas = soup.find_all('textarea')
+    textarea = None
+    
+    # Tentar diferentes formas de buscar o textarea readonly
+    textarea = soup.find('textarea', {'readonly': True})
+    if not textarea:
+        textarea = soup.find('textarea', {'readonly': ''})
+    if not textarea:
+        for ta in all_textareas:
+            if 'readonly' in ta.attrs:
+                textarea = ta
+                break
+    if not textarea:
+        try:
+            textarea = soup.select_one('textarea[readonly]')
+        except:
+            pass
+    
+    if textarea:
+        # Obter o texto completo do textarea (conteúdo interno HTML)
+        textarea_content = textarea.decode_contents() if hasattr(textarea, 'decode_contents') else ''
+        
+        if not textarea_content or not textarea_content.strip():
+            textarea_content = ''.join(str(child) for child in textarea.children) if hasattr(textarea, 'children') else ''
+        
+        if not textarea_content or not textarea_content.strip():
+            textarea_content = textarea.string or ''
+        
+        if textarea_content and textarea_content.strip():
+            return textarea_content.strip()
+    
+    # Fallback: tentar construir URL de embed baseado na URL do jogo
+    if '/play/' in game_url:
+        return game_url.replace('/play/', '/embed/')
+    elif '/embed/' in game_url:
+        return game_url
+    
+    return None
+
 
 def _extract_embed_url(game_url, headers):
     """
-    Extrai a URL do embed da página do jogo buscando o textarea readonly.
+    Baixa a página do jogo e extrai a URL do embed (ver parse_embed_page).
     
     Args:
         game_url (str): URL da página do jogo
@@ -21,64 +170,48 @@ def _extract_embed_url(game_url, headers):
         str: URL do embed ou None se não encontrado
     """
     try:
-        response = requests.get(game_url, headers=headers, timeout=15)
+        response = get_session().get(game_url, headers=headers, timeout=15)
         response.raise_for_status()
-        
-        if 'offline' in response.text.lower() or 'Offline' in response.text:
-            raise Exception("A página do embed está offline ou inacessível")
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Buscar textarea readonly
-        all_textareas = soup.find_all('textarea')
-        textarea = None
-        
-        # Tentar diferentes formas de buscar o textarea readonly
-        textarea = soup.find('textarea', {'readonly': True})
-        if not textarea:
-            textarea = soup.find('textarea', {'readonly': ''})
-        if not textarea:
-            for ta in all_textareas:
-                if 'readonly' in ta.attrs:
-                    textarea = ta
-                    break
-        if not textarea:
-            try:
-                textarea = soup.select_one('textarea[readonly]')
-            except:
-                pass
-        
-        if textarea:
-            # Obter o texto completo do textarea (conteúdo interno HTML)
-            textarea_content = textarea.decode_contents() if hasattr(textarea, 'decode_contents') else ''
-            
-            if not textarea_content or not textarea_content.strip():
-                textarea_content = ''.join(str(child) for child in textarea.children) if hasattr(textarea, 'children') else ''
-            
-            if not textarea_content or not textarea_content.strip():
-                textarea_content = textarea.string or ''
-            
-            if textarea_content and textarea_content.strip():
-                return textarea_content.strip()
-        
-        # Fallback: tentar construir URL de embed baseado na URL do jogo
-        if '/play/' in game_url:
-            return game_url.replace('/play/', '/embed/')
-        elif '/embed/' in game_url:
-            return game_url
-        
+        return parse_embed_page(response.text, game_url)
     except Exception as e:
         logger.warning(f"Erro ao extrair conteúdo do embed de {game_url}: {str(e)}")
-    
     return None
 
 
-def search_games_on_retrogames(query, max_results=5):
+async def aextract_embed_url(game_url, headers=None):
+    """
+    Versão assíncrona de _extract_embed_url: o download não ocupa o worker e o
+    parsing do HTML roda em uma thread, fora do event loop.
+    """
+    try:
+        response = await get_async_client().get(game_url, headers=headers or RETROGAMES_HEADERS)
+        response.raise_for_status()
+        return await sync_to_async(parse_embed_page, thread_sensitive=False)(response.text, game_url)
+    except Exception as e:
+        logger.warning(f"Erro ao extrair conteúdo do embed de {game_url}: {str(e)}")
+    return None
+
+
+def build_search_url(query):
+    """URL de busca no retrogames.cc (formato: https://www.retrogames.cc/search?q={termo})"""
+    return f"https://www.retrogames.cc/search?q={quote_plus(query)}"
+
+
+# Headers da página de busca (além dos de RETROGAMES_HEADERS)
+SEARCH_HEADERS = {
+    **RETROGAMES_HEADERS,
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+
+def parse_search_results(html, max_results=5):
     """
-    Busca jogos no site retrogames.cc e retorna os primeiros resultados.
+    Extrai os jogos do HTML da página de busca do retrogames.cc.
     
     Args:
-        query (str): Termo de busca (nome do jogo)
+        html (str): Conteúdo da página de busca
         max_results (int): Número máximo de resultados a retornar (padrão: 5)
     
     Returns:
@@ -90,197 +223,211 @@ def search_games_on_retrogames(query, max_results=5):
     """
     results = []
     
-    try:
-        # URL de busca no retrogames.cc
-        # Formato correto: https://www.retrogames.cc/search?q={termo}
-        encoded_query = quote_plus(query)
-        search_url = f"https://www.retrogames.cc/search?q={encoded_query}"
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # Estratégias para encontrar os resultados de jogos
+    # Estratégia 1: Buscar por links que contenham imagens de jogos
+    game_links = soup.find_all('a', href=True)
+    
+    for link in game_links:
+        if len(results) >= max_results:
+            break
         
-        # Headers para simular um navegador
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        }
+        # Ignorar elementos com title="Retro Games"
+        link_title = link.get('title', '')
+        img = link.find('img')
+        img_title = img.get('title', '') if img else ''
         
-        logger.info(f"Buscando jogos no retrogames.cc com query: {query}")
+        if link_title == 'Retro Games' or img_title == 'Retro Games':
+            continue
         
-        # Fazer requisição GET
-        response = requests.get(search_url, headers=headers, timeout=15)
-        response.raise_for_status()
+        # Verificar se o link contém uma imagem
+        if not img:
+            continue
+        
+        # Obter URL da imagem
+        img_src = img.get('src') or img.get('data-src') or img.get('data-lazy-src')
+        if not img_src:
+            continue
+        
+        # Obter URL do jogo
+        game_href = link.get('href', '')
+        if not game_href:
+            continue
+        
+        # Construir URL completa se for relativa
+        if game_href.startswith('/'):
+            game_url = urljoin('https://www.retrogames.cc', game_href)
+        elif game_href.startswith('http'):
+            game_url = game_href
+        else:
+            continue
+        
+        # Obter título do jogo
+        title = img.get('alt') or img.get('title') or link.get('title') or ''
+        if not title:
+            # Tentar extrair do texto do link
+            title = link.get_text(strip=True)
+        
+        # Se ainda não tiver título, usar parte da URL
+        if not title:
+            parsed_url = urlparse(game_url)
+            title = parsed_url.path.split('/')[-1].replace('-', ' ').title()
         
-        # Parsear HTML
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Verificar se já não adicionamos este jogo (evitar duplicatas)
+        if any(r['game_url'] == game_url for r in results):
+            continue
+        
+        # Construir URL da imagem completa se for relativa
+        if img_src.startswith('/'):
+            image_url = urljoin('https://www.retrogames.cc', img_src)
+        elif img_src.startswith('http'):
+            image_url = img_src
+        else:
+            image_url = urljoin('https://www.retrogames.cc', img_src)
+        
+        # Construir URL do embed baseado na URL do jogo
+        # Não buscar o conteúdo do textarea aqui, apenas a URL
+        if '/play/' in game_url:
+            embed_url = game_url.replace('/play/', '/embed/')
+        elif '/embed/' in game_url:
+            embed_url = game_url
+        else:
+            # Tentar construir URL de embed
+            embed_url = game_url.replace('/game/', '/embed/').replace('/play/', '/embed/')
+            if '/embed/' not in embed_url:
+                embed_url = game_url
         
-        # Estratégias para encontrar os resultados de jogos
-        # Estratégia 1: Buscar por links que contenham imagens de jogos
-        game_links = soup.find_all('a', href=True)
+        game_data = {
+            'title': title[:100],  # Limitar tamanho do título
+            'image_url': image_url,
+            'game_url': game_url,
+            'embed_url': embed_url,
+        }
         
-        for link in game_links:
+        results.append(game_data)
+        logger.info(f"Jogo encontrado: {title} - {game_url}")
+    
+    # Se não encontrou resultados suficientes, tentar estratégia alternativa
+    if len(results) < max_results:
+        # Estratégia 2: Buscar por divs com classes comuns de cards de jogos
+        game_cards = soup.find_all(['div', 'article', 'section'], class_=lambda x: x and (
+            'game' in x.lower() or 
+            'card' in x.lower() or 
+            'item' in x.lower()
+        ))
+        
+        for card in game_cards:
             if len(results) >= max_results:
                 break
             
-            # Ignorar elementos com title="Retro Games"
-            link_title = link.get('title', '')
-            img = link.find('img')
-            img_title = img.get('title', '') if img else ''
-            
-            if link_title == 'Retro Games' or img_title == 'Retro Games':
-                continue
+            # Buscar link e imagem dentro do card
+            link = card.find('a', href=True)
+            img = card.find('img')
             
-            # Verificar se o link contém uma imagem
-            if not img:
-                continue
-            
-            # Obter URL da imagem
-            img_src = img.get('src') or img.get('data-src') or img.get('data-lazy-src')
-            if not img_src:
-                continue
-            
-            # Obter URL do jogo
-            game_href = link.get('href', '')
-            if not game_href:
-                continue
-            
-            # Construir URL completa se for relativa
-            if game_href.startswith('/'):
-                game_url = urljoin('https://www.retrogames.cc', game_href)
-            elif game_href.startswith('http'):
-                game_url = game_href
-            else:
-                continue
-            
-            # Obter título do jogo
-            title = img.get('alt') or img.get('title') or link.get('title') or ''
-            if not title:
-                # Tentar extrair do texto do link
-                title = link.get_text(strip=True)
-            
-            # Se ainda não tiver título, usar parte da URL
-            if not title:
-                parsed_url = urlparse(game_url)
-                title = parsed_url.path.split('/')[-1].replace('-', ' ').title()
-            
-            # Verificar se já não adicionamos este jogo (evitar duplicatas)
-            if any(r['game_url'] == game_url for r in results):
-                continue
-            
-            # Construir URL da imagem completa se for relativa
-            if img_src.startswith('/'):
-                image_url = urljoin('https://www.retrogames.cc', img_src)
-            elif img_src.startswith('http'):
-                image_url = img_src
-            else:
-                image_url = urljoin('https://www.retrogames.cc', img_src)
-            
-            # Construir URL do embed baseado na URL do jogo
-            # Não buscar o conteúdo do textarea aqui, apenas a URL
-            if '/play/' in game_url:
-                embed_url = game_url.replace('/play/', '/embed/')
-            elif '/embed/' in game_url:
-                embed_url = game_url
-            else:
-                # Tentar construir URL de embed
-                embed_url = game_url.replace('/game/', '/embed/').replace('/play/', '/embed/')
-                if '/embed/' not in embed_url:
-                    embed_url = game_url
-            
-            game_data = {
-                'title': title[:100],  # Limitar tamanho do título
-                'image_url': image_url,
-                'game_url': game_url,
-                'embed_url': embed_url,
-            }
-            
-            results.append(game_data)
-            logger.info(f"Jogo encontrado: {title} - {game_url}")
-        
-        # Se não encontrou resultados suficientes, tentar estratégia alternativa
-        if len(results) < max_results:
-            # Estratégia 2: Buscar por divs com classes comuns de cards de jogos
-            game_cards = soup.find_all(['div', 'article', 'section'], class_=lambda x: x and (
-                'game' in x.lower() or 
-                'card' in x.lower() or 
-                'item' in x.lower()
-            ))
-            
-            for card in game_cards:
-                if len(results) >= max_results:
-                    break
+            if link and img:
+                # Ignorar elementos com title="Retro Games"
+                link_title = link.get('title', '')
+                img_title = img.get('title', '')
+                card_title = card.get('title', '')
                 
-                # Buscar link e imagem dentro do card
-                link = card.find('a', href=True)
-                img = card.find('img')
+                if link_title == 'Retro Games' or img_title == 'Retro Games' or card_title == 'Retro Games':
+                    continue
+                img_src = img.get('src') or img.get('data-src') or img.get('data-lazy-src')
+                game_href = link.get('href', '')
                 
-                if link and img:
-                    # Ignorar elementos com title="Retro Games"
-                    link_title = link.get('title', '')
-                    img_title = img.get('title', '')
-                    card_title = card.get('title', '')
+                if img_src and game_href:
+                    # Construir URLs completas
+                    if game_href.startswith('/'):
+                        game_url = urljoin('https://www.retrogames.cc', game_href)
+                    elif game_href.startswith('http'):
+                        game_url = game_href
+                    else:
+                        continue
                     
-                    if link_title == 'Retro Games' or img_title == 'Retro Games' or card_title == 'Retro Games':
+                    if img_src.startswith('/'):
+                        image_url = urljoin('https://www.retrogames.cc', img_src)
+                    elif img_src.startswith('http'):
+                        image_url = img_src
+                    else:
+                        image_url = urljoin('https://www.retrogames.cc', img_src)
+                    
+                    title = img.get('alt') or img.get('title') or link.get('title') or link.get_text(strip=True)
+                    if not title:
+                        parsed_url = urlparse(game_url)
+                        title = parsed_url.path.split('/')[-1].replace('-', ' ').title()
+                    
+                    # Verificar duplicatas
+                    if any(r['game_url'] == game_url for r in results):
                         continue
-                    img_src = img.get('src') or img.get('data-src') or img.get('data-lazy-src')
-                    game_href = link.get('href', '')
                     
-                    if img_src and game_href:
-                        # Construir URLs completas
-                        if game_href.startswith('/'):
-                            game_url = urljoin('https://www.retrogames.cc', game_href)
-                        elif game_href.startswith('http'):
-                            game_url = game_href
-                        else:
-                            continue
-                        
-                        if img_src.startswith('/'):
-                            image_url = urljoin('https://www.retrogames.cc', img_src)
-                        elif img_src.startswith('http'):
-                            image_url = img_src
-                        else:
-                            image_url = urljoin('https://www.retrogames.cc', img_src)
-                        
-                        title = img.get('alt') or img.get('title') or link.get('title') or link.get_text(strip=True)
-                        if not title:
-                            parsed_url = urlparse(game_url)
-                            title = parsed_url.path.split('/')[-1].replace('-', ' ').title()
-                        
-                        # Verificar duplicatas
-                        if any(r['game_url'] == game_url for r in results):
-                            continue
-                        
-                        # Construir URL do embed baseado na URL do jogo
-                        if '/play/' in game_url:
-                            embed_url = game_url.replace('/play/', '/embed/')
-                        elif '/embed/' in game_url:
+                    # Construir URL do embed baseado na URL do jogo
+                    if '/play/' in game_url:
+                        embed_url = game_url.replace('/play/', '/embed/')
+                    elif '/embed/' in game_url:
+                        embed_url = game_url
+                    else:
+                        embed_url = game_url.replace('/game/', '/embed/').replace('/play/', '/embed/')
+                        if '/embed/' not in embed_url:
                             embed_url = game_url
-                        else:
-                            embed_url = game_url.replace('/game/', '/embed/').replace('/play/', '/embed/')
-                            if '/embed/' not in embed_url:
-                                embed_url = game_url
-                        
-                        game_data = {
-                            'title': title[:100],
-                            'image_url': image_url,
-                            'game_url': game_url,
-                            'embed_url': embed_url,
-                        }
-                        
-                        results.append(game_data)
-                        logger.info(f"Jogo encontrado (estratégia 2): {title} - {game_url}")
-        
-        logger.info(f"Total de jogos encontrados: {len(results)}")
-        
+                    
+                    game_data = {
+                        'title': title[:100],
+                        'image_url': image_url,
+                        'game_url': game_url,
+                        'embed_url': embed_url,
+                    }
+                    
+                    results.append(game_data)
+                    logger.info(f"Jogo encontrado (estratégia 2): {title} - {game_url}")
+    
+    
+    logger.info(f"Total de jogos encontrados: {len(results)}")
+    return results[:max_results]
+
+
+def search_games_on_retrogames(query, max_results=5):
+    """
+    Busca jogos no site retrogames.cc e retorna os primeiros resultados
+    (no formato de parse_search_results).
+    
+    Args:
+        query (str): Termo de busca (nome do jogo)
+        max_results (int): Número máximo de resultados a retornar (padrão: 5)
+    
+    Returns:
+        list: Lista de dicionários com title, image_url, game_url e embed_url
+    """
+    logger.info(f"Buscando jogos no retrogames.cc com query: {query}")
+    try:
+        response = get_session().get(build_search_url(query), headers=SEARCH_HEADERS, timeout=15)
+        response.raise_for_status()
+        return parse_search_results(response.text, max_results)
     except requests.exceptions.RequestException as e:
         logger.error(f"Erro ao fazer requisição para retrogames.cc: {str(e)}")
         raise
     except Exception as e:
         logger.error(f"Erro ao processar resultados do retrogames.cc: {str(e)}")
         raise
+
+
+async def asearch_games_on_retrogames(query, max_results=5):
+    """
+    Versão assíncrona de search_games_on_retrogames, para as views async: a
+    espera pelo retrogames.cc não ocupa o worker e o parsing do HTML roda em
+    uma thread, fora do event loop.
     
-    return results[:max_results]
+    Raises:
+        httpx.HTTPError: Em caso de erro HTTP ou de rede
+    """
+    logger.info(f"Buscando jogos no retrogames.cc com query: {query}")
+    try:
+        response = await get_async_client().get(build_search_url(query), headers=SEARCH_HEADERS)
+        response.raise_for_status()
+    except Exception as e:
+        logger.error(f"Erro ao fazer requisição para retrogames.cc: {str(e)}")
+        raise
+    return await sync_to_async(parse_search_results, thread_sensitive=False)(response.text, max_results)
 
 
 def search_multiple_games(game_names, max_results_per_game=5):
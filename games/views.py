@@ -1,18 +1,32 @@
+import asyncio
+import base64
+import binascii
 import json
-import requests
+import httpx
 import time
+from datetime import datetime
+from urllib.parse import urlencode
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib import messages
-from django.http import JsonResponse, Http404
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, Http404, StreamingHttpResponse
 from django.views.decorators.http import require_http_methods
-from decouple import config
-
-from .models import Game, GameRequest
+from django.views.decorators.csrf import csrf_exempt
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Game, GameRequest, RequestSearchResult, UserRequestStats
 from .forms import GameRequestForm, AdminGameRequestForm
-from .utils import search_games_on_retrogames, search_multiple_games
+from .decorators import async_require_http_methods, async_user_passes_test
+from .utils import RETROGAMES_HEADERS, aextract_embed_url, asearch_games_on_retrogames, build_content_key
+from . import collector, export, ratelimit, snapshot
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,15 +37,20 @@ def home(request):
     Página inicial do TDE - PWA educacional de jogos retro.
     Apresenta o contexto do trabalho e destaca alguns jogos.
     """
-    # Jogos em destaque (primeiros 6 jogos ativos)
-    featured_games = Game.objects.filter(is_active=True)[:6]
-    
-    # Todos os jogos ativos para estatísticas
-    all_games = Game.objects.filter(is_active=True)
+    catalog_snapshot = snapshot.get_snapshot()
+    if catalog_snapshot is not None:
+        # Snapshot compartilhado do catálogo (games/snapshot.py), sem acessar o banco
+        featured_games = catalog_snapshot[:6]
+        total_games = len(catalog_snapshot)
+    else:
+        # Jogos em destaque (primeiros 6 jogos ativos)
+        featured_games = Game.objects.filter(is_active=True)[:6]
+        # Todos os jogos ativos para estatísticas
+        total_games = Game.objects.filter(is_active=True).count()
     
     context = {
         'featured_games': featured_games,
-        'total_games': all_games.count(),
+        'total_games': total_games,
     }
     
     return render(request, 'games/home.html', context)
@@ -42,7 +61,10 @@ def catalog(request):
     Página de catálogo completo de jogos retro.
     Lista simples de todos os jogos ativos.
     """
-    games = Game.objects.filter(is_active=True).order_by('title')
+    # Snapshot compartilhado do catálogo (games/snapshot.py) ou, sem ele, o banco
+    games = snapshot.get_snapshot()
+    if games is None:
+        games = Game.objects.filter(is_active=True).order_by('title')
     
     context = {
         'games': games,
@@ -118,28 +140,166 @@ def register(request):
 # API ENDPOINTS (simplificados)
 # ============================================================================
 
-@require_http_methods(["GET"])
-def api_get_game_info(request, slug):
+API_GAME_FIELDS = ('id', 'title', 'slug', 'description', 'cover_image', 'rom_url')
+
+
+@async_require_http_methods(["GET"])
+async def api_get_game_info(request, slug):
     """
     API para obter informações de um jogo específico.
     Endpoint: GET /api/game/<slug>/
     """
-    try:
-        game = get_object_or_404(Game, slug=slug, is_active=True)
-        
-        return JsonResponse({
-            'id': game.id,
-            'title': game.title,
-            'slug': game.slug,
-            'description': game.description,
-            'cover_image': game.cover_image,
-            'rom_url': game.rom_url,
-        })
-        
-    except Exception as e:
+    catalog_snapshot = snapshot.get_snapshot()
+    if catalog_snapshot is not None:
+        entry = catalog_snapshot.find_slug(slug)
+        game = entry and {field: getattr(entry, field) for field in API_GAME_FIELDS}
+    else:
+        game = await Game.objects.filter(slug=slug, is_active=True).values(*API_GAME_FIELDS).afirst()
+        if game is not None:
+            # Mesmo formato do snapshot: campos opcionais vazios como None
+            game.update({field: game[field] or None for field in snapshot.OPTIONAL_FIELDS})
+    if game is None:
         return JsonResponse({
             'error': 'Jogo não encontrado'
         }, status=404)
+    
+    return JsonResponse(game)
+
+
+@require_http_methods(["GET"])
+def api_export_catalog(request):
+    """
+    Exportação em fluxo do catálogo de jogos ativos, para mirrors e nós de borda.
+    Endpoint: GET /api/catalog/export/?format=ndjson|msgpack&gzip=1|0
+
+    Mesmo conteúdo do comando export_catalog (games/export.py): as linhas são
+    lidas do banco em blocos e enviadas à medida que são serializadas.
+    """
+    export_format = request.GET.get('format', 'ndjson')
+    compress = request.GET.get('gzip', '1') != '0'
+    try:
+        blocks = export.iter_export(export_format, compress=compress)
+    except export.ExportFormatError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    response = StreamingHttpResponse(
+        blocks,
+        content_type='application/gzip' if compress else export.CONTENT_TYPES[export_format]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{export.export_filename(export_format, compress)}"'
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def collector_webhook(request, event):
+    """
+    Webhook chamado pela API de coleta de jogos durante e ao fim de uma execução.
+    Endpoint: POST /webhooks/collector/<event>/ (event: task, step ou crew)
+
+    O corpo deve vir assinado com HMAC-SHA256 (GAME_COLLECTOR_WEBHOOK_SECRET) no
+    header X-Signature. O evento 'crew' indica a conclusão: o kickoff é
+    reivindicado de forma atômica (idempotente por kickoff_id) e o
+    pós-processamento roda em segundo plano, fora da thread da requisição.
+    Eventos 'task' e 'step' apenas registram que a execução segue ativa.
+    """
+    if event not in collector.WEBHOOK_EVENTS:
+        raise Http404
+    
+    if not collector.verify_signature(request.body, request.headers.get('X-Signature', '')):
+        logger.warning(f"Webhook '{event}' recebido com assinatura inválida")
+        return JsonResponse({'error': 'Assinatura inválida'}, status=403)
+    
+    try:
+        payload = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({'error': 'JSON inválido'}, status=400)
+    
+    kickoff_id = (payload.get('kickoff_id') or payload.get('id')) if isinstance(payload, dict) else None
+    if not kickoff_id:
+        return JsonResponse({'error': 'kickoff_id ausente'}, status=400)
+    kickoff_id = str(kickoff_id)
+    
+    if not GameRequest.objects.filter(kickoff_id=kickoff_id).exists():
+        return JsonResponse({'error': 'kickoff_id desconhecido'}, status=404)
+    
+    if event != 'crew':
+        GameRequest.objects.filter(kickoff_id=kickoff_id, execution_status='running').update(
+            status_checked_at=timezone.now()
+        )
+        return JsonResponse({'status': 'ok'})
+    
+    # O webhook da crew é enviado na conclusão; a API pode ou não incluir 'state'
+    status_data = dict(payload)
+    status_data.setdefault('state', 'SUCCESS')
+    execution_status = collector.normalize_execution_state(status_data['state'])
+    
+    if execution_status != 'completed':
+        collector.apply_status(kickoff_id, status_data)
+        return JsonResponse({'status': execution_status})
+    
+    if not collector.claim_completion(kickoff_id):
+        # Já processado (ou em processamento) por outra entrega do webhook ou pelo poller
+        return JsonResponse({'status': 'duplicate'})
+    
+    collector.run_in_background(collector.complete_kickoff, kickoff_id, status_data)
+    return JsonResponse({'status': 'accepted'}, status=202)
+
+
+# ============================================================================
+# PAGINAÇÃO POR CURSOR (listas de GameRequest)
+# ============================================================================
+
+def _encode_cursor(game_request):
+    """Cursor de paginação (created_at, id) de uma requisição, seguro para URLs"""
+    raw = f"{game_request.created_at.isoformat()}|{game_request.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _decode_cursor(value):
+    """Decodifica um cursor de _encode_cursor. Retorna (created_at, id) ou None se inválido."""
+    try:
+        raw = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)).decode()
+        created_at, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        return None
+
+
+def _keyset_page(queryset, page_size, after=None, before=None):
+    """
+    Paginação por chave (keyset) em (-created_at, -id): em vez de OFFSET, cada
+    página continua a partir do último item da anterior, usando o índice, com
+    custo constante em qualquer profundidade.
+    
+    Returns:
+        tuple: (itens da página, cursor da próxima página, cursor da página anterior)
+    """
+    after = _decode_cursor(after) if after else None
+    before = _decode_cursor(before) if before else None
+    
+    if before:
+        created_at, pk = before
+        items = list(
+            queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk))
+            .order_by('created_at', 'id')[:page_size + 1]
+        )
+        has_previous = len(items) > page_size
+        items = items[:page_size][::-1]
+        has_next = True
+    else:
+        if after:
+            created_at, pk = after
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+        items = list(queryset.order_by('-created_at', '-id')[:page_size + 1])
+        has_next = len(items) > page_size
+        items = items[:page_size]
+        has_previous = after is not None
+    
+    next_cursor = _encode_cursor(items[-1]) if items and has_next else None
+    previous_cursor = _encode_cursor(items[0]) if items and has_previous else None
+    return items, next_cursor, previous_cursor
 
 
 # ============================================================================
@@ -175,20 +335,33 @@ def request_game(request):
     return render(request, 'games/request_game.html', context)
 
 
+# Pedidos por página no histórico do usuário
+MY_REQUESTS_PAGE_SIZE = 20
+
+
 @login_required
 def my_game_requests(request):
     """
     View protegida por login para usuários visualizarem seus pedidos anteriores.
     Apenas usuários autenticados podem acessar esta página e veem apenas seus próprios pedidos.
     """
-    game_requests = GameRequest.objects.filter(user=request.user).order_by('-created_at')
+    game_requests = GameRequest.objects.filter(user=request.user).defer('ai_response_blob')
+    
+    # Histórico paginado por cursor (índice user, -created_at) e contadores
+    # mantidos nas transições de status: duas consultas pequenas por página
+    page, next_cursor, previous_cursor = _keyset_page(
+        game_requests, MY_REQUESTS_PAGE_SIZE, after=request.GET.get('after'), before=request.GET.get('before')
+    )
+    stats = UserRequestStats.for_user(request.user)
     
     context = {
-        'game_requests': game_requests,
-        'total_requests': game_requests.count(),
-        'pending_count': game_requests.filter(status='pending').count(),
-        'approved_count': game_requests.filter(status='approved').count(),
-        'rejected_count': game_requests.filter(status='rejected').count(),
+        'game_requests': page,
+        'total_requests': stats.total,
+        'pending_count': stats.pending,
+        'approved_count': stats.approved,
+        'rejected_count': stats.rejected,
+        'next_page_query': urlencode({'after': next_cursor}) if next_cursor else None,
+        'previous_page_query': urlencode({'before': previous_cursor}) if previous_cursor else None,
     }
     
     return render(request, 'games/my_game_requests.html', context)
@@ -203,19 +376,27 @@ def staff_required(user):
     return user.is_authenticated and user.is_staff
 
 
+# Requisições por página na fila de administração
+ADMIN_REQUESTS_PAGE_SIZE = 50
+ADMIN_REQUEST_STATS_CACHE_KEY = 'admin_game_request_stats'
+
+
 @user_passes_test(staff_required, login_url='home')
 def admin_game_requests_list(request):
     """
     View para administradores visualizarem todas as requisições de jogos.
     Apenas usuários staff podem acessar esta página.
     Esta página permite ao administrador ver os pedidos e preparar as consultas para IA.
+    
+    A lista é paginada por cursor (parâmetros 'after'/'before') e as
+    estatísticas vêm de uma única consulta com agregação condicional.
     """
     # Filtro por status (opcional via query parameter)
     status_filter = request.GET.get('status', '')
     ready_filter = request.GET.get('ready_for_ai', '')
     
     # Query base
-    game_requests = GameRequest.objects.all().select_related('user')
+    game_requests = GameRequest.objects.all().select_related('user').defer('ai_response_blob')
     
     # Aplicar filtros
     if status_filter:
@@ -226,25 +407,36 @@ def admin_game_requests_list(request):
     elif ready_filter == 'false':
         game_requests = game_requests.filter(ready_for_ai=False)
     
-    # Ordenação padrão: mais recentes primeiro
-    game_requests = game_requests.order_by('-created_at')
-    
-    # Estatísticas
-    total = GameRequest.objects.count()
-    pending = GameRequest.objects.filter(status='pending').count()
-    approved = GameRequest.objects.filter(status='approved').count()
-    rejected = GameRequest.objects.filter(status='rejected').count()
-    ready_for_ai_count = GameRequest.objects.filter(ready_for_ai=True).count()
+    # Página atual: mais recentes primeiro
+    page, next_cursor, previous_cursor = _keyset_page(
+        game_requests, ADMIN_REQUESTS_PAGE_SIZE, after=request.GET.get('after'), before=request.GET.get('before')
+    )
+    
+    # Estatísticas (uma única consulta, reaproveitada por alguns segundos: contar
+    # a tabela inteira custa centenas de ms com milhões de requisições)
+    stats = cache.get_or_set(
+        ADMIN_REQUEST_STATS_CACHE_KEY,
+        lambda: GameRequest.objects.aggregate(
+            total=Count('id'),
+            pending=Count('id', filter=Q(status='pending')),
+            approved=Count('id', filter=Q(status='approved')),
+            rejected=Count('id', filter=Q(status='rejected')),
+            ready_for_ai_count=Count('id', filter=Q(ready_for_ai=True)),
+        ),
+        settings.ADMIN_REQUEST_STATS_CACHE_SECONDS,
+    )
+    
+    # Filtros atuais, preservados nos links de paginação
+    filters = {key: value for key, value in (('status', status_filter), ('ready_for_ai', ready_filter)) if value}
     
     context = {
-        'game_requests': game_requests,
-        'total': total,
-        'pending': pending,
-        'approved': approved,
-        'rejected': rejected,
-        'ready_for_ai_count': ready_for_ai_count,
+        'game_requests': page,
+        **stats,
         'current_status_filter': status_filter,
         'current_ready_filter': ready_filter,
+        'next_page_query': urlencode({**filters, 'after': next_cursor}) if next_cursor else None,
+        'previous_page_query': urlencode({**filters, 'before': previous_cursor}) if previous_cursor else None,
+        'first_page_query': urlencode(filters),
     }
     
     return render(request, 'games/admin_game_requests_list.html', context)
@@ -257,7 +449,8 @@ def admin_game_request_detail(request, pk):
     Apenas usuários staff podem acessar esta página.
     Permite editar a consulta para IA e marcar como pronta para processamento.
     """
-    game_request = get_object_or_404(GameRequest, pk=pk)
+    # A resposta bruta da API (compactada) não é exibida nesta página
+    game_request = get_object_or_404(GameRequest.objects.defer('ai_response_blob'), pk=pk)
     
     # Se ai_query estiver vazio, preencher com sugestão padrão
     if not game_request.ai_query:
@@ -278,8 +471,7 @@ def admin_game_request_detail(request, pk):
                 try:
                     return admin_approve_request(request, pk)
                 except Exception as e:
-                    import traceback
-                    print(f"Erro ao chamar admin_approve_request: {traceback.format_exc()}")
+                    logger.exception(f"Erro ao chamar admin_approve_request para a requisição {pk}")
                     return JsonResponse({
                         'error': f'Erro ao enviar para API: {str(e)}'
                     }, status=500)
@@ -299,16 +491,14 @@ def admin_game_request_detail(request, pk):
     
     ai_data_json = json.dumps(ai_data_example, indent=2, ensure_ascii=False)
     
-    # Formatar ai_response_data para exibição se existir
-    ai_response_json = None
-    if game_request.ai_response_data:
-        ai_response_json = json.dumps(game_request.ai_response_data, indent=2, ensure_ascii=False)
-    
     context = {
         'game_request': game_request,
         'form': form,
         'ai_data_json': ai_data_json,
-        'ai_response_json': ai_response_json,
+        'search_results': game_request.search_results.all(),
+        # O stream de eventos só é oferecido quando a página é servida via ASGI
+        # (o mesmo pool atende /admin/); caso contrário a página usa polling
+        'event_stream_enabled': event_stream_available(request),
     }
     
     return render(request, 'games/admin_game_request_detail.html', context)
@@ -318,292 +508,124 @@ def admin_game_request_detail(request, pk):
 # AÇÕES DE ADMINISTRAÇÃO (Aprovar/Rejeitar e Integração com API)
 # ============================================================================
 
-# URL base da API externa
-API_BASE_URL = "https://simple-game-name-collector-v1-ca4edf88-5b8a-ef2ee057.crewai.com"
-
-# Token de autenticação da API (lido do .env)
-API_TOKEN = config('GAME_COLLECTOR_API_TOKEN', default='')
-
-# Função helper para obter headers de autenticação
-def get_api_headers():
-    """Retorna os headers necessários para autenticação na API"""
-    headers = {
-        'Content-Type': 'application/json',
-        'Accept': 'application/json'
-    }
+@user_passes_test(staff_required, login_url='home')
+@require_http_methods(["POST"])
+def admin_approve_request(request, pk):
+    """
+    Aprova uma requisição de jogo e inicia o processo de busca na API externa.
+    Suporta requisições AJAX e requisições normais.
     
-    # Adicionar token de autenticação se disponível
-    if API_TOKEN:
-        # Tentar diferentes formatos de autenticação comuns
-        if API_TOKEN.startswith('Bearer ') or API_TOKEN.startswith('Token '):
-            headers['Authorization'] = API_TOKEN
+    Usa collector.approve_request, a mesma aprovação do lote: compare-and-set
+    para 'submitting' (cliques duplicados perdem a disputa e recebem erro, de
+    modo que apenas um /kickoff é feito por requisição), reaproveitamento de
+    buscas anteriores e o limite de ritmo GAME_COLLECTOR_KICKOFF_RATE. Se o
+    envio falhar, o status anterior é restaurado.
+    """
+    game_request = get_object_or_404(GameRequest.objects.defer('ai_response_blob'), pk=pk)
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+    
+    result = collector.approve_request(
+        game_request,
+        collector.build_webhook_urls(request),
+        force_refresh=bool(request.POST.get('force_refresh'))
+    )
+    outcome = result['outcome']
+    
+    if outcome in collector.APPROVED_OUTCOMES:
+        if outcome == 'cache':
+            success_msg = f'Requisição aprovada! Resultado reaproveitado de uma busca anterior pelo mesmo termo (ID: {result["kickoff_id"]}).'
+        elif outcome == 'in_flight':
+            success_msg = f'Requisição aprovada! Uma busca pelo mesmo termo já está em andamento e será compartilhada (ID: {result["kickoff_id"]}).'
         else:
-            # Se não tiver prefixo, adicionar Bearer
-            headers['Authorization'] = f'Bearer {API_TOKEN}'
-        # Também tentar como X-API-Key (algumas APIs usam isso)
-        headers['X-API-Key'] = API_TOKEN
-        # Algumas APIs também usam X-Auth-Token
-        headers['X-Auth-Token'] = API_TOKEN
+            success_msg = f'Requisição aprovada! Busca iniciada na API. ID: {result["kickoff_id"]}'
+        if is_ajax:
+            response = {
+                'success': True,
+                'message': success_msg,
+                'kickoff_id': result['kickoff_id'],
+                'status': game_request.execution_status,
+            }
+            if outcome != 'started':
+                response['reused'] = outcome
+            return JsonResponse(response)
+        messages.success(request, success_msg)
+        return redirect('admin_game_request_detail', pk=pk)
+    
+    if outcome == 'conflict':
+        if game_request.status == 'submitting' or game_request.status in GameRequest.APPROVABLE_STATUSES:
+            error_msg = 'Esta requisição já está sendo enviada para a API.'
+        else:
+            error_msg = 'Esta requisição já foi aprovada.'
+        status = 409
+    elif outcome == 'invalid':
+        error_msg = result['message']
+        status = 400
     else:
-        print("AVISO: GAME_COLLECTOR_API_TOKEN não configurado no .env!")
+        error_msg = result['message']
+        status = 500
     
-    return headers
+    if is_ajax:
+        return JsonResponse({'error': error_msg}, status=status)
+    if outcome == 'conflict':
+        messages.warning(request, error_msg)
+    else:
+        messages.error(request, error_msg)
+    return redirect('admin_game_request_detail', pk=pk)
 
 
 @user_passes_test(staff_required, login_url='home')
 @require_http_methods(["POST"])
-def admin_approve_request(request, pk):
+def admin_bulk_approve_requests(request):
     """
-    Aprova uma requisição de jogo e inicia o processo de busca na API externa.
-    Suporta requisições AJAX e requisições normais.
+    Aprova várias requisições de uma vez (campo request_ids, repetido).
+    
+    Os /kickoff são enviados em paralelo pelo collector, sob o limite de ritmo
+    configurado, e cada requisição passa pelo mesmo compare-and-set da
+    aprovação individual. Retorna o resultado de cada requisição em uma única
+    resposta JSON (AJAX) ou um resumo via messages.
     """
-    game_request = get_object_or_404(GameRequest, pk=pk)
+    request_ids = [value for value in request.POST.getlist('request_ids') if value.isdigit()]
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+    
+    if not request_ids:
+        error_msg = 'Nenhuma requisição selecionada.'
+        if is_ajax:
+            return JsonResponse({'error': error_msg}, status=400)
+        messages.warning(request, error_msg)
+        return redirect('admin_game_requests_list')
     
-    if game_request.status == 'approved':
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            return JsonResponse({
-                'error': 'Esta requisição já foi aprovada.'
-            }, status=400)
-        messages.warning(request, 'Esta requisição já foi aprovada.')
-        return redirect('admin_game_request_detail', pk=pk)
+    if len(request_ids) > settings.GAME_COLLECTOR_BULK_MAX:
+        error_msg = f'Selecione no máximo {settings.GAME_COLLECTOR_BULK_MAX} requisições por vez.'
+        if is_ajax:
+            return JsonResponse({'error': error_msg}, status=400)
+        messages.warning(request, error_msg)
+        return redirect('admin_game_requests_list')
     
-    try:
-        # Garantir que temos um título válido
-        if not game_request.title or not game_request.title.strip():
-            error_msg = 'O título do jogo é obrigatório e não pode estar vazio.'
-            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-                return JsonResponse({'error': error_msg}, status=400)
-            messages.error(request, error_msg)
-            return redirect('admin_game_request_detail', pk=pk)
-        
-        # Garantir que ai_query existe e não está vazio
-        if not game_request.ai_query or not game_request.ai_query.strip():
-            game_request.ai_query = f"{game_request.title.strip()} jogo retro"
-            game_request.save(update_fields=['ai_query'])
-        
-        # Preparar dados para kickoff (enviar direto, sem chamar /inputs)
-        # Garantir que query_text sempre tenha um valor válido e não vazio
-        title_stripped = game_request.title.strip() if game_request.title else ""
-        
-        # Construir query_text com fallbacks
-        if game_request.ai_query and game_request.ai_query.strip():
-            query_text = game_request.ai_query.strip()
-        elif title_stripped:
-            query_text = f"{title_stripped} jogo retro"
-        else:
-            query_text = "jogo retro"  # Fallback final
-        
-        # Garantir que query_text é uma string válida e não vazia
-        query_text = str(query_text).strip()
-        if not query_text:
-            query_text = "jogo retro"
-        
-        # A API espera apenas o search_term - garantir que seja uma string não vazia
-        search_term_value = str(query_text).strip()
-        if not search_term_value:
-            error_msg = 'Não foi possível gerar um termo de busca válido. Por favor, verifique o título e a consulta para IA.'
-            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-                return JsonResponse({'error': error_msg}, status=400)
-            messages.error(request, error_msg)
-            return redirect('admin_game_request_detail', pk=pk)
-        
-        # A API espera a estrutura com "inputs" contendo "search_term"
-        kickoff_payload = {
-            "inputs": {
-                "search_term": search_term_value
-            },
-            "taskWebhookUrl": "",
-            "stepWebhookUrl": "",
-            "crewWebhookUrl": "",
-            "trainingFilename": "",
-            "generateArtifact": False
-        }
-        
-        # Validação final: garantir que search_term existe e não está vazio dentro de inputs
-        if "inputs" not in kickoff_payload or "search_term" not in kickoff_payload["inputs"]:
-            error_msg = 'Erro: estrutura do payload inválida!'
-            print(f"ERRO CRÍTICO: {error_msg}")
-            print(f"Payload: {kickoff_payload}")
-            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-                return JsonResponse({'error': error_msg}, status=400)
-            messages.error(request, error_msg)
-            return redirect('admin_game_request_detail', pk=pk)
-        
-        if not kickoff_payload["inputs"]["search_term"] or not str(kickoff_payload["inputs"]["search_term"]).strip():
-            error_msg = 'Erro: search_term não pode estar vazio!'
-            print(f"ERRO CRÍTICO: {error_msg}")
-            print(f"Payload: {kickoff_payload}")
-            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-                return JsonResponse({'error': error_msg}, status=400)
-            messages.error(request, error_msg)
-            return redirect('admin_game_request_detail', pk=pk)
-        
-        # Debug: Print do payload que será enviado
-        print("=" * 80)
-        print("DEBUG - Enviando requisição para API")
-        print("=" * 80)
-        print(f"URL: {API_BASE_URL}/kickoff")
-        print(f"search_term (tipo: {type(kickoff_payload['inputs']['search_term'])}, valor: '{kickoff_payload['inputs']['search_term']}', tamanho: {len(str(kickoff_payload['inputs']['search_term']))})")
-        print(f"Payload JSON completo:")
-        print(json.dumps(kickoff_payload, indent=2, ensure_ascii=False))
-        print("-" * 80)
-        
-        # Enviar direto para /kickoff com autenticação
-        kickoff_url = f"{API_BASE_URL}/kickoff"
-        api_headers = get_api_headers()
-        
-        # Debug: Print dos headers de autenticação (sem mostrar o token completo por segurança)
-        if API_TOKEN:
-            token_preview = API_TOKEN[:10] + "..." if len(API_TOKEN) > 10 else API_TOKEN
-            print(f"Token configurado: {token_preview} (tamanho: {len(API_TOKEN)} caracteres)")
-        else:
-            print("AVISO: Nenhum token configurado! Adicione GAME_COLLECTOR_API_TOKEN no arquivo .env")
-        print(f"Headers de autenticação que serão enviados:")
-        for key, value in api_headers.items():
-            if 'token' in key.lower() or 'auth' in key.lower() or 'key' in key.lower():
-                # Mascarar tokens nos logs
-                if value and len(value) > 10:
-                    masked_value = value[:10] + "..." + value[-4:] if len(value) > 14 else value[:10] + "..."
-                    print(f"  {key}: {masked_value}")
-                else:
-                    print(f"  {key}: {value}")
-            else:
-                print(f"  {key}: {value}")
-        print("-" * 80)
-        
-        # Serializar o JSON manualmente para debug
-        json_body = json.dumps(kickoff_payload, ensure_ascii=False)
-        print(f"Body JSON que será enviado (tamanho: {len(json_body)} bytes):")
-        print(json_body)
-        print("-" * 80)
-        
-        kickoff_response = requests.post(
-            kickoff_url,
-            json=kickoff_payload,
-            headers=api_headers,
-            timeout=30
-        )
-        
-        # Debug: Print da resposta
-        print(f"Status Code: {kickoff_response.status_code}")
-        print(f"Response Headers:")
-        for key, value in kickoff_response.headers.items():
-            print(f"  {key}: {value}")
-        print(f"Response Text (primeiros 1000 caracteres):")
-        print(kickoff_response.text[:1000])
-        print("=" * 80)
-        
-        # Verificar se houve erro antes de fazer raise_for_status
-        if not kickoff_response.ok:
-            print(f"ERRO: Status {kickoff_response.status_code}")
-            try:
-                error_json = kickoff_response.json()
-                print(f"Erro JSON:")
-                print(json.dumps(error_json, indent=2, ensure_ascii=False))
-            except:
-                print(f"Erro como texto: {kickoff_response.text}")
-        
-        kickoff_response.raise_for_status()
-        kickoff_data = kickoff_response.json()
-        
-        # Debug: Print dos dados retornados
-        print("Dados retornados pela API:")
-        print(json.dumps(kickoff_data, indent=2, ensure_ascii=False))
-        print("=" * 80)
-        
-        # 4. Salvar kickoff_id e atualizar status
-        game_request.kickoff_id = kickoff_data.get('kickoff_id') or kickoff_data.get('id')
-        game_request.status = 'approved'
-        game_request.execution_status = 'running'
-        game_request.save()
-        
-        # Se for requisição AJAX, retornar JSON
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            return JsonResponse({
-                'success': True,
-                'message': f'Requisição aprovada! Busca iniciada na API. ID: {game_request.kickoff_id}',
-                'kickoff_id': game_request.kickoff_id,
-                'status': 'running'
-            })
-        
-        messages.success(
-            request,
-            f'Requisição aprovada! Busca iniciada na API. ID: {game_request.kickoff_id}'
-        )
-        
-    except requests.exceptions.HTTPError as e:
-        # Debug detalhado para erros HTTP
-        print("=" * 80)
-        print("ERRO HTTP ao comunicar com a API")
-        print("=" * 80)
-        print(f"Status Code: {e.response.status_code if hasattr(e, 'response') else 'N/A'}")
-        if hasattr(e, 'response'):
-            print(f"Response Headers:")
-            for key, value in e.response.headers.items():
-                print(f"  {key}: {value}")
-            print(f"Response Text:")
-            print(e.response.text)
-            try:
-                error_json = e.response.json()
-                print(f"Erro JSON:")
-                print(json.dumps(error_json, indent=2, ensure_ascii=False))
-            except:
-                pass
-        print("=" * 80)
-        
-        error_msg = f'Erro HTTP {e.response.status_code if hasattr(e, "response") else "desconhecido"} ao comunicar com a API: {str(e)}'
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            return JsonResponse({
-                'error': error_msg,
-                'status_code': e.response.status_code if hasattr(e, 'response') else None,
-                'response_text': e.response.text[:500] if hasattr(e, 'response') else str(e)
-            }, status=500)
-        messages.error(request, error_msg)
-    except requests.exceptions.Timeout:
-        print("=" * 80)
-        print("ERRO: Timeout ao comunicar com a API")
-        print("=" * 80)
-        error_msg = 'Timeout ao comunicar com a API. Tente novamente.'
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            return JsonResponse({
-                'error': error_msg
-            }, status=500)
-        messages.error(request, error_msg)
-    except requests.exceptions.RequestException as e:
-        print("=" * 80)
-        print("ERRO ao comunicar com a API")
-        print("=" * 80)
-        print(f"Tipo de exceção: {type(e).__name__}")
-        print(f"Mensagem: {str(e)}")
-        if hasattr(e, 'response'):
-            print(f"Status Code: {e.response.status_code}")
-            print(f"Response Text: {e.response.text[:500]}")
-        print("=" * 80)
-        error_msg = f'Erro ao comunicar com a API: {str(e)}'
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            return JsonResponse({
-                'error': error_msg
-            }, status=500)
-        messages.error(request, error_msg)
-    except Exception as e:
-        import traceback
-        error_msg = f'Erro inesperado: {str(e)}'
-        # Log do erro completo para debug
-        print(f"Erro ao aprovar requisição: {traceback.format_exc()}")
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            return JsonResponse({
-                'error': error_msg
-            }, status=500)
-        messages.error(request, error_msg)
+    results = collector.bulk_approve(
+        request_ids,
+        collector.build_webhook_urls(request),
+        force_refresh=bool(request.POST.get('force_refresh'))
+    )
     
-    # Se chegou aqui e não retornou JSON, redirecionar
-    if request.headers.get('X-Requested-With') != 'XMLHttpRequest':
-        return redirect('admin_game_request_detail', pk=pk)
-    else:
-        # Fallback para AJAX - retornar erro genérico
+    summary = {}
+    for result in results:
+        summary[result['outcome']] = summary.get(result['outcome'], 0) + 1
+    approved = sum(summary.get(outcome, 0) for outcome in collector.APPROVED_OUTCOMES)
+    
+    if is_ajax:
         return JsonResponse({
-            'error': 'Erro ao processar requisição'
-        }, status=500)
+            'success': True,
+            'approved': approved,
+            'summary': summary,
+            'results': results
+        })
+    
+    if approved:
+        messages.success(request, f'{approved} de {len(results)} requisição(ões) aprovada(s).')
+    for result in results:
+        if result['outcome'] not in collector.APPROVED_OUTCOMES:
+            messages.warning(request, f"#{result['id']}: {result['message']}")
+    return redirect('admin_game_requests_list')
 
 
 @user_passes_test(staff_required, login_url='home')
@@ -612,12 +634,16 @@ def admin_reject_request(request, pk):
     """
     Rejeita uma requisição de jogo.
     """
-    game_request = get_object_or_404(GameRequest, pk=pk)
+    game_request = get_object_or_404(GameRequest.objects.defer('ai_response_blob'), pk=pk)
     
     if game_request.status == 'rejected':
         messages.warning(request, 'Esta requisição já foi rejeitada.')
         return redirect('admin_game_request_detail', pk=pk)
     
+    if game_request.status == 'submitting':
+        messages.warning(request, 'Esta requisição está sendo enviada para a API e não pode ser rejeitada agora.')
+        return redirect('admin_game_request_detail', pk=pk)
+    
     game_request.status = 'rejected'
     game_request.save()
     
@@ -625,224 +651,224 @@ def admin_reject_request(request, pk):
     return redirect('admin_game_request_detail', pk=pk)
 
 
-@user_passes_test(staff_required, login_url='home')
-@require_http_methods(["GET"])
-def admin_check_api_status(request, pk):
+@async_user_passes_test(staff_required, login_url='home')
+@async_require_http_methods(["GET"])
+async def admin_check_api_status(request, pk):
     """
-    View AJAX para verificar o status da execução na API externa.
+    View AJAX para consultar o status da execução na API externa.
+
+    O status é mantido atualizado pelo poller em segundo plano
+    (python manage.py poll_kickoffs); esta view apenas lê o estado salvo.
+    A API só é consultada diretamente como fallback, quando o status de uma
+    execução em andamento não é verificado há mais de
+    GAME_COLLECTOR_STATUS_STALE_SECONDS (ex.: poller parado). A view é
+    assíncrona: enquanto aguarda a API, o worker continua atendendo outras
+    requisições.
     """
-    game_request = get_object_or_404(GameRequest, pk=pk)
+    queryset = GameRequest.objects.defer('ai_response_blob').filter(pk=pk)
+    game_request = await queryset.afirst()
+    if game_request is None:
+        raise Http404
     
-    if not game_request.kickoff_id:
+    # Sem kickoff_id em 'running': aguardando o /kickoff de outra aprovação da mesma consulta
+    if not game_request.kickoff_id and game_request.execution_status != 'running':
         return JsonResponse({
             'error': 'Nenhum kickoff_id encontrado para esta requisição.'
         }, status=400)
     
-    try:
-        status_url = f"{API_BASE_URL}/status/{game_request.kickoff_id}"
-        
-        # Debug: Print da URL de status
-        print("=" * 80)
-        print("DEBUG - Verificando status da API")
-        print("=" * 80)
-        print(f"URL: {status_url}")
-        print(f"Kickoff ID: {game_request.kickoff_id}")
-        print("-" * 80)
-        
-        # Obter headers de autenticação
-        api_headers = get_api_headers()
-        
-        status_response = requests.get(status_url, headers=api_headers, timeout=10)
-        
-        # Debug: Print da resposta de status
-        print(f"Status Code: {status_response.status_code}")
-        print(f"Response Headers:")
-        for key, value in status_response.headers.items():
-            print(f"  {key}: {value}")
-        print(f"Response Text (primeiros 1000 caracteres):")
-        print(status_response.text[:1000])
-        
-        if not status_response.ok:
-            print(f"ERRO: Status {status_response.status_code}")
-            try:
-                error_json = status_response.json()
-                print(f"Erro JSON:")
-                print(json.dumps(error_json, indent=2, ensure_ascii=False))
-            except:
-                print(f"Erro como texto: {status_response.text}")
-        
-        status_response.raise_for_status()
-        status_data = status_response.json()
-        
-        # Debug: Print dos dados de status
-        print("Dados de status recebidos:")
-        print(json.dumps(status_data, indent=2, ensure_ascii=False))
-        print("=" * 80)
-        
-        # Atualizar status da execução
-        # A API retorna 'state' (SUCCESS, RUNNING, etc.) em vez de 'status'
-        execution_state = status_data.get('state', status_data.get('status', 'unknown'))
-        
-        # Normalizar o estado para salvar no banco
-        if execution_state == 'SUCCESS':
-            game_request.execution_status = 'completed'
-        elif execution_state == 'RUNNING' or execution_state == 'PENDING':
-            game_request.execution_status = 'running'
-        elif execution_state == 'ERROR' or execution_state == 'FAILED':
-            game_request.execution_status = 'failed'
-        else:
-            game_request.execution_status = execution_state.lower() if isinstance(execution_state, str) else str(execution_state)
-        
-        # Se concluído, salvar os dados retornados e buscar jogos no retrogames.cc
-        if execution_state == 'SUCCESS':
-            # Salvar toda a resposta da API
-            game_request.ai_response_data = status_data
-            
-            # Processar o resultado que vem como string com nomes separados por \n
-            retrogames_results = []
-            game_names = []
-            
-            # Extrair nomes de jogos do campo 'result'
-            if 'result' in status_data and status_data['result']:
-                result_text = str(status_data['result']).strip()
-                
-                # Dividir por quebras de linha e limpar cada nome
-                if result_text:
-                    game_names = [
-                        name.strip() 
-                        for name in result_text.split('\n') 
-                        if name.strip()  # Remover linhas vazias
-                    ]
-                    
-                    # Remover duplicatas mantendo a ordem
-                    seen = set()
-                    game_names = [
-                        name for name in game_names 
-                        if name and (name.lower() not in seen or seen.add(name.lower()))
-                    ]
-            
-            # Se também há resultado em last_executed_task/output
-            if not game_names and 'last_executed_task' in status_data:
-                task_output = status_data['last_executed_task'].get('output', '')
-                if task_output:
-                    result_text = str(task_output).strip()
-                    if result_text:
-                        game_names = [
-                            name.strip() 
-                            for name in result_text.split('\n') 
-                            if name.strip()
-                        ]
-                        # Remover duplicatas
-                        seen = set()
-                        game_names = [
-                            name for name in game_names 
-                            if name and (name.lower() not in seen or seen.add(name.lower()))
-                        ]
-            
-            # Se não encontrou nomes, usar o título da requisição
-            if not game_names:
-                game_names = [game_request.title]
-            
-            # Buscar jogos no retrogames.cc
-            try:
-                print(f"Buscando jogos no retrogames.cc para: {game_names}")
-                retrogames_results = search_multiple_games(game_names, max_results_per_game=5)
-                
-                # Adicionar resultados ao ai_response_data
-                if isinstance(game_request.ai_response_data, dict):
-                    game_request.ai_response_data['game_names'] = game_names
-                    game_request.ai_response_data['retrogames_results'] = retrogames_results
-                else:
-                    # Se não for dict, converter
-                    game_request.ai_response_data = {
-                        'ai_data': game_request.ai_response_data,
-                        'game_names': game_names,
-                        'retrogames_results': retrogames_results
-                    }
-                print(f"Encontrados {len(retrogames_results)} jogos no retrogames.cc")
-            except Exception as e:
-                print(f"Erro ao buscar jogos no retrogames.cc: {str(e)}")
-                import traceback
-                traceback.print_exc()
-        
-        game_request.save()
-        
-        # Preparar dados de resposta
-        response_data = {
-            'status': game_request.execution_status,
-            'state': execution_state,  # Estado original da API (SUCCESS, RUNNING, etc.)
-            'data': game_request.ai_response_data,
-            'kickoff_id': game_request.kickoff_id
-        }
-        
-        # Incluir nomes de jogos extraídos e resultados do retrogames.cc se disponíveis
-        if game_request.ai_response_data and isinstance(game_request.ai_response_data, dict):
-            if 'game_names' in game_request.ai_response_data:
-                response_data['game_names'] = game_request.ai_response_data['game_names']
-            if 'retrogames_results' in game_request.ai_response_data:
-                response_data['retrogames_results'] = game_request.ai_response_data['retrogames_results']
-        
-        return JsonResponse(response_data)
-        
-    except requests.exceptions.HTTPError as e:
-        print("=" * 80)
-        print("ERRO HTTP ao verificar status")
-        print("=" * 80)
-        if hasattr(e, 'response'):
-            print(f"Status Code: {e.response.status_code}")
-            print(f"Response Headers:")
-            for key, value in e.response.headers.items():
-                print(f"  {key}: {value}")
-            print(f"Response Text:")
-            print(e.response.text)
-            try:
-                error_json = e.response.json()
-                print(f"Erro JSON:")
-                print(json.dumps(error_json, indent=2, ensure_ascii=False))
-            except:
-                pass
-        print("=" * 80)
-        return JsonResponse({
-            'error': f'Erro HTTP {e.response.status_code if hasattr(e, "response") else "desconhecido"} ao verificar status: {e.response.text[:200] if hasattr(e, "response") else str(e)}',
-            'status_code': e.response.status_code if hasattr(e, 'response') else None
-        }, status=500)
-    except requests.exceptions.RequestException as e:
-        print("=" * 80)
-        print("ERRO ao verificar status")
-        print("=" * 80)
-        print(f"Tipo de exceção: {type(e).__name__}")
-        print(f"Mensagem: {str(e)}")
-        if hasattr(e, 'response'):
-            print(f"Status Code: {e.response.status_code}")
-            print(f"Response Text: {e.response.text[:500]}")
-        print("=" * 80)
-        return JsonResponse({
-            'error': f'Erro ao verificar status: {str(e)}'
-        }, status=500)
-    except Exception as e:
-        import traceback
-        print("=" * 80)
-        print("ERRO INESPERADO ao verificar status")
-        print("=" * 80)
-        print(f"Tipo: {type(e).__name__}")
-        print(f"Mensagem: {str(e)}")
-        print(f"Traceback:")
-        print(traceback.format_exc())
-        print("=" * 80)
+    if game_request.kickoff_id and collector.status_is_stale(game_request, settings.GAME_COLLECTOR_STATUS_STALE_SECONDS):
+        try:
+            await collector.arefresh_status(game_request.kickoff_id)
+            game_request = await queryset.afirst()
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Erro HTTP ao verificar status de {game_request.kickoff_id}: {e.response.text[:500]}")
+            return JsonResponse({
+                'error': f'Erro HTTP {e.response.status_code} ao verificar status: {e.response.text[:200]}',
+                'status_code': e.response.status_code
+            }, status=500)
+        except (httpx.HTTPError, ratelimit.RateLimitTimeout) as e:
+            logger.error(f"Erro ao verificar status de {game_request.kickoff_id}: {e}")
+            return JsonResponse({
+                'error': f'Erro ao verificar status: {str(e)}'
+            }, status=500)
+        except Exception as e:
+            logger.exception(f"Erro inesperado ao verificar status de {game_request.kickoff_id}")
+            return JsonResponse({
+                'error': f'Erro inesperado: {str(e)}'
+            }, status=500)
+    
+    # Preparar dados de resposta
+    response_data = {
+        'status': game_request.execution_status,
+        'kickoff_id': game_request.kickoff_id,
+        'checked_at': game_request.status_checked_at.isoformat() if game_request.status_checked_at else None,
+        'game_names': game_request.game_names,
+        'searched_names': game_request.searched_names,
+        'retrogames_results': [
+            result async for result in RequestSearchResult.objects.filter(
+                game_request_id=pk
+            ).values(*RequestSearchResult.API_FIELDS)
+        ],
+    }
+    
+    # A resposta bruta da API só é lida e descompactada quando a execução termina
+    if game_request.execution_status in ('completed', 'success', 'failed'):
+        game_request.ai_response_blob = await GameRequest.objects.filter(pk=pk).values_list(
+            'ai_response_blob', flat=True
+        ).afirst()
+        response_data['data'] = game_request.ai_response_data
+    
+    return JsonResponse(response_data)
+
+
+def _sse_event(event, data):
+    """Formata um evento no protocolo Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _request_event_stream(pk):
+    """
+    Gera os eventos de progresso de uma requisição a partir do estado salvo no banco.
+
+    Envia apenas o que mudou desde a última leitura: 'status' (execution_status),
+    'game_names', 'progress' (nomes já buscados no retrogames.cc) e 'results'
+    (somente as linhas de RequestSearchResult novas, com o offset a partir do
+    qual se aplicam). A resposta bruta da API nunca é lida.
+    Termina com 'done' quando a execução é concluída ou falha.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.GAME_COLLECTOR_EVENTS_MAX_SECONDS
+    last_status = last_names = last_searched = None
+    sent_results = last_result_id = 0
+    last_sent = loop.time()
+    
+    while True:
+        row = await GameRequest.objects.filter(pk=pk).values(
+            'execution_status', 'game_names', 'searched_names'
+        ).afirst()
+        if row is None:
+            yield _sse_event('done', {'status': 'deleted'})
+            return
+        
+        execution_status = row['execution_status']
+        game_names = row['game_names']
+        searched = row['searched_names']
+        events = []
+        
+        status_changed = execution_status != last_status
+        if status_changed:
+            last_status = execution_status
+            events.append(_sse_event('status', {'status': execution_status}))
+        
+        if game_names and game_names != last_names:
+            last_names = game_names
+            events.append(_sse_event('game_names', game_names))
+        
+        if last_searched is not None and searched < last_searched:
+            # Pós-processamento reiniciado: os resultados foram recriados do zero
+            sent_results = last_result_id = 0
+        
+        # Resultados novos só aparecem junto com searched_names (mesma transação)
+        # ou com a mudança de status (resultado reaproveitado de outra requisição)
+        if status_changed or searched != last_searched:
+            results = [
+                result async for result in RequestSearchResult.objects.filter(
+                    game_request_id=pk, id__gt=last_result_id
+                ).order_by('id').values(*RequestSearchResult.API_FIELDS)
+            ]
+            if results:
+                events.append(_sse_event('results', {'offset': sent_results, 'results': results}))
+                sent_results += len(results)
+                last_result_id = results[-1]['id']
+        
+        if searched != last_searched:
+            last_searched = searched
+            if game_names:
+                events.append(_sse_event('progress', {'searched': searched, 'total': len(game_names)}))
+        
+        if execution_status in ('completed', 'success', 'failed'):
+            events.append(_sse_event('done', {'status': execution_status}))
+        
+        now = loop.time()
+        if events:
+            last_sent = now
+            yield ''.join(events)
+            if execution_status in ('completed', 'success', 'failed'):
+                return
+        elif now - last_sent >= 15:
+            # Comentário SSE para manter a conexão viva atrás de proxies
+            last_sent = now
+            yield ': keepalive\n\n'
+        
+        if now >= deadline:
+            return
+        await asyncio.sleep(settings.GAME_COLLECTOR_EVENTS_INTERVAL)
+
+
+def event_stream_available(request):
+    """
+    Indica se a requisição chegou por um servidor ASGI. Sob WSGI o Django 4.2
+    consome todo o gerador assíncrono (async_to_sync) antes de enviar a
+    resposta: nenhum evento chegaria ao navegador e o worker síncrono ficaria
+    preso por até GAME_COLLECTOR_EVENTS_MAX_SECONDS.
+    """
+    return isinstance(request, ASGIRequest)
+
+
+async def admin_request_events(request, pk):
+    """
+    Stream Server-Sent Events com o progresso da execução de uma requisição.
+    Endpoint: GET /admin/game-requests/<pk>/events/
+
+    Substitui o polling de admin_check_api_status pela página de detalhe: uma
+    única conexão por aba recebe as mudanças de execution_status, os nomes
+    retornados pela IA e os resultados do retrogames.cc à medida que são
+    salvos. Servido pelo pool de administração (perfil ASGI por padrão); sob
+    WSGI responde 503 e a página volta ao polling de admin_check_api_status.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Método não permitido'}, status=405)
+    
+    if not event_stream_available(request):
         return JsonResponse({
-            'error': f'Erro inesperado: {str(e)}'
-        }, status=500)
+            'error': 'Stream de eventos disponível apenas via ASGI; use admin_check_api_status.'
+        }, status=503)
+    
+    if not await sync_to_async(staff_required)(request.user):
+        return JsonResponse({'error': 'Acesso restrito a administradores'}, status=403)
+    
+    if not await GameRequest.objects.filter(pk=pk).aexists():
+        raise Http404
+    
+    response = StreamingHttpResponse(_request_event_stream(pk), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Desativar o buffer do Nginx para que os eventos cheguem imediatamente
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
-@user_passes_test(staff_required, login_url='home')
-@require_http_methods(["GET", "POST"])
-def admin_search_retrogames(request, pk):
+def _replace_search_results(pk, query, results):
+    """Salva os resultados de uma busca manual, substituindo os anteriores"""
+    with transaction.atomic():
+        RequestSearchResult.objects.filter(game_request_id=pk).delete()
+        RequestSearchResult.objects.bulk_create([
+            RequestSearchResult.from_result(pk, result, query, position)
+            for position, result in enumerate(results)
+            if result.get('game_url')
+        ], ignore_conflicts=True)
+    GameRequest.objects.filter(pk=pk).update(updated_at=timezone.now())
+
+
+@async_user_passes_test(staff_required, login_url='home')
+@async_require_http_methods(["GET", "POST"])
+async def admin_search_retrogames(request, pk):
     """
     View para buscar jogos no retrogames.cc manualmente ou via AJAX.
     Aceita POST ou GET com parâmetro 'query' para buscar um jogo específico.
+    Assíncrona: a espera pelo retrogames.cc não ocupa o worker.
     """
-    import traceback
-    game_request = get_object_or_404(GameRequest, pk=pk)
+    if not await GameRequest.objects.filter(pk=pk).aexists():
+        raise Http404
     
     # Obter query da requisição (POST, GET ou usar valores padrão)
     query = request.POST.get('query') or request.GET.get('query')
@@ -856,16 +882,10 @@ def admin_search_retrogames(request, pk):
         return redirect('admin_game_request_detail', pk=pk)
     
     try:
-        results = search_games_on_retrogames(query, max_results=5)
+        results = await asearch_games_on_retrogames(query, max_results=5)
         
         # Salvar resultados no banco de dados (tanto para AJAX quanto para requisições normais)
-        if not game_request.ai_response_data:
-            game_request.ai_response_data = {}
-        if not isinstance(game_request.ai_response_data, dict):
-            game_request.ai_response_data = {'ai_data': game_request.ai_response_data}
-        
-        game_request.ai_response_data['retrogames_results'] = results
-        game_request.save()
+        await sync_to_async(_replace_search_results)(pk, query, results)
         
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             return JsonResponse({
@@ -881,7 +901,7 @@ def admin_search_retrogames(request, pk):
         
     except Exception as e:
         error_msg = f'Erro ao buscar jogos: {str(e)}'
-        print(f"Erro ao buscar jogos: {traceback.format_exc()}")
+        logger.exception(f"Erro ao buscar jogos no retrogames.cc para a requisição {pk}")
         
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             return JsonResponse({
@@ -892,15 +912,14 @@ def admin_search_retrogames(request, pk):
         return redirect('admin_game_request_detail', pk=pk)
 
 
-@user_passes_test(staff_required, login_url='home')
-@require_http_methods(["GET"])
-def admin_extract_embed_link(request, pk):
+@async_user_passes_test(staff_required, login_url='home')
+@async_require_http_methods(["GET"])
+async def admin_extract_embed_link(request, pk):
     """
     View para extrair o link do embed de uma página do retrogames.cc.
     Busca o textarea readonly na página embed e extrai a URL do jogo.
+    Assíncrona: a espera pelo retrogames.cc não ocupa o worker.
     """
-    from .utils import _extract_embed_url
-    
     # Garantir que sempre retorna JSON
     embed_url = request.GET.get('embed_url')
     if not embed_url:
@@ -910,13 +929,7 @@ def admin_extract_embed_link(request, pk):
         }, status=400, content_type='application/json')
     
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7',
-        }
-        
-        extracted_url = _extract_embed_url(embed_url, headers)
+        extracted_url = await aextract_embed_url(embed_url, RETROGAMES_HEADERS)
         
         if extracted_url:
             return JsonResponse({
@@ -943,7 +956,7 @@ def admin_create_game_from_request(request, pk):
     """
     Cria um jogo no catálogo a partir dos dados coletados pela API.
     """
-    game_request = get_object_or_404(GameRequest, pk=pk)
+    game_request = get_object_or_404(GameRequest.objects.select_related('user'), pk=pk)
     
     if not game_request.ai_response_data:
         messages.error(request, 'Nenhum dado da API disponível para criar o jogo.')
@@ -953,6 +966,16 @@ def admin_create_game_from_request(request, pk):
         # Obter dados do jogo
         game_kwargs = game_request.to_game_kwargs()
         
+        # A mesma ROM já está no catálogo (consulta pelo índice de content_key)?
+        content_key = build_content_key(game_kwargs.get('rom_url'))
+        existing = Game.objects.filter(content_key=content_key).first() if content_key else None
+        if existing:
+            messages.warning(
+                request,
+                f'Este jogo já está no catálogo como "{existing.title}". Nenhum jogo novo foi criado.'
+            )
+            return redirect('admin_game_request_detail', pk=pk)
+        
         # Criar o jogo
         game = Game.objects.create(**game_kwargs)
         
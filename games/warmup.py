@@ -0,0 +1,143 @@
+"""
+Aquecimento da aplicação no processo mestre do Gunicorn (preload_app = True).
+
+Chamado pelo hook when_ready de gunicorn_config.py, uma única vez, antes de
+criar os workers, para que cada worker já nasça com:
+
+    - o URLconf resolvido e todos os módulos de views importados;
+    - os templates compilados (cache do loader de templates do Django);
+    - o índice de duplicados (games/similarity.py) carregado;
+    - o snapshot compartilhado do catálogo (games/snapshot.py) revalidado.
+
+Como os workers são criados com fork, essas estruturas são compartilhadas
+copy-on-write com o mestre. Ao final, as conexões com o banco são fechadas
+(cada worker abre as suas) e os objetos criados até aqui são congelados com
+gc.freeze(), para que o coletor de lixo dos workers não toque nessas páginas.
+
+Depois disso o mestre não volta a acessar o banco: workers recriados (após
+max_requests) herdam esse estado sem nenhuma conexão aberta, e o índice de
+duplicados expirado (DUPLICATE_INDEX_TTL) é recarregado no próprio worker.
+"""
+import gc
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.template import engines
+from django.template.utils import get_app_template_dirs
+from django.urls import get_resolver
+
+from .db import close_connection_pools
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def _timed(timings, step):
+    start = time.perf_counter()
+    yield
+    timings[step] = time.perf_counter() - start
+
+
+def import_views():
+    """
+    Resolve o URLconf (importando urls e views de todos os apps).
+
+    Returns:
+        int: Número de rotas encontradas
+    """
+    def count(patterns):
+        total = 0
+        for pattern in patterns:
+            if hasattr(pattern, 'url_patterns'):
+                total += count(pattern.url_patterns)
+            else:
+                total += 1
+        return total
+
+    return count(get_resolver().url_patterns)
+
+
+def _template_names(directories):
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.endswith(('.html', '.txt', '.xml')):
+                    yield os.path.relpath(os.path.join(root, name), directory).replace(os.sep, '/')
+
+
+def compile_templates():
+    """
+    Compila todos os templates dos diretórios configurados e dos apps. O loader
+    em cache do Django guarda os templates compilados para as próximas chamadas.
+
+    Returns:
+        int: Número de templates compilados
+    """
+    compiled = 0
+    for engine in engines.all():
+        directories = list(engine.dirs) + list(get_app_template_dirs('templates'))
+        for name in sorted(set(_template_names(directories))):
+            try:
+                engine.get_template(name)
+                compiled += 1
+            except Exception as e:
+                # Fragmentos que dependem de contexto (ou de outro engine) não impedem o boot
+                logger.debug(f"Template {name} não compilado no aquecimento: {e}")
+    return compiled
+
+
+def build_catalog_index():
+    """
+    Carrega o índice de duplicados com o catálogo atual.
+
+    Returns:
+        int: Número de títulos indexados
+    """
+    from . import similarity
+
+    similarity.rebuild_index()
+    return len(similarity.get_index())
+
+
+def refresh_catalog_snapshot():
+    """
+    Revalida o snapshot do catálogo (reconstruindo-o se o catálogo mudou).
+
+    Returns:
+        int: Número de jogos no snapshot (0 se desativado ou indisponível)
+    """
+    from . import snapshot
+
+    if not settings.CATALOG_SNAPSHOT_ENABLED:
+        return 0
+    # Só o arquivo: cada worker mapeia o snapshot na primeira leitura, sem
+    # herdar do mestre threads de revalidação
+    snapshot.refresh_snapshot()
+    return snapshot.snapshot_size() or 0
+
+
+def warm_up():
+    """
+    Executa todas as etapas de aquecimento no processo atual.
+
+    Returns:
+        dict: Duração (segundos) de cada etapa e totais de rotas, templates e títulos
+    """
+    timings = {}
+    try:
+        with _timed(timings, 'urls'):
+            timings['routes'] = import_views()
+        with _timed(timings, 'templates'):
+            timings['compiled_templates'] = compile_templates()
+        with _timed(timings, 'catalog'):
+            timings['indexed_titles'] = build_catalog_index()
+        with _timed(timings, 'snapshot'):
+            timings['snapshot_games'] = refresh_catalog_snapshot()
+    finally:
+        # Conexões abertas no mestre (e as ociosas do pool) não podem ser herdadas pelos workers
+        close_connection_pools()
+    gc.freeze()
+    return timings
@@ -6,11 +6,33 @@ import os
 # Bind address
 bind = "0.0.0.0:8000"
 
+# Perfil de execução (GUNICORN_PROFILE):
+#   - "wsgi" (padrão): workers síncronos; cada chamada externa lenta ocupa um processo
+#   - "asgi": workers Uvicorn servindo retro_games_cloud.asgi. As views assíncronas
+#     (API de status, busca no retrogames.cc, SSE) aguardam as chamadas externas
+#     sem bloquear o worker, que continua atendendo outras requisições
+server_profile = os.environ.get("GUNICORN_PROFILE", "wsgi").lower()
+if server_profile not in ("wsgi", "asgi"):
+    raise ValueError(f"GUNICORN_PROFILE inválido: {server_profile!r} (use 'wsgi' ou 'asgi')")
+
+# Aplicação (pode ser sobrescrita pelo argumento posicional do gunicorn)
+wsgi_app = "retro_games_cloud.asgi:application" if server_profile == "asgi" else "retro_games_cloud.wsgi:application"
+
+# Pool de workers (GUNICORN_POOL), para isolar rotas lentas do tráfego público:
+#   - "public" (padrão): catálogo, páginas dos usuários e API pública
+#   - "admin": /admin/ e /webhooks/ (chamadas à API de coleta e ao retrogames.cc),
+#     servido por outro processo do Gunicorn, com workers e timeout próprios.
+#     O Nginx encaminha cada rota ao pool correspondente (ver nginx.conf)
+worker_pool = os.environ.get("GUNICORN_POOL", "public").lower()
+if worker_pool not in ("public", "admin"):
+    raise ValueError(f"GUNICORN_POOL inválido: {worker_pool!r} (use 'public' ou 'admin')")
+
 # Workers
 workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
-worker_class = "sync"
-worker_connections = 1000
-timeout = 120
+worker_class = "uvicorn.workers.UvicornWorker" if server_profile == "asgi" else "sync"
+# No perfil asgi: máximo de conexões simultâneas por worker (limit_concurrency do Uvicorn)
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 1000))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
 keepalive = 2
 
 # Logging
@@ -19,7 +41,7 @@ errorlog = "-"   # stderr
 loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
 
 # Process naming
-proc_name = "retro_games_cloud"
+proc_name = f"retro_games_cloud_{worker_pool}"
 
 # Server mechanics
 daemon = False
@@ -38,6 +60,10 @@ max_requests = 1000
 max_requests_jitter = 50
 preload_app = True
 
+# Aquecimento no mestre antes de criar os workers (games/warmup.py): views,
+# templates e índice do catálogo carregados uma vez e herdados via fork
+warmup = os.environ.get("GUNICORN_WARMUP", "True").lower() in ("1", "true", "yes")
+
 # Security
 limit_request_line = 4094
 limit_request_fields = 100
@@ -50,7 +76,26 @@ graceful_timeout = 30
 worker_tmp_dir = "/dev/shm"
 
 
-
-
-
-
+# Hooks
+# O mestre só acessa o banco em when_ready, antes do primeiro fork (warm_up fecha
+# as conexões ao final). Workers recriados após max_requests herdam esse estado
+# e recarregam o índice expirado por conta própria, na primeira busca.
+
+
+def when_ready(server):
+    """Aquece a aplicação no mestre, antes do primeiro fork"""
+    if not (warmup and server.cfg.preload_app):
+        return
+    try:
+        from games.warmup import warm_up
+        timings = warm_up()
+    except Exception:
+        # Um aquecimento com falha (ex.: banco indisponível) não impede o boot:
+        # os workers carregam o que faltar na primeira requisição
+        server.log.exception("Falha no aquecimento da aplicação")
+        return
+    server.log.info(
+        "Aplicação aquecida: %(routes)d rotas em %(urls).2fs, %(compiled_templates)d templates em "
+        "%(templates).2fs, %(indexed_titles)d títulos indexados em %(catalog).2fs, "
+        "snapshot com %(snapshot_games)d jogos em %(snapshot).2fs" % timings
+    )
@@ -3,6 +3,16 @@ ASGI config for retro_games_cloud project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Async views such as the admin progress stream (games.views.admin_request_events,
+Server-Sent Events) and the views that wait on external services
+(api_get_game_info, admin_check_api_status, admin_search_retrogames and
+admin_extract_embed_link) should be served through this entry point, so that a
+long lived connection or a slow upstream call does not pin a synchronous
+worker. In production, run it with Uvicorn workers under Gunicorn by setting
+GUNICORN_PROFILE=asgi (see gunicorn_config.py); the admin/webhook pool
+(web_admin in docker-compose.yml) uses this profile by default. Under WSGI the
+progress stream answers 503 and the detail page falls back to polling.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
@@ -11,7 +11,9 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 from pathlib import Path
+from urllib.parse import urlparse
 import os
+import tempfile
 from decouple import config
 import dj_database_url
 
@@ -59,6 +61,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'games.middleware.QueryBudgetMiddleware',  # Apenas com QUERY_BUDGET_ENABLED (desenvolvimento/testes)
 ]
 
 ROOT_URLCONF = 'retro_games_cloud.urls'
@@ -97,10 +100,51 @@ if DATABASE_URL.startswith('sqlite'):
         }
     }
 else:
-    # Para outros bancos (PostgreSQL, MySQL, etc.), usar dj_database_url
+    # Para outros bancos (PostgreSQL, MySQL, etc.), usar dj_database_url.
+    # Conexões persistentes: cada worker reaproveita a sua conexão por até
+    # CONN_MAX_AGE segundos (0 = uma por requisição, vazio = sem limite) e
+    # CONN_HEALTH_CHECKS testa a conexão reaproveitada no início da requisição
     DATABASES = {
-        'default': dj_database_url.parse(DATABASE_URL)
+        'default': dj_database_url.parse(
+            DATABASE_URL,
+            conn_max_age=config('CONN_MAX_AGE', default=60, cast=lambda value: int(value) if value else None),
+            conn_health_checks=config('CONN_HEALTH_CHECKS', default=True, cast=bool),
+        )
     }
+    # Pool de conexões no processo (games/db.py), só para PostgreSQL: as conexões
+    # voltam ao pool no fim de cada requisição e são compartilhadas pelas threads
+    # do worker (perfil ASGI / threads). Com o pool, CONN_MAX_AGE não se aplica.
+    if config('DB_POOL', default=False, cast=bool) and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+        DATABASES['default'].update({
+            'ENGINE': 'games.backends.postgresql',
+            'CONN_MAX_AGE': 0,
+            'POOL': {
+                'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+                # Segundos esperando uma conexão livre antes de falhar
+                'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+                # Conexões ociosas há mais tempo que isso são fechadas
+                'max_idle': config('DB_POOL_MAX_IDLE', default=300, cast=float),
+                # Idade máxima de uma conexão (renova conexões de longa duração)
+                'max_lifetime': config('DB_POOL_MAX_LIFETIME', default=3600, cast=float),
+            },
+        })
+
+# Ajustes aplicados a cada nova conexão SQLite (games/db.py, sinal connection_created).
+# WAL permite leituras simultâneas a uma escrita; synchronous=NORMAL é seguro com
+# WAL; cache_size negativo é em KiB; busy_timeout (ms) é quanto uma escrita espera
+# pelo lock antes de "database is locked". SQLITE_TUNING=False mantém o padrão do Django.
+SQLITE_TUNING = config('SQLITE_TUNING', default=True, cast=bool)
+SQLITE_PRAGMAS = {
+    'journal_mode': config('SQLITE_JOURNAL_MODE', default='wal'),
+    'synchronous': config('SQLITE_SYNCHRONOUS', default='normal'),
+    'mmap_size': config('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024, cast=int),
+    'cache_size': config('SQLITE_CACHE_SIZE', default=-64000, cast=int),
+    'busy_timeout': config('SQLITE_BUSY_TIMEOUT', default=10000, cast=int),
+}
+# Como os blocos transaction.atomic() começam: IMMEDIATE reserva o lock de escrita
+# logo no BEGIN (esperando até busy_timeout), em vez de falhar ao promover uma
+# leitura para escrita no meio da transação (DEFERRED, padrão do SQLite)
+SQLITE_TRANSACTION_MODE = config('SQLITE_TRANSACTION_MODE', default='IMMEDIATE')
 
 
 # Password validation
@@ -172,6 +216,110 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default=EMAIL_HOST_USER)
 
+# Integração com a API de coleta de jogos (game-collector)
+# URL base da API. Para testes de carga locais, use a API falsa:
+#   python manage.py run_fake_collector  ->  GAME_COLLECTOR_API_URL=http://127.0.0.1:8765
+GAME_COLLECTOR_API_URL = config(
+    'GAME_COLLECTOR_API_URL',
+    default='https://simple-game-name-collector-v1-ca4edf88-5b8a-ef2ee057.crewai.com'
+)
+# Intervalos (em segundos) do poller em segundo plano (manage.py poll_kickoffs).
+# O intervalo de cada execução começa no mínimo e cresce até o máximo enquanto
+# ela continuar em andamento (backoff adaptativo).
+GAME_COLLECTOR_POLL_MIN_INTERVAL = config('GAME_COLLECTOR_POLL_MIN_INTERVAL', default=3, cast=float)
+GAME_COLLECTOR_POLL_MAX_INTERVAL = config('GAME_COLLECTOR_POLL_MAX_INTERVAL', default=30, cast=float)
+# Se o status de uma execução em andamento não for verificado há mais tempo que
+# isto (poller parado), a view de status consulta a API diretamente como fallback.
+GAME_COLLECTOR_STATUS_STALE_SECONDS = config('GAME_COLLECTOR_STATUS_STALE_SECONDS', default=90, cast=int)
+# Execuções em pós-processamento ('processing') sem heartbeat há mais tempo que
+# isto (worker reiniciado no meio dele) são devolvidas ao poller ('running').
+GAME_COLLECTOR_STALE_CLAIM_SECONDS = config('GAME_COLLECTOR_STALE_CLAIM_SECONDS', default=600, cast=int)
+# Webhooks de conclusão enviados pela API. Sem segredo configurado os webhooks
+# ficam desativados e o poller é o único meio de acompanhar as execuções.
+GAME_COLLECTOR_WEBHOOK_SECRET = config('GAME_COLLECTOR_WEBHOOK_SECRET', default='')
+# URL público do site usado para montar os URLs de webhook (ex.: https://retrogames.exemplo.com)
+GAME_COLLECTOR_WEBHOOK_BASE_URL = config('GAME_COLLECTOR_WEBHOOK_BASE_URL', default='')
+# Por quanto tempo (segundos) o resultado de um kickoff concluído é reaproveitado
+# ao aprovar outra requisição com a mesma consulta normalizada (padrão: 7 dias).
+GAME_COLLECTOR_CACHE_TTL = config('GAME_COLLECTOR_CACHE_TTL', default=7 * 24 * 3600, cast=int)
+# Aprovação em lote: máximo de /kickoff por segundo (0 = sem limite), threads
+# simultâneas e número máximo de requisições por envio
+GAME_COLLECTOR_KICKOFF_RATE = config('GAME_COLLECTOR_KICKOFF_RATE', default=2, cast=float)
+GAME_COLLECTOR_BULK_CONCURRENCY = config('GAME_COLLECTOR_BULK_CONCURRENCY', default=8, cast=int)
+GAME_COLLECTOR_BULK_MAX = config('GAME_COLLECTOR_BULK_MAX', default=100, cast=int)
+# Aprovações presas em 'submitting' há mais tempo que isto (worker reiniciado
+# durante o /kickoff) são devolvidas a 'pending' pelo poller. Deve ser maior que
+# a duração máxima de uma aprovação (espera pela líder + fila de /kickoff + timeout).
+GAME_COLLECTOR_SUBMIT_STALE_SECONDS = config('GAME_COLLECTOR_SUBMIT_STALE_SECONDS', default=300, cast=int)
+# Stream de progresso (Server-Sent Events) da página de detalhe da requisição:
+# intervalo entre leituras do estado salvo e duração máxima de cada conexão
+# (o navegador reconecta automaticamente ao fim dela).
+GAME_COLLECTOR_EVENTS_INTERVAL = config('GAME_COLLECTOR_EVENTS_INTERVAL', default=1, cast=float)
+GAME_COLLECTOR_EVENTS_MAX_SECONDS = config('GAME_COLLECTOR_EVENTS_MAX_SECONDS', default=300, cast=int)
+
+# Por quantos segundos as estatísticas da fila de administração são reaproveitadas
+# (cache local do processo). 0 recalcula a cada acesso.
+ADMIN_REQUEST_STATS_CACHE_SECONDS = config('ADMIN_REQUEST_STATS_CACHE_SECONDS', default=10, cast=int)
+
+# Detecção de pedidos duplicados (games/similarity.py): similaridade mínima de
+# trigramas (0 a 1) para sugerir um título existente, máximo de sugestões e
+# intervalo (segundos) para recarregar o índice em memória de cada processo.
+DUPLICATE_SIMILARITY_THRESHOLD = config('DUPLICATE_SIMILARITY_THRESHOLD', default=0.5, cast=float)
+DUPLICATE_MAX_SUGGESTIONS = config('DUPLICATE_MAX_SUGGESTIONS', default=5, cast=int)
+DUPLICATE_INDEX_TTL = config('DUPLICATE_INDEX_TTL', default=300, cast=int)
+
+# Contagem de queries por requisição (games/middleware.py): aponta queries repetidas
+# (N+1) e aplica um orçamento máximo de queries por view (nome da URL). Ativo por
+# padrão em DEBUG; em modo estrito exceder o orçamento levanta QueryBudgetExceeded.
+# Os testes rodam com os dois ativos (retro_games_cloud/test_settings.py).
+QUERY_BUDGET_ENABLED = config('QUERY_BUDGET_ENABLED', default=DEBUG, cast=bool)
+QUERY_BUDGET_STRICT = config('QUERY_BUDGET_STRICT', default=False, cast=bool)
+QUERY_REPEAT_THRESHOLD = config('QUERY_REPEAT_THRESHOLD', default=3, cast=int)
+QUERY_BUDGETS = {
+    'home': 2,
+    'catalog': 2,
+    'game_detail': 2,
+    'api_get_game_info': 1,
+    'request_game': 2,  # com o índice de duplicados já carregado (1x por processo)
+    'my_game_requests': 2,
+    'admin_game_requests_list': 2,
+    'admin_game_request_detail': 2,
+    'admin_check_api_status': 3,  # sem o fallback para a API (poller atrasado): +1 UPDATE e +1 SELECT
+}
+
+# Limite de requisições HTTP externas por destino (games/ratelimit.py), compartilhado
+# entre os workers: (requisições por segundo, rajada máxima). 0 desativa o limite.
+OUTBOUND_RATE_LIMITS = {
+    'retrogames.cc': (
+        config('RETROGAMES_RATE_PER_SECOND', default=2, cast=float),
+        config('RETROGAMES_RATE_BURST', default=4, cast=int),
+    ),
+    urlparse(GAME_COLLECTOR_API_URL).hostname or 'game-collector': (
+        config('GAME_COLLECTOR_RATE_PER_SECOND', default=5, cast=float),
+        config('GAME_COLLECTOR_RATE_BURST', default=10, cast=int),
+    ),
+}
+# Onde guardar os buckets: 'file' (arquivos em OUTBOUND_RATE_LIMIT_DIR, compartilhado
+# na máquina), 'database' (compartilhado entre máquinas) ou 'memory' (por processo)
+OUTBOUND_RATE_LIMIT_BACKEND = config('OUTBOUND_RATE_LIMIT_BACKEND', default='file')
+OUTBOUND_RATE_LIMIT_DIR = config(
+    'OUTBOUND_RATE_LIMIT_DIR',
+    default='/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+)
+# Tempo máximo (segundos) que uma chamada espera na fila antes de desistir
+OUTBOUND_RATE_LIMIT_MAX_WAIT = config('OUTBOUND_RATE_LIMIT_MAX_WAIT', default=10, cast=float)
+
+# Snapshot do catálogo em memória compartilhada (games/snapshot.py): arquivo
+# mapeado por todos os workers da máquina, lido por home, catalog e
+# api_get_game_info sem acessar o banco. Revalidado em segundo plano quando
+# mais antigo que CATALOG_SNAPSHOT_TTL segundos (0 = só pelos sinais de Game)
+CATALOG_SNAPSHOT_ENABLED = config('CATALOG_SNAPSHOT_ENABLED', default=True, cast=bool)
+CATALOG_SNAPSHOT_DIR = config(
+    'CATALOG_SNAPSHOT_DIR',
+    default='/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+)
+CATALOG_SNAPSHOT_TTL = config('CATALOG_SNAPSHOT_TTL', default=60, cast=int)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,14 @@
+"""
+Settings da suíte de testes: os mesmos de settings.py, com a contagem de
+queries por view (games/middleware.py) ativa e em modo estrito, para que
+exceder QUERY_BUDGETS faça o teste falhar.
+
+Uso:
+    python manage.py test --settings=retro_games_cloud.test_settings
+    DJANGO_SETTINGS_MODULE=retro_games_cloud.test_settings pytest
+"""
+
+from .settings import *  # noqa: F401,F403
+
+QUERY_BUDGET_ENABLED = True
+QUERY_BUDGET_STRICT = True
@@ -23,10 +23,12 @@ from games import views as games_views
 urlpatterns = [
     # Rotas administrativas personalizadas (devem vir antes do admin padrão)
     path('admin/game-requests/', games_views.admin_game_requests_list, name='admin_game_requests_list'),
+    path('admin/game-requests/approve/', games_views.admin_bulk_approve_requests, name='admin_bulk_approve_requests'),
     path('admin/game-requests/<int:pk>/', games_views.admin_game_request_detail, name='admin_game_request_detail'),
     path('admin/game-requests/<int:pk>/approve/', games_views.admin_approve_request, name='admin_approve_request'),
     path('admin/game-requests/<int:pk>/reject/', games_views.admin_reject_request, name='admin_reject_request'),
     path('admin/game-requests/<int:pk>/check-status/', games_views.admin_check_api_status, name='admin_check_api_status'),
+    path('admin/game-requests/<int:pk>/events/', games_views.admin_request_events, name='admin_request_events'),
     path('admin/game-requests/<int:pk>/search-retrogames/', games_views.admin_search_retrogames, name='admin_search_retrogames'),
     path('admin/game-requests/<int:pk>/extract-embed-link/', games_views.admin_extract_embed_link, name='admin_extract_embed_link'),
     path('admin/game-requests/<int:pk>/create-game/', games_views.admin_create_game_from_request, name='admin_create_game_from_request'),